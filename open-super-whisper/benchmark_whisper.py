@@ -0,0 +1,609 @@
+#!/usr/bin/env python
+"""
+Whisper文字起こしのベンチマークスクリプト
+
+同じ音声クリップで文字起こし経路ごとの処理時間を計測し、結果を表形式で出力します。
+
+使い方:
+    python benchmark_whisper.py --audio sample.wav
+    python benchmark_whisper.py --audio sample.wav --models openai/whisper-tiny openai/whisper-small
+    python benchmark_whisper.py --audio sample.wav --durations 2 5 8 --runs 5 --device cpu
+
+比較モード (--compare):
+    trimmed : 30秒パディングの通常経路 と エンコーダー入力短縮 の比較
+    engine  : Transformersのパイプライン と 直接推論エンジン の比較（エンコーダー入力短縮は無効）
+    batch   : 1件ずつのtranscribe() と transcribe_batch() の合計処理時間の比較（--batch-sizesで指定）
+    longform : 30秒超の音声で パイプライン と 分割バッチ文字起こし（VAD分割/固定ウィンドウ）の比較（--durations 120 600 等を指定）
+    vad     : 前後に無音を付けた録音バッファで 無音除去なし と 無音除去（VAD）あり の比較（--silenceで長さを指定）
+    hotwords : カスタム語彙（--vocabularyで指定）を プロンプト・ホットワード・両方 で渡した場合の比較
+    retranscribe : 同じ録音を言語を指定し直して文字起こしする場合の エンコーダー再実行 と エンコーダー出力のキャッシュ の比較
+    speculative : 通常の貪欲デコーディング と ドラフトモデルによる投機的デコーディング の比較
+    prefixcache : 無音判定のKVキャッシュを再利用した生成 と Whisperのgenerate の比較（トークン列の一致を確認）
+    backend : transformers と 他の推論バックエンド（ONNX Runtime等）の比較（--quantizationでint8を指定）
+    quantization : 量子化モードごとの処理時間と常駐メモリ（RSS）の比較（モードごとに別プロセスで計測）
+"""
+
+import argparse
+import difflib
+import multiprocessing
+import statistics
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.core.audio_buffer import AudioBuffer
+from src.core.whisper_api import WhisperTranscriber
+
+
+def load_clips(audio_path, durations, sample_rate=16000):
+    """
+    音声ファイルを読み込み、先頭から指定秒数のクリップを切り出す
+
+    Parameters
+    ----------
+    audio_path : str
+        音声ファイルのパス
+    durations : list of float
+        切り出す長さ（秒）
+    sample_rate : int, optional
+        出力のサンプリングレート
+
+    Returns
+    -------
+    list of tuple
+        (長さ, float32音声配列) のリスト
+    """
+    audio, source_rate = sf.read(audio_path, dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    if source_rate != sample_rate:
+        # ベンチマーク用の簡易リサンプリング
+        positions = np.arange(0, len(audio), source_rate / sample_rate)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+    clips = []
+    for duration in durations:
+        n_samples = int(duration * sample_rate)
+        if n_samples > len(audio):
+            print(f"[WARNING] Audio is shorter than {duration}s, skipping")
+            continue
+        clips.append((duration, np.ascontiguousarray(audio[:n_samples])))
+    return clips
+
+
+def measure(transcribe, runs):
+    """
+    文字起こし関数をruns回実行し、処理時間の中央値と最後の結果を返す
+
+    Parameters
+    ----------
+    transcribe : callable
+        引数なしで文字起こし結果を返す関数
+    runs : int
+        計測回数（ウォームアップ1回は含まない）
+
+    Returns
+    -------
+    tuple
+        (処理時間の中央値（秒）, 文字起こし結果)
+    """
+    result = transcribe()  # ウォームアップ
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = transcribe()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def similarity(a, b):
+    """2つの文字起こし結果の文字単位の一致率"""
+    return difflib.SequenceMatcher(None, a or "", b or "").ratio()
+
+
+def load_transcriber(model_id, device, quantization_mode="none"):
+    """
+    モデルを読み込む（フォールバックで別モデルになった場合はNone）
+    """
+    transcriber = WhisperTranscriber(model_id, device=device, quantization_mode=quantization_mode)
+    if transcriber.model_id != model_id:
+        print(f"[WARNING] {model_id} could not be loaded (fell back to {transcriber.model_id}), skipping")
+        return None
+    # 同じ音声を繰り返し文字起こしするため、結果・エンコーダー出力のキャッシュは使わない
+    transcriber.set_result_cache(False)
+    transcriber.set_encoder_cache(False)
+    return transcriber
+
+
+def bench_trimmed(args, clips):
+    """
+    通常経路（30秒パディング）とエンコーダー入力短縮の処理時間を比較する
+    """
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+
+        for duration, audio in clips:
+            transcriber.set_trimmed_encoder(False)
+            full_time, full_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+
+            transcriber.set_trimmed_encoder(True)
+            before = transcriber.get_trimmed_encoder_stats()
+            trimmed_time, trimmed_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+            after = transcriber.get_trimmed_encoder_stats()
+
+            rows.append([
+                model_id, f"{duration:.0f}s", f"{full_time:.3f}", f"{trimmed_time:.3f}",
+                f"{full_time / trimmed_time:.2f}x", f"{similarity(full_text, trimmed_text):.0%}",
+                str(after["fallback"] - before["fallback"]),
+            ])
+        del transcriber
+
+    print_table(["model", "clip", "full (s)", "trimmed (s)", "speedup", "text match", "guard fallbacks"], rows)
+
+
+def bench_engine(args, clips):
+    """
+    パイプライン経路と直接推論エンジンの処理時間を比較する
+
+    どちらも30秒分の入力で推論するため、差がパイプラインのオーバーヘッドになります。
+    """
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+        transcriber.set_trimmed_encoder(False)
+
+        for duration, audio in clips:
+            transcriber.set_engine("pipeline")
+            pipeline_time, pipeline_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+
+            transcriber.set_engine("direct")
+            direct_time, direct_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+            timings = transcriber.get_last_timings()
+            if timings.get("path") != "direct":
+                print(f"[WARNING] Direct engine fell back to {timings.get('path')} for {model_id} {duration:.0f}s")
+
+            rows.append([
+                model_id, f"{duration:.0f}s", f"{pipeline_time:.3f}", f"{direct_time:.3f}",
+                f"{pipeline_time - direct_time:+.3f}",
+                f"{timings.get('features', 0):.3f}/{timings.get('generate', 0):.3f}/{timings.get('decode', 0):.3f}",
+                f"{similarity(pipeline_text, direct_text):.0%}",
+            ])
+        del transcriber
+
+    print_table(["model", "clip", "pipeline (s)", "direct (s)", "overhead (s)",
+                 "features/generate/decode (s)", "text match"], rows)
+
+
+def bench_batch(args, clips):
+    """
+    1件ずつの文字起こしとバッチ文字起こしの合計処理時間を比較する
+
+    クリップを繰り返して --batch-items 件の入力を作り、同じ入力をまとめて処理します。
+    """
+    audios = [audio for _, audio in clips] * max(1, -(-args.batch_items // len(clips)))
+    audios = audios[:args.batch_items]
+
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+
+        sequential_time, sequential_texts = measure(
+            lambda: [transcriber.transcribe(audio, args.language) for audio in audios], args.runs
+        )
+        rows.append([model_id, "sequential", str(len(audios)), f"{sequential_time:.3f}", "1.00x", "-", "0"])
+
+        for batch_size in args.batch_sizes:
+            batch_time, batch_results = measure(
+                lambda: transcriber.transcribe_batch(audios, args.language, batch_size=batch_size), args.runs
+            )
+            texts = [item["result"] for item in batch_results]
+            match = statistics.mean(similarity(a, b) for a, b in zip(sequential_texts, texts))
+            errors = sum(1 for item in batch_results if item["error"] is not None)
+            rows.append([
+                model_id, f"batch_size={batch_size}", str(len(audios)), f"{batch_time:.3f}",
+                f"{sequential_time / batch_time:.2f}x", f"{match:.0%}", str(errors),
+            ])
+        del transcriber
+
+    print_table(["model", "mode", "items", "total (s)", "speedup", "text match", "errors"], rows)
+
+
+def bench_longform(args, clips):
+    """
+    30秒を超える音声で、パイプライン（逐次処理）と分割バッチ文字起こしの処理時間を比較する
+    """
+    clips = [(duration, audio) for duration, audio in clips if duration > 30]
+    if not clips:
+        print("[ERROR] longform comparison needs clips longer than 30s (e.g. --durations 120 600)")
+        return
+
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+
+        for duration, audio in clips:
+            transcriber.set_long_form(False)
+            pipeline_time, pipeline_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+
+            for segmentation in WhisperTranscriber.LONG_FORM_SEGMENTATIONS:
+                for batch_size in args.batch_sizes:
+                    transcriber.set_long_form(True, batch_size=batch_size, segmentation=segmentation)
+                    long_time, long_text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+                    windows = transcriber.get_last_timings().get("windows", "-")
+                    rows.append([
+                        model_id, f"{duration:.0f}s", segmentation, str(windows), str(batch_size),
+                        f"{pipeline_time:.2f}", f"{long_time:.2f}", f"{pipeline_time / long_time:.2f}x",
+                        f"{similarity(pipeline_text, long_text):.0%}",
+                    ])
+        del transcriber
+
+    print_table(["model", "clip", "split", "segments", "batch", "pipeline (s)", "long-form (s)", "speedup",
+                 "text match"], rows)
+
+
+def bench_vad(args, clips):
+    """
+    録音の前後に無音を付けた音声バッファで、無音除去（VAD）なし・ありの処理時間を比較する
+    """
+    rng = np.random.default_rng(0)
+    sample_rate = 16000
+
+    def silence(seconds):
+        # マイクの環境ノイズ相当の小さなノイズ
+        return (0.001 * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+
+    recordings = [
+        (duration, AudioBuffer(np.concatenate([silence(args.silence[0]), audio, silence(args.silence[1])]), sample_rate))
+        for duration, audio in clips
+    ]
+
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+
+        for duration, buffer in recordings:
+            transcriber.set_vad_trimming(False)
+            full_time, full_text = measure(lambda: transcriber.transcribe(buffer, args.language), args.runs)
+            transcriber.set_vad_trimming(True)
+            vad_time, vad_text = measure(lambda: transcriber.transcribe(buffer, args.language), args.runs)
+            last = transcriber.get_vad_stats()["last"] or {}
+            rows.append([
+                model_id, f"{duration:.0f}s", f"{buffer.duration:.1f}s", f"{last.get('removed_seconds', 0.0):.1f}s",
+                f"{full_time:.3f}", f"{vad_time:.3f}", f"{full_time / vad_time:.2f}x",
+                f"{similarity(full_text, vad_text):.0%}",
+            ])
+        del transcriber
+
+    print_table(["model", "speech", "recording", "removed", "full (s)", "vad (s)", "speedup", "text match"], rows)
+
+
+def bench_hotwords(args, clips):
+    """
+    カスタム語彙をプロンプトで渡す場合と、デコード中のホットワードで渡す場合の処理時間を比較する
+
+    語彙がどれだけ結果に現れたかも表示します。
+    """
+    if not args.vocabulary:
+        print("[ERROR] hotwords comparison needs custom vocabulary (e.g. --vocabulary PyTorch Kubernetes)")
+        return
+    modes = [("prompt", False, True), ("hotwords", True, False), ("both", True, True)]
+
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+        transcriber.add_custom_vocabulary(args.vocabulary)
+
+        for duration, audio in clips:
+            baseline = None
+            for name, hotwords, in_prompt in modes:
+                transcriber.set_hotword_biasing(hotwords, boost=args.boost, vocabulary_in_prompt=in_prompt)
+                elapsed, text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+                if baseline is None:
+                    baseline = (elapsed, text)
+                hits = sum(1 for term in args.vocabulary if term.lower() in text.lower())
+                rows.append([
+                    model_id, f"{duration:.0f}s", name, f"{elapsed:.3f}", f"{baseline[0] / elapsed:.2f}x",
+                    f"{hits}/{len(args.vocabulary)}", f"{similarity(baseline[1], text):.0%}",
+                ])
+        del transcriber
+
+    print_table(["model", "clip", "vocabulary", "latency (s)", "speedup", "terms found", "text match"], rows)
+
+
+def bench_retranscribe(args, clips):
+    """
+    自動検出で文字起こしした録音を、言語を指定し直して文字起こしする場合の処理時間を比較する
+
+    エンコーダー出力のキャッシュが有効な場合は2回目以降にデコーダーのみを実行します。
+    """
+    language = args.language or "ja"
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+        transcriber.set_vad_trimming(False)
+
+        for duration, audio in clips:
+            buffer = AudioBuffer(audio, 16000)
+            baseline = None
+            for name, enabled in (("encoder", False), ("cached", True)):
+                transcriber.set_encoder_cache(enabled)
+                transcriber.transcribe(buffer)
+                elapsed, text = measure(lambda: transcriber.transcribe(buffer, language), args.runs)
+                if baseline is None:
+                    baseline = (elapsed, text)
+                rows.append([
+                    model_id, f"{duration:.0f}s", name, f"{elapsed:.3f}", f"{baseline[0] / elapsed:.2f}x",
+                    f"{similarity(baseline[1], text):.0%}",
+                ])
+        del transcriber
+
+    print_table(["model", "clip", "re-transcribe", "latency (s)", "speedup", "text match"], rows)
+
+
+def bench_speculative(args, clips):
+    """
+    通常の貪欲デコーディングと投機的デコーディングの処理時間を比較する
+
+    エンコーダー入力短縮・無音判定などはデフォルトのまま計測します
+    （whisper-tinyのドラフトモデルは30秒入力で自身のエンコーダーを実行します）。
+    出力は貪欲デコーディングと一致するはずなので、完全一致したかどうかも表示します。
+    """
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+
+        baseline = {}
+        for duration, audio in clips:
+            baseline[duration] = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+
+        if not transcriber.set_speculative_decoding(True):
+            print(f"[WARNING] No usable draft model for {model_id}, skipping")
+            continue
+
+        for duration, audio in clips:
+            elapsed, text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+            base_time, base_text = baseline[duration]
+            rows.append([
+                model_id, transcriber.draft_model_id, f"{duration:.0f}s", f"{base_time:.3f}", f"{elapsed:.3f}",
+                f"{base_time / elapsed:.2f}x", "yes" if text == base_text else f"no ({similarity(base_text, text):.0%})",
+            ])
+        del transcriber
+
+    print_table(["model", "draft", "clip", "greedy (s)", "speculative (s)", "speedup", "identical"], rows)
+
+
+def bench_prefix_cache(args, clips):
+    """
+    無音判定で計算したプロンプト部分のKVキャッシュを再利用した生成と、Whisperのgenerateを比較する
+
+    KVキャッシュの再利用は汎用のgenerateで生成するため、Whisperのgenerateと同じトークン列に
+    なるかどうかを確認します（言語を指定した場合のみ再利用するため、--language未指定時はenで計測）。
+    エンコーダー入力は30秒分で、プロンプトには--vocabularyの語彙を使います。
+    """
+    language = args.language or "en"
+    rows = []
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device)
+        if transcriber is None:
+            continue
+        engine = transcriber.engine
+        if not engine.supports_no_speech_check:
+            print(f"[WARNING] {model_id} does not support the no-speech check, skipping")
+            continue
+        # プロンプトもKVキャッシュに含まれるため、--vocabularyを指定した場合はプロンプトとして渡す
+        prompt = ", ".join(args.vocabulary) or None
+
+        for duration, audio in clips:
+            def run(reuse):
+                engine.reuse_prefix_cache = reuse
+                output = engine.transcribe(
+                    audio, 16000, language, prompt, no_speech_threshold=transcriber.NO_SPEECH_PROB_THRESHOLD
+                )
+                return output["text"], output["token_ids"]
+
+            base_time, (base_text, base_tokens) = measure(lambda: run(False), args.runs)
+            reuse_time, (text, tokens) = measure(lambda: run(True), args.runs)
+            rows.append([
+                model_id, f"{duration:.0f}s", f"{base_time:.3f}", f"{reuse_time:.3f}",
+                f"{base_time / reuse_time:.2f}x", "yes" if tokens == base_tokens else "no",
+                "yes" if engine.reuse_prefix_cache else "no (disabled)",
+            ])
+        del transcriber
+
+    print_table(["model", "clip", "whisper generate (s)", "kv reuse (s)", "speedup", "identical tokens", "reuse active"], rows)
+
+
+def bench_backend(args, clips):
+    """
+    transformersと他の推論バックエンドの処理時間を比較する
+
+    バックエンドの準備（初回はモデルの変換）が完了してから計測します。
+    """
+    rows = []
+    backends = [b["id"] for b in WhisperTranscriber.get_available_backends() if b["available"] and b["id"] != "transformers"]
+    if not backends:
+        print("[WARNING] No alternative backends are available")
+        return
+
+    for model_id in args.models:
+        transcriber = load_transcriber(model_id, args.device, args.quantization)
+        if transcriber is None:
+            continue
+
+        baseline = {}
+        for duration, audio in clips:
+            baseline[duration] = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+
+        for backend in backends:
+            transcriber.set_backend(backend)
+            prepare_start = time.perf_counter()
+            if not transcriber.wait_for_backend():
+                print(f"[WARNING] {backend} backend could not be prepared for {model_id}, skipping")
+                continue
+            prepare_time = time.perf_counter() - prepare_start
+
+            for duration, audio in clips:
+                elapsed, text = measure(lambda: transcriber.transcribe(audio, args.language), args.runs)
+                base_time, base_text = baseline[duration]
+                rows.append([
+                    model_id, backend, f"{duration:.0f}s", f"{prepare_time:.1f}", f"{base_time:.3f}",
+                    f"{elapsed:.3f}", f"{base_time / elapsed:.2f}x", f"{similarity(base_text, text):.0%}",
+                ])
+        transcriber.set_backend("transformers")
+        del transcriber
+
+    print_table(["model", "backend", "clip", "prepare (s)", "transformers (s)", "backend (s)",
+                 "speedup", "text match"], rows)
+
+
+def peak_rss_mb():
+    """プロセスの最大常駐メモリ（MB）。取得できない環境ではNone"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはバイト単位、Linuxはキロバイト単位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _prepare_quantized_model(model_id, mode, device):
+    """別プロセスでモデルを読み込み、量子化済みモデルを保存させる"""
+    load_transcriber(model_id, device, mode)
+
+
+def _quantization_worker(model_id, mode, device, clips, language, runs):
+    """
+    別プロセスで量子化モデルを読み込み、読み込み時間・処理時間・最大RSSを計測する
+    """
+    load_start = time.perf_counter()
+    transcriber = load_transcriber(model_id, device, mode)
+    load_time = time.perf_counter() - load_start
+    if transcriber is None:
+        return None
+    if transcriber.quantization_mode != mode:
+        print(f"[WARNING] {mode} is not available, skipping")
+        return None
+
+    results = []
+    for duration, audio in clips:
+        elapsed, text = measure(lambda: transcriber.transcribe(audio, language), runs)
+        results.append((duration, elapsed, text))
+    return {"load_time": load_time, "results": results, "peak_rss": peak_rss_mb()}
+
+
+def bench_quantization(args, clips):
+    """
+    量子化モードごとの処理時間と最大常駐メモリを比較する
+
+    モデルの読み込みによるメモリ使用量が混ざらないよう、モードごとに新しいプロセスで計測します。
+    量子化済みモデルの保存を先に済ませ、通常の起動（保存済みモデルの読み込み）と同じ条件で計測します。
+    """
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for model_id in args.models:
+        baseline = {}
+        for mode in [mode["id"] for mode in WhisperTranscriber.get_available_quantizations()]:
+            if mode != "none":
+                # 量子化済みモデルを作成・保存する（初回のみ時間がかかる）
+                with context.Pool(1) as pool:
+                    pool.apply(_prepare_quantized_model, (model_id, mode, args.device))
+
+            with context.Pool(1) as pool:
+                report = pool.apply(_quantization_worker, (model_id, mode, args.device, clips, args.language, args.runs))
+            if report is None:
+                continue
+
+            for duration, elapsed, text in report["results"]:
+                if mode == "none":
+                    baseline[duration] = (elapsed, text)
+                base_time, base_text = baseline.get(duration, (None, None))
+                peak_rss = report["peak_rss"]
+                rows.append([
+                    model_id, mode, f"{duration:.0f}s", f"{report['load_time']:.1f}", f"{elapsed:.3f}",
+                    f"{base_time / elapsed:.2f}x" if base_time else "-",
+                    f"{peak_rss:.0f}" if peak_rss is not None else "-",
+                    f"{similarity(base_text, text):.0%}" if base_text is not None else "-",
+                ])
+
+    print_table(["model", "quantization", "clip", "load (s)", "latency (s)", "speedup", "peak RSS (MB)", "text match"], rows)
+
+
+def print_table(headers, rows):
+    """結果を表形式で出力する"""
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)] if rows else [len(h) for h in headers]
+    print()
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+
+BENCHMARKS = {
+    "trimmed": bench_trimmed,
+    "engine": bench_engine,
+    "quantization": bench_quantization,
+    "backend": bench_backend,
+    "speculative": bench_speculative,
+    "prefixcache": bench_prefix_cache,
+    "batch": bench_batch,
+    "longform": bench_longform,
+    "vad": bench_vad,
+    "hotwords": bench_hotwords,
+    "retranscribe": bench_retranscribe,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper文字起こしのベンチマーク")
+    parser.add_argument("--audio", required=True, help="ベンチマークに使用する音声ファイル（発話を含むもの）")
+    parser.add_argument("--compare", choices=sorted(BENCHMARKS), default="trimmed", help="比較する経路")
+    parser.add_argument("--models", nargs="+",
+                        default=[model["id"] for model in WhisperTranscriber.get_available_models()],
+                        help="計測するモデルID（デフォルト: AVAILABLE_MODELSのすべて）")
+    parser.add_argument("--durations", nargs="+", type=float, default=[2.0, 5.0, 8.0], help="クリップの長さ（秒）")
+    parser.add_argument("--runs", type=int, default=3, help="各条件の計測回数")
+    parser.add_argument("--language", default=None, help="言語コード（デフォルト: 自動検出）")
+    parser.add_argument("--device", default="cpu", help="使用するデバイス（デフォルト: cpu）")
+    parser.add_argument("--batch-items", type=int, default=16, help="batch比較で文字起こしする音声の数")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[4, 8], help="batch/longform比較で計測するバッチサイズ")
+    parser.add_argument("--silence", nargs=2, type=float, default=[2.0, 3.0], metavar=("LEADING", "TRAILING"),
+                        help="vad比較で録音の前後に付ける無音の長さ（秒）")
+    parser.add_argument("--vocabulary", nargs="+", default=[], help="hotwords比較で使用するカスタム語彙")
+    parser.add_argument("--boost", type=float, default=2.0, help="hotwords比較でのホットワードのロジット加算値")
+    parser.add_argument("--quantization", default="none", help="backend比較で使用する量子化モード（デフォルト: none）")
+    args = parser.parse_args()
+
+    clips = load_clips(args.audio, args.durations)
+    if not clips:
+        print("[ERROR] No clips to benchmark")
+        return 1
+
+    BENCHMARKS[args.compare](args, clips)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
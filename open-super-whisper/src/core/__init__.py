@@ -7,5 +7,6 @@
 from src.core.whisper_api import WhisperTranscriber
 from src.core.audio_recorder import AudioRecorder
 from src.core.hotkeys import HotkeyManager
+from src.core.streaming import StreamingTranscriptionSession
 
-__all__ = ["WhisperTranscriber", "AudioRecorder", "HotkeyManager"]
+__all__ = ["WhisperTranscriber", "AudioRecorder", "HotkeyManager", "StreamingTranscriptionSession"]
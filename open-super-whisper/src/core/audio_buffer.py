@@ -0,0 +1,364 @@
+import os
+import threading
+
+import numpy as np
+import soundfile as sf
+
+
+class AudioBuffer:
+    """
+    録音した音声をメモリ上に保持するバッファ
+
+    AudioRecorderが録音停止時に返すオブジェクトで、16kHzモノラルのfloat32配列を
+    コピーせずにそのままWhisperTranscriber.transcribe()へ渡せます。
+    WAVファイルへの保存は任意で、バックグラウンドスレッドで行われます。
+    """
+
+    def __init__(self, samples, sample_rate, peak=None, mean=None):
+        """
+        音声バッファの初期化
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            1次元のfloat32音声配列（コピーせずに保持する）
+        sample_rate : int
+            サンプリングレート
+        peak : float, optional
+            最大振幅（未指定の場合は必要時に計算）
+        mean : float, optional
+            平均振幅（未指定の場合は必要時に計算）
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self._peak = peak
+        self._mean = mean
+
+        # バックグラウンド保存の状態
+        self.path = None
+        self._save_thread = None
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        """音声の長さ（秒）"""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def peak(self):
+        """最大振幅"""
+        if self._peak is None:
+            self._peak = float(np.max(np.abs(self.samples))) if len(self.samples) else 0.0
+        return self._peak
+
+    @property
+    def mean(self):
+        """平均振幅"""
+        if self._mean is None:
+            self._mean = float(np.mean(np.abs(self.samples))) if len(self.samples) else 0.0
+        return self._mean
+
+    def save_async(self, filename):
+        """
+        WAVファイルへの保存をバックグラウンドで開始する
+
+        Parameters
+        ----------
+        filename : str
+            保存先のファイルパス
+
+        Returns
+        -------
+        threading.Thread
+            保存を行うスレッド
+        """
+        self._save_thread = threading.Thread(target=self._save, args=(filename,))
+        self._save_thread.daemon = True
+        self._save_thread.start()
+        return self._save_thread
+
+    def wait_saved(self, timeout=None):
+        """
+        バックグラウンド保存の完了を待つ
+
+        Parameters
+        ----------
+        timeout : float, optional
+            最大待機時間（秒）
+
+        Returns
+        -------
+        str or None
+            保存されたファイルパス、保存していない・失敗した場合はNone
+        """
+        if self._save_thread is not None:
+            self._save_thread.join(timeout)
+        return self.path
+
+    def _save(self, filename):
+        """
+        音声を16bit PCMのWAVファイルとして保存する内部メソッド
+        """
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            # 音声データを16bit整数に変換して保存時間を短縮
+            audio_data_int16 = (self.samples * 32767).astype(np.int16)
+            sf.write(filename, audio_data_int16, self.sample_rate, subtype='PCM_16')
+            self.path = filename
+
+            print(f"[INFO] Audio saved successfully: {filename}")
+            print(f"[INFO] Audio duration: {self.duration:.2f}s, max_amp: {self.peak:.4f}, mean_amp: {self.mean:.4f}")
+
+        except Exception as e:
+            print(f"[ERROR] Failed to save audio file: {e}")
+            # フォールバック: 通常のfloat形式で保存
+            try:
+                sf.write(filename, self.samples, self.sample_rate)
+                self.path = filename
+                print(f"[INFO] Audio saved with fallback method: {filename}")
+            except Exception as fallback_error:
+                print(f"[ERROR] Fallback save also failed: {fallback_error}")
+
+
+class CaptureArena:
+    """
+    録音用の事前確保バッファ（アリーナ）
+
+    オーディオコールバックは確保済み領域への1回のコピーのみを行い、
+    リストへの追加や録音停止時の結合を不要にします。
+    最大振幅と平均振幅はブロックごとに逐次更新されるため、
+    録音停止時の処理は録音時間に関わらずO(1)です。
+
+    領域の拡張はensure_headroom()によりオーディオスレッド以外から行います。
+    np.emptyで確保した領域は書き込まれるまで物理メモリを消費しないため、
+    初期容量を大きめに取っても常駐メモリはほとんど増えません。
+    """
+
+    def __init__(self, channels=1, capacity_frames=16000 * 300, block_frames=4096):
+        """
+        録音アリーナの初期化
+
+        Parameters
+        ----------
+        channels : int, optional
+            チャンネル数（デフォルト: 1）
+        capacity_frames : int, optional
+            初期容量（フレーム数、デフォルト: 16kHzで5分）
+        block_frames : int, optional
+            振幅計算用の作業領域のフレーム数（コールバックのブロックサイズ以上が望ましい）
+        """
+        self.channels = channels
+        self._data = np.empty((capacity_frames, channels), dtype=np.float32)
+        self._length = 0
+        self._lock = threading.Lock()
+
+        # 振幅計算用の作業領域（コールバック内で配列を確保しないため）
+        self._scratch = np.empty((block_frames, channels), dtype=np.float32)
+
+        # 逐次更新される音声レベル
+        self._peak = 0.0
+        self._abs_sum = 0.0
+
+        # コールバック内で緊急拡張が発生した回数（通常は0）
+        self.emergency_grows = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        """現在の容量（フレーム数）"""
+        return len(self._data)
+
+    @property
+    def peak(self):
+        """これまでに書き込まれた音声の最大振幅"""
+        return self._peak
+
+    @property
+    def mean(self):
+        """これまでに書き込まれた音声の平均振幅"""
+        count = self._length * self.channels
+        return self._abs_sum / count if count else 0.0
+
+    def write(self, block):
+        """
+        音声ブロックをアリーナに追記する（オーディオスレッドから呼ばれる）
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            (frames, channels) 形状のfloat32音声ブロック
+
+        Returns
+        -------
+        numpy.ndarray
+            書き込んだ領域のビュー（以後書き換えられない）
+        """
+        frames = len(block)
+        with self._lock:
+            start = self._length
+            end = start + frames
+            if end > len(self._data):
+                # 通常はensure_headroom()で事前に拡張されるため到達しない
+                self._grow_locked(max(end, len(self._data) * 2))
+                self.emergency_grows += 1
+            self._data[start:end] = block
+            self._length = end
+            written = self._data[start:end]
+
+        # 音声レベルを逐次更新（作業領域を使い、新たな配列を確保しない）
+        if frames:
+            peak = max(float(block.max()), -float(block.min()))
+            if peak > self._peak:
+                self._peak = peak
+            if frames <= len(self._scratch):
+                scratch = self._scratch[:frames]
+                np.abs(block, out=scratch)
+                self._abs_sum += float(scratch.sum())
+            else:
+                self._abs_sum += float(np.abs(block).sum())
+
+        return written
+
+    def ensure_headroom(self, frames):
+        """
+        空き容量が指定フレーム数を下回っていれば容量を倍にする
+
+        オーディオスレッド以外から呼び出します。既に書き込まれた部分は
+        ロック外でコピーし、ロック中には差分のみをコピーするため、
+        コールバックを待たせる時間はごく短時間です。
+
+        Parameters
+        ----------
+        frames : int
+            確保しておきたい空きフレーム数
+
+        Returns
+        -------
+        bool
+            拡張を行ったかどうか
+        """
+        if len(self._data) - self._length >= frames:
+            return False
+
+        old = self._data
+        new_capacity = max(len(old) * 2, self._length + frames)
+        new = np.empty((new_capacity, self.channels), dtype=np.float32)
+
+        # 書き込み済みの部分はロック外でコピー（追記のみのため内容は変わらない）
+        copied = self._length
+        new[:copied] = old[:copied]
+
+        with self._lock:
+            # 書き込みが続いた分だけロック中にコピーして差し替える
+            new[copied:self._length] = self._data[copied:self._length]
+            self._data = new
+        return True
+
+    def view(self):
+        """
+        書き込まれた音声のビューを返す（コピーなし）
+
+        Returns
+        -------
+        numpy.ndarray
+            (frames, channels) 形状のfloat32配列
+        """
+        with self._lock:
+            return self._data[:self._length]
+
+    def _grow_locked(self, new_capacity):
+        """
+        ロック取得済みの状態で容量を拡張する内部メソッド
+        """
+        new = np.empty((new_capacity, self.channels), dtype=np.float32)
+        new[:self._length] = self._data[:self._length]
+        self._data = new
+
+
+class PrerollRing:
+    """
+    録音開始前の直近の音声を保持する固定長リングバッファ
+
+    ウォームキャプチャ時に録音していない間もストリームの音声を書き込み続け、
+    録音開始時に保持している音声を古い順に録音アリーナの先頭へ書き込みます。
+    """
+
+    def __init__(self, frames, channels=1):
+        """
+        プリロールリングの初期化
+
+        Parameters
+        ----------
+        frames : int
+            保持するフレーム数
+        channels : int, optional
+            チャンネル数（デフォルト: 1）
+        """
+        self._data = np.zeros((max(1, frames), channels), dtype=np.float32)
+        self._pos = 0
+        self._filled = 0
+
+    def __len__(self):
+        return self._filled
+
+    def write(self, block):
+        """
+        音声ブロックを書き込む（古い音声は上書きされる）
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            (frames, channels) 形状のfloat32音声ブロック
+        """
+        size = len(self._data)
+        frames = len(block)
+        if frames >= size:
+            self._data[:] = block[-size:]
+            self._pos = 0
+            self._filled = size
+            return
+
+        end = self._pos + frames
+        if end <= size:
+            self._data[self._pos:end] = block
+        else:
+            first = size - self._pos
+            self._data[self._pos:] = block[:first]
+            self._data[:frames - first] = block[first:]
+        self._pos = end % size
+        self._filled = min(size, self._filled + frames)
+
+    def drain_into(self, arena):
+        """
+        保持している音声を古い順にアリーナへ書き込み、リングを空にする
+
+        Parameters
+        ----------
+        arena : CaptureArena
+            書き込み先の録音アリーナ
+
+        Returns
+        -------
+        list of numpy.ndarray
+            アリーナに書き込んだ領域のビュー
+        """
+        if self._filled == 0:
+            return []
+
+        size = len(self._data)
+        start = (self._pos - self._filled) % size
+        if start + self._filled <= size:
+            views = [arena.write(self._data[start:start + self._filled])]
+        else:
+            views = [arena.write(self._data[start:]), arena.write(self._data[:self._pos])]
+        self.clear()
+        return views
+
+    def clear(self):
+        """保持している音声を破棄する"""
+        self._pos = 0
+        self._filled = 0
@@ -1,21 +1,60 @@
 import os
 import numpy as np
 import sounddevice as sd
-import soundfile as sf
 import threading
 import time
+from collections import deque
 from datetime import datetime
 
+from src.core.audio_buffer import AudioBuffer, CaptureArena, PrerollRing
+
+
+class CaptureSession:
+    """
+    1回分の録音の状態を保持するクラス
+    
+    録音ごとに新しく作成され、停止要求・最終フレーム取得完了のイベントと
+    録音アリーナをまとめて保持します。停止要求後に次の録音が始まっても、
+    前回の録音の完了待ちが新しい録音の状態と混ざらないようにします。
+    """
+    
+    def __init__(self, arena, listener=None):
+        self.arena = arena
+        self.listener = listener
+        
+        # 停止要求（GUIスレッドが設定し、オーディオコールバックが参照する）
+        self.stop_event = threading.Event()
+        # 最後のフレームを取得し、ストリームが停止したことを示す
+        self.capture_done = threading.Event()
+        # 録音スレッドを起こすためのイベント（アリーナの拡張要求・停止完了）
+        self.wake_event = threading.Event()
+        
+        self.stop_requested_at = None
+        self.stop_latency = None
+        self.thread = None
+    
+    def finish(self):
+        """ストリームの停止を通知する"""
+        self.capture_done.set()
+        self.wake_event.set()
+
 
 class AudioRecorder:
     """
     音声録音機能を提供するクラス
     
-    リアルタイムで音声を録音し、WAVファイルとして保存する機能を提供します。
+    リアルタイムで音声を録音し、メモリ上の音声バッファとして返す機能を提供します。
     録音はバックグラウンドスレッドで実行され、メインスレッドをブロックしません。
+    録音のライフサイクルはイベントで駆動され、停止要求は即座に戻ります。
+    WAVファイルへの保存は任意で、有効な場合はバックグラウンドで行われます。
+    
+    ウォームキャプチャを有効にすると入力ストリームを開いたままにし、
+    録音開始前の直近の音声（プリロール）を録音の先頭に付加します。
+    デバイスのオープン待ちがなくなり、最初の発話が欠けなくなります。
     """
     
-    def __init__(self, sample_rate=16000, channels=1, device=None):
+    def __init__(self, sample_rate=16000, channels=1, device=None, save_recordings=False,
+                 warm_capture=False, preroll_seconds=0.5, idle_timeout_minutes=5.0):
         """
         音声録音クラスの初期化
         
@@ -27,13 +66,28 @@ class AudioRecorder:
             チャンネル数（デフォルト: 1（モノラル））
         device : int, optional
             使用する録音デバイスのID（デフォルト: None（デフォルトデバイス））
+        save_recordings : bool, optional
+            録音をWAVファイルとしてバックグラウンドで保存するかどうか（デフォルト: False）
+        warm_capture : bool, optional
+            入力ストリームを開いたままにするウォームキャプチャを使用するかどうか（デフォルト: False）
+        preroll_seconds : float, optional
+            ウォームキャプチャ時に録音の先頭に付加する直前の音声の長さ（デフォルト: 0.5秒）
+        idle_timeout_minutes : float, optional
+            録音されないままこの時間が経過したら省電力のためストリームを閉じる（分、0で無効）
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.device = device
+        self.save_recordings = save_recordings
         self.recording = False
-        self.audio_data = []
-        self._record_thread = None
+        self._capture = None
+        
+        # 録音アリーナの容量設定（初期容量と、常に確保しておく空き容量）
+        self._arena_initial_frames = sample_rate * 300
+        self._arena_headroom_frames = sample_rate * 60
+        
+        # 録音中の音声ブロックを受け取るリスナー（逐次文字起こし用）
+        self._audio_listener = None
         
         # 一時ディレクトリの設定
         self.temp_dir = os.path.join(os.path.expanduser("~"), ".open_super_whisper", "temp")
@@ -42,6 +96,27 @@ class AudioRecorder:
         # パフォーマンス最適化用のキャッシュ
         self._last_recording_time = 0
         self._recording_start_time = 0
+        
+        # 停止レイテンシ（停止要求から最後のフレーム取得まで）の履歴
+        self._stop_latencies = deque(maxlen=100)
+        
+        # ストリームが応答しない場合に停止完了を待つ最大時間（秒）
+        self.stop_timeout = 2.0
+        
+        # ウォームキャプチャの状態（_warm_lockでオーディオコールバックと同期する）
+        self.warm_capture = False
+        self.warm_idle_timeout = idle_timeout_minutes * 60
+        self._preroll = PrerollRing(int(preroll_seconds * sample_rate), channels)
+        self._warm_lock = threading.Lock()
+        self._warm_wake = threading.Event()
+        self._warm_shutdown = None
+        self._warm_thread = None
+        self._warm_stream_open = False
+        self._active_capture = None
+        self._last_used = time.monotonic()
+        
+        if warm_capture:
+            self.set_warm_capture(True)
     
     def start_recording(self):
         """
@@ -55,101 +130,188 @@ class AudioRecorder:
         if self.recording:
             return False
             
+        # 録音ごとに新しいアリーナを用意する（前回のバッファはビューとして参照され続けるため再利用しない）
+        arena = CaptureArena(channels=self.channels, capacity_frames=self._arena_initial_frames)
+        capture = CaptureSession(arena, listener=self._audio_listener)
+        self._capture = capture
         self.recording = True
-        self.audio_data = []
         self._recording_start_time = time.time()
         
-        # 録音スレッドを開始
-        self._record_thread = threading.Thread(target=self._record)
-        self._record_thread.daemon = True
-        self._record_thread.start()
+        if self.warm_capture:
+            # 開いているストリームに録音先を切り替える（プリロールを先頭に付加）
+            self._start_warm_capture(capture)
+        else:
+            # 録音スレッドを開始（ストリームのオープン・クローズはこのスレッドで行う）
+            capture.thread = threading.Thread(target=self._record, args=(capture,))
+            capture.thread.daemon = True
+            capture.thread.start()
         
         print(f"[INFO] Recording started at {datetime.now()}")
         return True
     
-    def stop_recording(self):
+    def set_audio_listener(self, listener):
+        """
+        録音中の音声ブロックを受け取るリスナーを設定する
+        
+        リスナーはオーディオスレッドから呼び出されるため、
+        キューへの投入など短時間で終わる処理のみを行う必要があります。
+        
+        リスナーは録音開始時に録音ごとに固定されるため、停止要求後に解除しても
+        最後のブロックまで通知されます。
+        
+        Parameters
+        ----------
+        listener : callable or None
+            (frames, channels) 形状のfloat32配列を受け取る関数。Noneで解除
+        """
+        self._audio_listener = listener
+    
+    def request_stop(self, requested_at=None):
         """
-        音声録音を停止し、保存したファイル名を返す
+        録音の停止を要求する（GUIスレッドをブロックしない）
+        
+        オーディオコールバックが次のブロックを書き込んだ時点でストリームを停止します。
+        録音データの取得はwait_for_recording()で行います。
+        
+        Parameters
+        ----------
+        requested_at : float, optional
+            停止操作（ホットキー等）が行われた時刻（time.perf_counter()基準）。
+            停止レイテンシの計測に使用し、未指定の場合は現在時刻を使用
         
         Returns
         -------
-        str or None
-            保存された音声ファイルパス、失敗時はNone
+        CaptureSession or None
+            停止を要求した録音、録音中でない場合はNone
         """
         if not self.recording:
             return None
-            
-        self.recording = False
         
-        # 録音スレッドの終了を待機
-        if self._record_thread and self._record_thread.is_alive():
-            self._record_thread.join()
+        capture = self._capture
+        capture.stop_requested_at = requested_at if requested_at is not None else time.perf_counter()
+        capture.stop_event.set()
+        self.recording = False
         
         # 録音時間を記録
         self._last_recording_time = time.time() - self._recording_start_time
         
-        with open("/tmp/recorder_debug.log", "a") as logf:
-            logf.write(f"[STOP_RECORDING] {datetime.now()}, Duration: {self._last_recording_time:.2f}s\n")
+        return capture
+    
+    def wait_for_recording(self, capture=None, timeout=None):
+        """
+        停止を要求した録音の最後のフレーム取得を待ち、音声バッファを返す
+        
+        バックグラウンドスレッドから呼び出すことを想定しています。
         
-        # 現在のタイムスタンプに基づいたファイル名を生成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.temp_dir, f"recording_{timestamp}.wav")
+        Parameters
+        ----------
+        capture : CaptureSession, optional
+            request_stop()が返した録音（デフォルト: 最後の録音）
+        timeout : float, optional
+            最大待機時間（秒、デフォルト: stop_timeout）
         
-        # 録音した音声を保存
-        if self.audio_data:
-            audio_data = np.concatenate(self.audio_data, axis=0)
-            
-            # 音声データの情報をログに記録
-            duration = len(audio_data) / self.sample_rate
-            max_amplitude = np.max(np.abs(audio_data))
-            mean_amplitude = np.mean(np.abs(audio_data))
-            
-            print(f"[AUDIO INFO] Duration: {duration:.2f}s, Max amplitude: {max_amplitude:.4f}, Mean amplitude: {mean_amplitude:.4f}")
-            
-            # 音声レベルが低すぎる場合は警告
-            if max_amplitude < 0.01:
-                print(f"[WARNING] Audio level is very low (max: {max_amplitude:.4f}). Microphone might not be working properly.")
-            
-            # 最適化された音声保存
-            try:
-                # 音声データを16bit整数に変換して保存時間を短縮
-                audio_data_int16 = (audio_data * 32767).astype(np.int16)
-                sf.write(filename, audio_data_int16, self.sample_rate, subtype='PCM_16')
-                
-                with open("/tmp/recorder_debug.log", "a") as logf:
-                    logf.write(f"Saved audio file: {filename}\n")
-                    logf.write(f"Audio duration: {duration:.2f}s, max_amp: {max_amplitude:.4f}, mean_amp: {mean_amplitude:.4f}\n")
-                
-                print(f"[INFO] Audio saved successfully: {filename}")
-                return filename
-                
-            except Exception as e:
-                print(f"[ERROR] Failed to save audio file: {e}")
-                # フォールバック: 通常のfloat形式で保存
-                try:
-                    sf.write(filename, audio_data, self.sample_rate)
-                    print(f"[INFO] Audio saved with fallback method: {filename}")
-                    return filename
-                except Exception as fallback_error:
-                    print(f"[ERROR] Fallback save also failed: {fallback_error}")
-                    return None
+        Returns
+        -------
+        AudioBuffer or None
+            録音した音声バッファ、失敗時はNone
+        """
+        capture = capture or self._capture
+        if capture is None:
+            return None
+        
+        if not capture.capture_done.wait(self.stop_timeout if timeout is None else timeout):
+            print(f"[WARNING] Audio stream did not stop within timeout; using frames captured so far")
+        
+        if capture.stop_latency is not None:
+            print(f"[INFO] Stop latency (request to last frame): {capture.stop_latency * 1000:.1f} ms")
+        
+        arena = capture.arena
+        if len(arena) == 0:
+            print(f"[ERROR] No audio data recorded. Audio data length: {len(arena)}")
+            return None
+        
+        if arena.emergency_grows:
+            print(f"[WARNING] Capture arena was grown {arena.emergency_grows} time(s) on the audio thread")
+        
+        # アリーナのビューをそのまま使用（結合やコピーは行わない）
+        audio_data = arena.view()
+        
+        # モノラルの1次元配列に変換（1チャンネルの場合はコピーなしのビュー）
+        if self.channels == 1:
+            samples = audio_data.reshape(-1)
         else:
-            print(f"[ERROR] No audio data recorded. Audio data length: {len(self.audio_data)}")
+            samples = audio_data.mean(axis=1, dtype=np.float32)
+        
+        # 音声レベルは録音中に逐次計算済み
+        buffer = AudioBuffer(samples, self.sample_rate, peak=arena.peak, mean=arena.mean)
+        
+        # 音声データの情報をログに出力
+        print(f"[AUDIO INFO] Duration: {buffer.duration:.2f}s, Max amplitude: {buffer.peak:.4f}, Mean amplitude: {buffer.mean:.4f}")
+        
+        # 音声レベルが低すぎる場合は警告
+        if buffer.peak < 0.01:
+            print(f"[WARNING] Audio level is very low (max: {buffer.peak:.4f}). Microphone might not be working properly.")
+        
+        # WAVファイルへの保存（任意・バックグラウンド）
+        if self.save_recordings:
+            # 現在のタイムスタンプに基づいたファイル名を生成
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.join(self.temp_dir, f"recording_{timestamp}.wav")
+            buffer.save_async(filename)
+        
+        return buffer
+    
+    def stop_recording(self):
+        """
+        音声録音を停止し、録音した音声バッファを返す
+        
+        request_stop()とwait_for_recording()を続けて呼び出します。
+        GUIスレッドからはrequest_stop()を使用し、完了待ちはバックグラウンドで行ってください。
+        
+        Returns
+        -------
+        AudioBuffer or None
+            録音した音声バッファ、失敗時はNone
+        """
+        capture = self.request_stop()
+        if capture is None:
             return None
+        return self.wait_for_recording(capture)
     
-    def _record(self):
+    def _record(self, capture):
         """
         音声データを録音する内部メソッド
+        
+        Parameters
+        ----------
+        capture : CaptureSession
+            この録音の状態
         """
+        arena = capture.arena
+        headroom = self._arena_headroom_frames
+        
         try:
             # 録音コールバック関数
-            def callback(indata, frames, time, status):
+            def callback(indata, frames, time_info, status):
                 if status:
                     print(f"[WARNING] Audio recording status: {status}")
-                if self.recording:
-                    # 音声データをコピーして保存
-                    audio_chunk = indata.copy()
-                    self.audio_data.append(audio_chunk)
+                
+                # 事前確保したアリーナへ1回のコピーで追記
+                audio_chunk = arena.write(indata)
+                
+                # 逐次文字起こし用のリスナーに通知
+                if capture.listener is not None:
+                    capture.listener(audio_chunk)
+                
+                # 空き容量が少なくなったら録音スレッドに拡張を依頼
+                if arena.capacity - len(arena) < headroom:
+                    capture.wake_event.set()
+                
+                # 停止要求後の最初のブロックを最後のフレームとする
+                if capture.stop_event.is_set():
+                    capture.stop_latency = time.perf_counter() - capture.stop_requested_at
+                    self._stop_latencies.append(capture.stop_latency)
+                    raise sd.CallbackStop
             
             # 録音ストリームを開始
             with sd.InputStream(
@@ -157,15 +319,217 @@ class AudioRecorder:
                 channels=self.channels,
                 device=self.device,
                 callback=callback,
+                finished_callback=capture.finish,
                 dtype=np.float32
             ):
                 print(f"[INFO] Recording stream started")
-                while self.recording:
-                    time.sleep(0.1)  # 100ms間隔でチェック
+                # ポーリングせず、拡張要求かストリーム停止まで待機
+                while not capture.capture_done.is_set():
+                    capture.wake_event.wait()
+                    capture.wake_event.clear()
+                    # アリーナの拡張はオーディオスレッドではなくこのスレッドで行う
+                    arena.ensure_headroom(headroom)
                     
         except Exception as e:
             print(f"[ERROR] Recording error: {e}")
             self.recording = False
+        finally:
+            capture.finish()
+    
+    def _start_warm_capture(self, capture):
+        """
+        開いたままのストリームの書き込み先を録音に切り替える内部メソッド
+        
+        Parameters
+        ----------
+        capture : CaptureSession
+            開始する録音
+        """
+        with self._warm_lock:
+            self._last_used = time.monotonic()
+            need_open = not self._warm_stream_open
+            if need_open:
+                # 省電力で閉じていた場合は開き直す（このときはプリロールなし）
+                self._warm_stream_open = True
+            else:
+                # 直前の音声を録音の先頭に付加（リスナーにも録音順に通知）
+                for chunk in self._preroll.drain_into(capture.arena):
+                    if capture.listener is not None:
+                        capture.listener(chunk)
+            self._active_capture = capture
+        
+        if need_open:
+            self._open_warm_stream()
+    
+    def _open_warm_stream(self):
+        """
+        ウォームキャプチャ用の入力ストリームをバックグラウンドで開く内部メソッド
+        
+        呼び出し前に_warm_stream_openをTrueにしておく必要があります。
+        """
+        previous = self._warm_thread
+        shutdown = threading.Event()
+        self._warm_shutdown = shutdown
+        self._warm_thread = threading.Thread(target=self._run_warm_stream, args=(shutdown, previous))
+        self._warm_thread.daemon = True
+        self._warm_thread.start()
+    
+    def _close_warm_stream(self):
+        """
+        ウォームキャプチャ用の入力ストリームを閉じる内部メソッド
+        """
+        with self._warm_lock:
+            shutdown = self._warm_shutdown
+            self._warm_shutdown = None
+            self._warm_stream_open = False
+        if shutdown is not None:
+            shutdown.set()
+            self._warm_wake.set()
+    
+    def _warm_callback(self, indata, frames, time_info, status):
+        """
+        ウォームキャプチャ用のオーディオコールバック
+        
+        録音中はアリーナへ、それ以外はプリロールリングへ書き込みます。
+        """
+        if status:
+            print(f"[WARNING] Audio recording status: {status}")
+        
+        with self._warm_lock:
+            capture = self._active_capture
+            if capture is None:
+                self._preroll.write(indata)
+                return
+            
+            # 事前確保したアリーナへ1回のコピーで追記
+            arena = capture.arena
+            audio_chunk = arena.write(indata)
+            
+            # 逐次文字起こし用のリスナーに通知
+            if capture.listener is not None:
+                capture.listener(audio_chunk)
+            
+            # 停止要求後の最初のブロックを最後のフレームとし、以降はプリロールへ戻す
+            if capture.stop_event.is_set():
+                capture.stop_latency = time.perf_counter() - capture.stop_requested_at
+                self._stop_latencies.append(capture.stop_latency)
+                self._active_capture = None
+                self._last_used = time.monotonic()
+                capture.finish()
+                # アイドル時間の計測を始めるためストリームのスレッドを起こす
+                self._warm_wake.set()
+                return
+        
+        # 空き容量が少なくなったらストリームのスレッドに拡張を依頼
+        if arena.capacity - len(arena) < self._arena_headroom_frames:
+            self._warm_wake.set()
+    
+    def _run_warm_stream(self, shutdown, previous):
+        """
+        ウォームキャプチャ用の入力ストリームを保持するスレッドの本体
+        
+        ポーリングせず、アリーナの拡張要求・録音停止・終了要求のイベントか
+        アイドルタイムアウトまで待機します。
+        
+        Parameters
+        ----------
+        shutdown : threading.Event
+            このストリームの終了要求
+        previous : threading.Thread or None
+            前回のストリームのスレッド（デバイスを二重に開かないよう終了を待つ）
+        """
+        if previous is not None and previous.is_alive():
+            previous.join()
+        
+        try:
+            with sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                device=self.device,
+                callback=self._warm_callback,
+                dtype=np.float32
+            ):
+                print(f"[INFO] Warm capture stream opened")
+                while not shutdown.is_set():
+                    with self._warm_lock:
+                        idle = self._active_capture is None
+                        idle_elapsed = time.monotonic() - self._last_used
+                        expired = self.warm_idle_timeout > 0 and idle_elapsed >= self.warm_idle_timeout
+                        if idle and (expired or not self.warm_capture):
+                            # 一定時間使われていない（または無効化された）ためストリームを閉じる
+                            if self._warm_shutdown is shutdown:
+                                self._warm_shutdown = None
+                                self._warm_stream_open = False
+                            print(f"[INFO] Warm capture stream closed after {idle_elapsed / 60:.1f} idle minutes")
+                            break
+                    
+                    timeout = self.warm_idle_timeout - idle_elapsed if idle and self.warm_idle_timeout > 0 else None
+                    self._warm_wake.wait(timeout)
+                    self._warm_wake.clear()
+                    
+                    # アリーナの拡張はオーディオスレッドではなくこのスレッドで行う
+                    capture = self._active_capture
+                    if capture is not None:
+                        capture.arena.ensure_headroom(self._arena_headroom_frames)
+                    
+        except Exception as e:
+            print(f"[ERROR] Warm capture stream error: {e}")
+        finally:
+            with self._warm_lock:
+                if self._warm_shutdown is shutdown:
+                    self._warm_shutdown = None
+                    self._warm_stream_open = False
+                # 録音中にストリームが終了した場合は録音を終わらせる
+                capture = self._active_capture if not self._warm_stream_open else None
+                if capture is not None:
+                    self._active_capture = None
+                self._preroll.clear()
+            if capture is not None:
+                self.recording = False
+                capture.finish()
+    
+    def set_warm_capture(self, enabled, preroll_seconds=None, idle_timeout_minutes=None):
+        """
+        ウォームキャプチャの有効/無効を切り替える
+        
+        有効にすると録音していない間も入力ストリームを開いたままにします。
+        録音中に変更した場合は次の録音から適用されます。
+        
+        Parameters
+        ----------
+        enabled : bool
+            ウォームキャプチャを使用するかどうか
+        preroll_seconds : float, optional
+            録音の先頭に付加する直前の音声の長さ（秒）
+        idle_timeout_minutes : float, optional
+            未使用時にストリームを閉じるまでの時間（分、0で無効）
+        """
+        if preroll_seconds is not None:
+            with self._warm_lock:
+                self._preroll = PrerollRing(int(preroll_seconds * self.sample_rate), self.channels)
+        if idle_timeout_minutes is not None:
+            self.warm_idle_timeout = idle_timeout_minutes * 60
+            self._warm_wake.set()
+        
+        self.warm_capture = enabled
+        if enabled:
+            if not self.recording:
+                with self._warm_lock:
+                    self._last_used = time.monotonic()
+                    need_open = not self._warm_stream_open
+                    if need_open:
+                        self._warm_stream_open = True
+                if need_open:
+                    self._open_warm_stream()
+        elif not self.recording:
+            self._close_warm_stream()
+    
+    def close(self):
+        """
+        開いたままの入力ストリームを閉じる（アプリケーション終了時など）
+        """
+        self.warm_capture = False
+        self._close_warm_stream()
     
     def is_recording(self):
         """
@@ -189,6 +553,36 @@ class AudioRecorder:
         """
         return self._last_recording_time
     
+    def get_last_stop_latency(self):
+        """
+        最後の録音の停止レイテンシを取得する
+        
+        Returns
+        -------
+        float or None
+            停止要求から最後のフレーム取得までの時間（秒）、未計測の場合はNone
+        """
+        return self._stop_latencies[-1] if self._stop_latencies else None
+    
+    def get_stop_latency_stats(self):
+        """
+        停止レイテンシの統計を取得する（直近100回分）
+        
+        Returns
+        -------
+        dict
+            count、last、mean、maxを含む辞書（単位: 秒）
+        """
+        latencies = list(self._stop_latencies)
+        if not latencies:
+            return {"count": 0, "last": None, "mean": None, "max": None}
+        return {
+            "count": len(latencies),
+            "last": latencies[-1],
+            "mean": sum(latencies) / len(latencies),
+            "max": max(latencies),
+        }
+    
     def get_recording_duration(self):
         """
         現在の録音時間を取得する
@@ -0,0 +1,346 @@
+import re
+from collections import defaultdict
+
+from src.core.vocabulary import normalize_term
+
+try:
+    import pykakasi
+except ImportError:
+    pykakasi = None
+
+
+# 語彙の照合単位（英数字は単語、日本語は1文字）
+_UNIT_PATTERN = re.compile(r"[0-9A-Za-z\uFF10-\uFF19\uFF21-\uFF3A\uFF41-\uFF5A]+|[\u3040-\u30FF\u3400-\u9FFF\uF900-\uFAFF\uFF66-\uFF9F]")
+_KANJI_PATTERN = re.compile(r"[\u3400-\u9FFF\uF900-\uFAFF]")
+
+# これより短い語彙は補正しない（正規化後の文字数）
+MIN_CORRECTION_LENGTH = 3
+# 読みで照合する語彙の最短の長さ（短い読みは同音異義語が多いため）
+MIN_READING_LENGTH = 4
+
+
+def fold_term(text):
+    """
+    語彙の照合用に文字列を正規化する（normalize_termに加えてカタカナをひらがなに揃える）
+
+    Parameters
+    ----------
+    text : str
+        正規化する文字列
+
+    Returns
+    -------
+    str
+        正規化した文字列
+    """
+    return "".join(
+        chr(ord(char) - 0x60) if "ァ" <= char <= "ヶ" else char
+        for char in normalize_term(text)
+    )
+
+
+def _script(char):
+    """正規化した文字の文字種（0: 英数字、1: かな、2: 漢字など）"""
+    if char.isascii():
+        return 0
+    return 1 if "ぁ" <= char <= "ー" else 2
+
+
+def max_distance(length):
+    """正規化後の長さごとに許容する編集距離（短い語彙ほど厳しくする）"""
+    if length < 4:
+        return 0
+    return 1 if length < 8 else 2
+
+
+def _deletes(key, distance):
+    """keyから最大distance文字を削除した文字列の集合（keyを含む）"""
+    variants = {key}
+    level = {key}
+    for _ in range(distance):
+        level = {text[:i] + text[i + 1:] for text in level for i in range(len(text))}
+        variants |= level
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """
+    隣接文字の入れ替えを1回と数える編集距離（limitを超える場合はlimit + 1）
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _FuzzyIndex:
+    """
+    正規化した表記から語彙を引くSymmetric Delete索引
+
+    語彙ごとに許容する編集距離分の文字を削除した文字列を索引に登録しておき、
+    照合時は候補の文字列から削除した文字列を引くだけで近い語彙を見つけます。
+    区切りのない日本語ではすべての部分文字列を照合すると遅いため、
+    語彙の断片が現れた位置の周辺の区間だけを照合します。
+    """
+
+    def __init__(self, min_length=MIN_CORRECTION_LENGTH, fuzzy=True):
+        """
+        索引の初期化
+
+        Parameters
+        ----------
+        min_length : int, optional
+            登録する語彙の最短の長さ（正規化後の文字数）
+        fuzzy : bool, optional
+            編集距離を許容するかどうか（Falseの場合は正規化した表記の完全一致のみ）
+        """
+        self.min_length = min_length
+        self.fuzzy = fuzzy
+        self.terms = {}
+        self._distances = {}
+        self._index = defaultdict(set)
+        # 候補の文字列の長さごとに、照合しうる語彙の最大の編集距離
+        self._length_distances = {}
+        # 語彙をd+1個に分けた断片と (語彙, 語彙内の位置)（編集距離d以内の候補には、いずれかの断片がそのまま含まれる）
+        self._pieces = defaultdict(list)
+        self._piece_lengths = set()
+
+    def add(self, key, term):
+        """正規化した表記keyでtermを登録する（同じ表記は先に登録した語彙を優先）"""
+        if len(key) < self.min_length or key in self.terms:
+            return
+        distance = max_distance(len(key)) if self.fuzzy else 0
+        self.terms[key] = term
+        self._distances[key] = distance
+        for variant in _deletes(key, distance):
+            self._index[variant].add(key)
+        for length in range(len(key) - distance, len(key) + distance + 1):
+            self._length_distances[length] = max(self._length_distances.get(length, 0), distance)
+
+        size, extra = divmod(len(key), distance + 1)
+        position = 0
+        for i in range(distance + 1):
+            length = size + (1 if i < extra else 0)
+            self._pieces[key[position:position + length]].append((key, position))
+            self._piece_lengths.add(length)
+            position += length
+
+    def candidate_spans(self, text):
+        """
+        語彙の断片が現れる位置から、語彙と照合しうる区間 (開始, 終了) を列挙する
+
+        Parameters
+        ----------
+        text : str
+            正規化した文字列
+
+        Returns
+        -------
+        set of tuple
+            照合する価値のある区間（textの文字位置）
+        """
+        spans = set()
+        for start in range(len(text)):
+            for length in self._piece_lengths:
+                for key, offset in self._pieces.get(text[start:start + length], ()):
+                    distance = self._distances[key]
+                    for span_start in range(start - offset - distance, start - offset + distance + 1):
+                        for span_length in range(len(key) - distance, len(key) + distance + 1):
+                            spans.add((span_start, span_start + span_length))
+        return spans
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def lookup(self, text):
+        """
+        正規化した文字列に最も近い語彙を探す
+
+        Parameters
+        ----------
+        text : str
+            正規化した候補の文字列
+
+        Returns
+        -------
+        tuple or None
+            (語彙の正規化した表記, 編集距離)、許容範囲内の語彙がない場合はNone
+        """
+        distance = self._length_distances.get(len(text))
+        if distance is None:
+            return None
+        if text in self.terms:
+            return text, 0
+
+        best = None
+        candidates = set()
+        for variant in _deletes(text, distance):
+            candidates.update(self._index.get(variant, ()))
+        for key in candidates:
+            limit = self._distances[key]
+            found = edit_distance(text, key, limit)
+            if found <= limit and (best is None or found < best[1]):
+                best = (key, found)
+        return best
+
+
+class VocabularyCorrector:
+    """
+    文字起こし結果のカスタム語彙に近い誤認識を語彙の表記に置き換える後処理
+
+    語彙は正規化（NFKC・小文字化・空白の除去・カタカナをひらがなに統一）した表記で
+    Symmetric Delete索引に登録し、pykakasiがあれば漢字を含む語彙の読みも登録します
+    （結果の漢字を含む箇所の読みが語彙の読みと一致する場合に置き換えます）。
+    結果の英数字は連続する単語、日本語は連続する文字を候補として照合するため、
+    大文字小文字・全角半角・カナの違い、分かち書きされた製品名（"Py Torch"）、
+    1〜2文字の誤りを語彙の表記に揃えます。索引は語彙が変わったときに1回だけ作成します。
+    """
+
+    def __init__(self, terms):
+        """
+        索引の作成
+
+        Parameters
+        ----------
+        terms : list of str
+            カスタム語彙
+        """
+        self._surface = _FuzzyIndex()
+        # 読みは同音異義語の誤変換のみを対象とするため完全一致で照合する
+        self._reading = _FuzzyIndex(MIN_READING_LENGTH, fuzzy=False)
+        self._kakasi = pykakasi.kakasi() if pykakasi is not None else None
+        for term in terms:
+            term = term.strip()
+            if not term:
+                continue
+            self._surface.add(fold_term(term), term)
+            if self._kakasi is not None and _KANJI_PATTERN.search(term):
+                self._reading.add(fold_term(self._read(term)), term)
+
+    def __bool__(self):
+        return bool(self._surface)
+
+    def _read(self, text):
+        """漢字かな交じりの文字列の読み（ひらがな）"""
+        return "".join(item["hira"] for item in self._kakasi.convert(text))
+
+    @staticmethod
+    def _runs(text):
+        """照合単位 (開始位置, 終了位置, 正規化した表記) の、空白以外で区切られない連続のリスト"""
+        runs = []
+        previous_end = None
+        for match in _UNIT_PATTERN.finditer(text):
+            start, end = match.span()
+            gap = text[previous_end:start] if previous_end is not None else None
+            # 空白を挟んで続くのは英数字の単語どうしのみ（"Py Torch"）
+            if gap is None or gap.strip() or (gap and not (text[previous_end - 1].isascii() and text[start].isascii())):
+                runs.append([])
+            runs[-1].append((start, end, fold_term(match.group())))
+            previous_end = end
+        return runs
+
+    def _reading_runs(self, text, runs):
+        """漢字を含む連続の読みの照合単位（pykakasiの区切りごと）"""
+        reading_runs = []
+        for run in runs:
+            start, end = run[0][0], run[-1][1]
+            if not _KANJI_PATTERN.search(text, start, end):
+                continue
+            units = []
+            position = start
+            for item in self._kakasi.convert(text[start:end]):
+                length = len(item["orig"])
+                if item["orig"].strip():
+                    units.append((position, position + length, fold_term(item["hira"])))
+                position += length
+            # 読みの区切りが元の文字列と対応しない場合は照合しない
+            if position == end and units:
+                reading_runs.append(units)
+        return reading_runs
+
+    @staticmethod
+    def _matches(text, runs, index, require_kanji=False):
+        """連続する照合単位から語彙に近い区間を探す"""
+        matches = []
+        for run in runs:
+            # 照合単位の境界（文字位置 -> 単位の番号）
+            normalized = ""
+            unit_starts = {}
+            unit_ends = {}
+            for number, unit in enumerate(run):
+                unit_starts[len(normalized)] = number
+                normalized += unit[2]
+                unit_ends[len(normalized)] = number
+
+            for span_start, span_end in index.candidate_spans(normalized):
+                i = unit_starts.get(span_start)
+                j = unit_ends.get(span_end)
+                if i is None or j is None or j < i:
+                    continue
+                found = index.lookup(normalized[span_start:span_end])
+                if found is None:
+                    continue
+                start, end = run[i][0], run[j][1]
+                if require_kanji and not _KANJI_PATTERN.search(text, start, end):
+                    continue
+                key, distance = found
+                if distance and (_script(normalized[span_start]) != _script(key[0])
+                                 or _script(normalized[span_end - 1]) != _script(key[-1])):
+                    # 隣の別の文字種の語（助詞など）まで含めた誤りは語彙とみなさない
+                    continue
+                matches.append((distance, -(end - start), start, end, index.terms[key]))
+        return matches
+
+    def correct(self, text):
+        """
+        文字起こし結果の語彙に近い箇所を語彙の表記に置き換える
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果
+
+        Returns
+        -------
+        tuple
+            (補正後の文字列, 置き換えた箇所の (元の文字列, 語彙) のリスト)
+        """
+        if not self._surface or not text:
+            return text, []
+        runs = self._runs(text)
+        matches = self._matches(text, runs, self._surface)
+        if self._reading:
+            matches.extend(self._matches(text, self._reading_runs(text, runs), self._reading, require_kanji=True))
+
+        # 編集距離が小さく長い区間を優先し、重ならない区間だけを置き換える
+        accepted = []
+        for _, _, start, end, term in sorted(matches):
+            if any(start < other_end and other_start < end for other_start, other_end, _ in accepted):
+                continue
+            accepted.append((start, end, term))
+
+        corrections = []
+        pieces = []
+        position = 0
+        for start, end, term in sorted(accepted):
+            if text[start:end] == term:
+                continue
+            pieces.append(text[position:start])
+            pieces.append(term)
+            corrections.append((text[start:end], term))
+            position = end
+        if not corrections:
+            return text, []
+        pieces.append(text[position:])
+        return "".join(pieces), corrections
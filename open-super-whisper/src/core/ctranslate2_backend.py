@@ -0,0 +1,274 @@
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+try:
+    import ctranslate2
+    from ctranslate2.converters import TransformersConverter
+except ImportError:
+    ctranslate2 = None
+
+try:
+    from huggingface_hub import snapshot_download
+except ImportError:
+    snapshot_download = None
+
+from src.core.prompt import MAX_DECODER_LENGTH
+from src.core.whisper_engine import WhisperGenerateEngine
+
+
+# 変換したCTranslate2モデルの保存先
+CT2_CACHE_DIR = os.path.expanduser("~/.cache/open_super_whisper/ctranslate2")
+
+
+def is_ctranslate2_available():
+    """
+    CTranslate2バックエンドが使えるかどうか（ctranslate2が必要）
+
+    Returns
+    -------
+    bool
+        使用可能かどうか
+    """
+    return ctranslate2 is not None
+
+
+def ct2_model_dir(model_id):
+    """
+    変換したCTranslate2モデルの保存先ディレクトリを返す
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+
+    Returns
+    -------
+    pathlib.Path
+        保存先のディレクトリ
+    """
+    name = f"{model_id.replace('/', '--')}--int8--ct2{ctranslate2.__version__}"
+    return Path(CT2_CACHE_DIR) / re.sub(r"[^\w.\-+]", "_", name)
+
+
+def convert_to_ct2(model_id, output_dir, cache_dir=None):
+    """
+    Hugging FaceのWhisperモデルをint8のCTranslate2形式に変換する
+
+    ダウンロード済みのHugging Faceキャッシュから変換し、キャッシュにない場合はダウンロードします。
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    output_dir : pathlib.Path
+        保存先のディレクトリ
+    cache_dir : str, optional
+        Hugging Faceのキャッシュディレクトリ
+    """
+    print(f"[INFO] Converting {model_id} to CTranslate2 int8 (first use only)")
+    start_time = time.time()
+
+    model_path = model_id
+    if snapshot_download is not None:
+        try:
+            model_path = snapshot_download(model_id, cache_dir=cache_dir, local_files_only=True)
+        except Exception:
+            print(f"[INFO] {model_id} not found in the Hugging Face cache, downloading for conversion")
+
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=output_dir.parent, prefix=".convert-")
+    try:
+        converter = TransformersConverter(model_path, load_as_float16=False)
+        converter.convert(tmp_dir, quantization="int8", force=True)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        os.replace(tmp_dir, output_dir)
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"[INFO] CTranslate2 conversion completed in {time.time() - start_time:.1f}s: {output_dir}")
+
+
+def load_ctranslate2_engine(model_id, processor, compute_type="int8_float32", cache_dir=None):
+    """
+    CTranslate2で推論する文字起こしエンジンを作成する（未変換の場合は変換する）
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    processor : transformers.WhisperProcessor
+        特徴量抽出器とトークナイザー
+    compute_type : str, optional
+        CTranslate2の計算精度（"int8" または "int8_float32"）
+    cache_dir : str, optional
+        Hugging Faceのキャッシュディレクトリ
+
+    Returns
+    -------
+    CTranslate2WhisperEngine
+        CTranslate2のモデルで推論するエンジン
+    """
+    if not is_ctranslate2_available():
+        raise ImportError("CTranslate2 backend requires ctranslate2 (pip install ctranslate2)")
+
+    model_dir = ct2_model_dir(model_id)
+    if not (model_dir / "model.bin").exists():
+        convert_to_ct2(model_id, model_dir, cache_dir)
+
+    model = ctranslate2.models.Whisper(str(model_dir), device="cpu", compute_type=compute_type)
+    print(f"[INFO] CTranslate2 model loaded: {model_id} ({compute_type})")
+    return CTranslate2WhisperEngine(model, processor)
+
+
+class CTranslate2WhisperEngine(WhisperGenerateEngine):
+    """
+    CTranslate2（faster-whisperと同じ推論ランタイム）で文字起こしを行うエンジン
+
+    特徴量の抽出とデコードはWhisperGenerateEngineと共通で、
+    エンコーダー・デコーダーの実行のみをCTranslate2で行います。
+    """
+
+    def __init__(self, model, processor):
+        """
+        エンジンの初期化
+
+        Parameters
+        ----------
+        model : ctranslate2.models.Whisper
+            読み込み済みのCTranslate2モデル
+        processor : transformers.WhisperProcessor
+            特徴量抽出器とトークナイザー
+        """
+        super().__init__(model, processor, "cpu", torch.float32)
+        self._special_ids = {
+            token: self.tokenizer.convert_tokens_to_ids(token)
+            for token in ("<|transcribe|>", "<|notimestamps|>")
+        }
+
+        # 無音確率はプレフィックスの後に1トークンだけ生成して取得する
+        self.supports_no_speech_check = True
+
+        # CTranslate2のgenerateはPythonのLogitsProcessorを受け付けないため、語彙はプロンプトのみで渡す
+        self.supports_hotwords = False
+
+    def get_prompt_tokens(self, prompt):
+        """
+        プロンプトのトークンIDを返す
+
+        Parameters
+        ----------
+        prompt : str or CompiledPrompt
+            プロンプト文字列、またはトークン化済みのプロンプト
+
+        Returns
+        -------
+        list of int
+            <|startofprev|>付きのプロンプトトークンID（最大224トークン）、プロンプトがない場合は空リスト
+        """
+        compiled = self.compile_prompt(prompt)
+        return compiled.token_ids if compiled else []
+
+    def transcribe_batch(self, arrays, sampling_rate, language=None, prompt=None, max_new_tokens=128,
+                         return_timestamps=False, n_frames=None, no_speech_threshold=None, temperature=0.0,
+                         cache_keys=None):
+        """
+        30秒以下の複数の音声をまとめて文字起こしする（引数・戻り値はWhisperGenerateEngineと同じ）
+
+        CTranslate2のエンコーダーは3000フレーム固定のため、n_framesは無視されます。
+        無音判定では、すべての音声が無音の場合のみ本体の生成を省きます（エンコーダー出力は部分的に選択できないため）。
+        エンコーダー出力はNumPy配列でキャッシュし、キャッシュにない音声のみエンコーダーを実行します。
+        """
+        start_time = time.perf_counter()
+        use_encoder_cache = self.encoder_cache is not None and cache_keys is not None
+        cached = [None] * len(arrays)
+        if use_encoder_cache:
+            cached = [self.encoder_cache.get((key, self.max_frames)) for key in cache_keys]
+        missing = [index for index, hidden in enumerate(cached) if hidden is None]
+        features = None
+        if missing:
+            input_features = self.feature_extractor(
+                [arrays[index] for index in missing], sampling_rate=sampling_rate, return_tensors="np"
+            ).input_features.astype(np.float32)
+            features = ctranslate2.StorageView.from_array(np.ascontiguousarray(input_features))
+        features_time = time.perf_counter()
+
+        # エンコーダーは1回だけ実行し、言語検出と生成で共有する
+        encoder_output = self.model.encode(features, to_cpu=False) if features is not None else None
+        if use_encoder_cache:
+            if encoder_output is not None:
+                hidden_states = np.array(encoder_output)
+                for row, index in enumerate(missing):
+                    hidden = cached[index] = hidden_states[row:row + 1].copy()
+                    self.encoder_cache.put((cache_keys[index], self.max_frames), hidden, size=hidden.nbytes)
+            if len(missing) < len(arrays):
+                hidden_states = np.ascontiguousarray(np.concatenate(cached))
+                encoder_output = ctranslate2.StorageView.from_array(hidden_states)
+        if language and language != "auto":
+            language_tokens = [f"<|{language}|>"] * len(arrays)
+        else:
+            language_tokens = [detected[0][0] for detected in self.model.detect_language(encoder_output)]
+
+        decoder_prefixes = []
+        for language_token in language_tokens:
+            prefix = [self.start_token_id, self.tokenizer.convert_tokens_to_ids(language_token),
+                      self._special_ids["<|transcribe|>"]]
+            if not return_timestamps:
+                prefix.append(self._special_ids["<|notimestamps|>"])
+            decoder_prefixes.append(prefix)
+        prompt_tokens = self.get_prompt_tokens(prompt)
+        prompts = [prompt_tokens + prefix for prefix in decoder_prefixes]
+
+        no_speech_probs = None
+        if no_speech_threshold is not None:
+            # 1トークンだけ生成して無音確率を取得し、すべて無音であれば本体の生成を省く
+            probes = self.model.generate(
+                encoder_output, prompts, beam_size=1, max_length=len(prompts[0]) + 1, return_no_speech_prob=True
+            )
+            no_speech_probs = [probe.no_speech_prob for probe in probes]
+
+        sampling_kwargs = {}
+        if temperature > 0:
+            # 上位K件に限らず全語彙から温度付きでサンプリングする
+            sampling_kwargs = {"sampling_temperature": temperature, "sampling_topk": 0}
+
+        results = [None] * len(arrays)
+        if no_speech_probs is None or any(prob <= no_speech_threshold for prob in no_speech_probs):
+            results = self.model.generate(
+                encoder_output,
+                prompts,
+                beam_size=1,
+                max_length=min(MAX_DECODER_LENGTH, len(prompts[0]) + max_new_tokens),
+                suppress_blank=True,
+                **sampling_kwargs
+            )
+        generate_time = time.perf_counter()
+
+        # 生成結果にはプロンプトが含まれないため、デコーダーの先頭トークンを付けて共通のデコードを行う
+        outputs = []
+        for index, (prefix, result) in enumerate(zip(decoder_prefixes, results)):
+            if no_speech_probs is None:
+                outputs.append(self.decode(prefix + list(result.sequences_ids[0]), return_timestamps))
+            elif no_speech_probs[index] > no_speech_threshold:
+                outputs.append(self.no_speech_result(no_speech_probs[index]))
+            else:
+                output = self.decode(prefix + list(result.sequences_ids[0]), return_timestamps)
+                outputs.append(dict(output, no_speech=False, no_speech_prob=no_speech_probs[index]))
+        end_time = time.perf_counter()
+
+        self.last_timings = {
+            "features": features_time - start_time,
+            "generate": generate_time - features_time,
+            "decode": end_time - generate_time,
+            "total": end_time - start_time,
+            "batch_size": len(arrays),
+            "encoder_cached": len(arrays) - len(missing),
+        }
+        return outputs
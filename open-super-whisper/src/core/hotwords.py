@@ -0,0 +1,131 @@
+import hashlib
+
+import torch
+from transformers import LogitsProcessor
+
+
+# 部分一致した語彙の続きのトークンに加えるロジットの大きさ
+HOTWORD_BOOST = 2.0
+
+
+class _TrieNode:
+    """トークンIDのトライ木のノード"""
+
+    __slots__ = ("children", "terminal", "_child_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+        self._child_ids = {}
+
+    def child_ids(self, device):
+        """子ノードのトークンIDをテンソルで返す（デバイスごとに1回だけ作成）"""
+        key = str(device)
+        if key not in self._child_ids:
+            self._child_ids[key] = torch.tensor(list(self.children), dtype=torch.long, device=device)
+        return self._child_ids[key]
+
+
+class HotwordTrie:
+    """
+    カスタム語彙をトークン列に変換したトライ木
+
+    語彙は文頭・文中のどちらにも現れるため、先頭に空白を付けた表記と付けない表記の両方を登録します。
+    """
+
+    def __init__(self, terms, tokenizer):
+        """
+        トライ木の作成（語彙が変わったときに1回だけ）
+
+        Parameters
+        ----------
+        terms : list of str
+            カスタム語彙
+        tokenizer : transformers.WhisperTokenizer
+            モデルのトークナイザー
+        """
+        self.root = _TrieNode()
+        self.size = 0
+        # 語彙のハッシュ（文字起こし結果のキャッシュのキーに使う）
+        self.digest = hashlib.blake2b("\n".join(terms).encode(), digest_size=8).hexdigest()
+        variants = []
+        for term in terms:
+            term = term.strip()
+            if term:
+                variants.extend((term, " " + term))
+        if not variants:
+            return
+
+        for token_ids in tokenizer(variants, add_special_tokens=False).input_ids:
+            if not token_ids:
+                continue
+            node = self.root
+            for token_id in token_ids:
+                child = node.children.get(token_id)
+                if child is None:
+                    child = node.children[token_id] = _TrieNode()
+                    self.size += 1
+                node = child
+            node.terminal = True
+
+    def __bool__(self):
+        return bool(self.root.children)
+
+
+class HotwordLogitsProcessor(LogitsProcessor):
+    """
+    部分一致したカスタム語彙の続きのトークンのロジットを上げるLogitsProcessor
+
+    生成済みのトークン列で一致している語彙の途中（トライ木のノード）を保持し、
+    各ステップでは新しいトークンでそれらを1段進めて、子ノードのトークンに加点します。
+    1ステップの処理量は語彙数ではなく一致中の語彙の数に比例します。
+    状態を持つため、文字起こしの呼び出しごとに新しいインスタンスを作成してください。
+    """
+
+    def __init__(self, trie, boost=HOTWORD_BOOST):
+        """
+        LogitsProcessorの初期化
+
+        Parameters
+        ----------
+        trie : HotwordTrie
+            カスタム語彙のトライ木
+        boost : float, optional
+            部分一致した語彙の続きのトークンに加えるロジット
+        """
+        self.trie = trie
+        self.boost = boost
+        self._start = None
+        self._length = None
+        self._active = None
+
+    def _advance(self, nodes, token_id):
+        """一致中のノードをトークン1つ分進め、新たに一致し始めた語彙を加える"""
+        advanced = [node.children[token_id] for node in nodes if token_id in node.children]
+        started = self.trie.root.children.get(token_id)
+        if started is not None:
+            advanced.append(started)
+        return [node for node in advanced if node.children]
+
+    def __call__(self, input_ids, scores):
+        batch_size, length = input_ids.shape
+        if self._active is None or len(self._active) != batch_size or length <= self._start:
+            # 新しい生成の最初のステップ（プロンプトと先頭の特殊トークンは照合しない）
+            self._start = length
+            self._active = [[] for _ in range(batch_size)]
+        elif length == self._length + 1:
+            for row, token_id in enumerate(input_ids[:, -1].tolist()):
+                self._active[row] = self._advance(self._active[row], token_id)
+        else:
+            # 投機的デコーディングの検証などで長さが飛んだ場合は生成済みの部分を照合し直す
+            for row, tokens in enumerate(input_ids[:, self._start:].tolist()):
+                nodes = []
+                for token_id in tokens:
+                    nodes = self._advance(nodes, token_id)
+                self._active[row] = nodes
+        self._length = length
+
+        for row, nodes in enumerate(self._active):
+            for node in nodes:
+                scores[row, node.child_ids(scores.device)] += self.boost
+        return scores
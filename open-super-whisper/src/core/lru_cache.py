@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_cache_key(path):
+    """
+    ファイルの内容が変わると変わるキャッシュのキーを返す
+
+    同じファイル名に上書き保存された場合（録音ファイル名の秒単位の重複など）に
+    古い内容を返さないよう、パスに加えてサイズと更新時刻（ナノ秒）を含めます。
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパス
+
+    Returns
+    -------
+    tuple
+        (絶対パス, サイズ, 更新時刻（ナノ秒）)
+    """
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+class LRUCache:
+    """
+    合計サイズ（バイト）で上限を設けたスレッドセーフなLRUキャッシュ
+
+    上限（合計サイズ・件数）を超えた場合は最後に使われた時刻が古いものから削除します。
+    """
+
+    def __init__(self, max_bytes, sizeof=None, max_entries=None):
+        """
+        キャッシュの初期化
+
+        Parameters
+        ----------
+        max_bytes : int
+            保持する値の合計サイズの上限（バイト）
+        sizeof : callable, optional
+            値のサイズ（バイト）を返す関数（putでsizeを省略した場合に使う）
+        max_entries : int, optional
+            保持する件数の上限（Noneの場合は合計サイズのみで制限する）
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        値を取得し、最後に使われたものとして扱う
+
+        Parameters
+        ----------
+        key : hashable
+            キー
+        default : optional
+            キーがない場合に返す値
+
+        Returns
+        -------
+        object
+            保持している値、ない場合はdefault
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        値を保持し、上限を超えた場合は古い値を削除する
+
+        Parameters
+        ----------
+        key : hashable
+            キー
+        value : object
+            保持する値
+        size : int, optional
+            値のサイズ（バイト、省略時はsizeofで計算）
+
+        Returns
+        -------
+        bool
+            保持したかどうか（単独で上限を超える値は保持しない）
+        """
+        if size is None:
+            size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.max_bytes:
+                return False
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+            return True
+
+    def pop(self, key, default=None):
+        """
+        値を削除して返す
+
+        Parameters
+        ----------
+        key : hashable
+            キー
+        default : optional
+            キーがない場合に返す値
+
+        Returns
+        -------
+        object
+            削除した値、ない場合はdefault
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def keys(self):
+        """
+        保持しているキーを返す
+
+        Returns
+        -------
+        list
+            最後に使われた時刻が古い順のキー
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def reserve(self, size):
+        """
+        これから追加する値の分の空きを作る（合計サイズ・件数が上限に収まるまで古い値を削除する）
+
+        大きな値を作成する前に呼び出すと、作成中に古い値と新しい値が同時に存在する量を抑えられます。
+
+        Parameters
+        ----------
+        size : int
+            追加する値のサイズ（バイト）
+        """
+        with self._lock:
+            while self._entries and (self._bytes + size > self.max_bytes
+                                     or (self.max_entries is not None and len(self._entries) + 1 > self.max_entries)):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _evict(self):
+        """合計サイズ・件数が上限に収まるまで古い値を削除する（ロック取得済みで呼び出す）"""
+        while self._entries and (self._bytes > self.max_bytes
+                                 or (self.max_entries is not None and len(self._entries) > self.max_entries)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        """
+        合計サイズの上限を変更する（超えている場合は古い値を削除する）
+
+        Parameters
+        ----------
+        max_bytes : int
+            保持する値の合計サイズの上限（バイト）
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def set_max_entries(self, max_entries):
+        """
+        件数の上限を変更する（超えている場合は古い値を削除する）
+
+        Parameters
+        ----------
+        max_entries : int or None
+            保持する件数の上限（Noneで件数の制限なし）
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def clear(self):
+        """すべての値を削除する"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """
+        キャッシュの使用状況を取得する
+
+        Returns
+        -------
+        dict
+            ヒット数（hits）、ミス数（misses）、ヒット率（hit_rate）、削除数（evictions）、
+            件数（entries）、合計サイズ（bytes）、上限（max_bytes、max_entries）
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+            }
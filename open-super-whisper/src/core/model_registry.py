@@ -0,0 +1,97 @@
+import torch
+
+
+# 常駐させるモデルの上限（件数・合計サイズ）
+MODEL_REGISTRY_MAX_MODELS = 2
+MODEL_REGISTRY_MAX_BYTES = 6 * 1024 * 1024 * 1024
+
+
+def model_nbytes(model):
+    """
+    モデルの重み・バッファのメモリ上のサイズ（バイト）を返す
+
+    動的量子化したLinear層のパック済みの重みも含め、共有している重み（埋め込みと出力層など）は1回だけ数えます。
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        読み込み済みのモデル
+
+    Returns
+    -------
+    int
+        サイズ（バイト）
+    """
+    total = 0
+    seen = set()
+    for value in model.state_dict().values():
+        for tensor in value if isinstance(value, (tuple, list)) else (value,):
+            if not isinstance(tensor, torch.Tensor):
+                continue
+            key = (tensor.data_ptr(), tensor.nelement())
+            if key in seen:
+                continue
+            seen.add(key)
+            total += tensor.element_size() * tensor.nelement()
+    return total
+
+
+class ResidentModel:
+    """
+    メモリに常駐させるモデルと、モデルごとに作成するプロセッサー・パイプライン・直接推論エンジンの組
+
+    モデルを切り替えるときはこの組をまとめて差し替えるため、読み込み済みのモデルへの切り替えでは
+    パイプラインやエンジンを作り直す必要がありません。
+    """
+
+    def __init__(self, model_id, quantization_mode, model, processor, pipe, engine, prompt_ids_supported):
+        """
+        常駐モデルの初期化
+
+        Parameters
+        ----------
+        model_id : str
+            モデルのID
+        quantization_mode : str
+            量子化モード
+        model : transformers.WhisperForConditionalGeneration
+            読み込み済みのモデル
+        processor : transformers.WhisperProcessor
+            特徴量抽出器とトークナイザー
+        pipe : transformers.Pipeline
+            ASRパイプライン
+        engine : WhisperGenerateEngine
+            直接推論エンジン
+        prompt_ids_supported : bool
+            パイプラインにprompt_idsを渡せるかどうか
+        """
+        self.model_id = model_id
+        self.quantization_mode = quantization_mode
+        self.model = model
+        self.processor = processor
+        self.pipe = pipe
+        self.engine = engine
+        self.prompt_ids_supported = prompt_ids_supported
+
+        # 投機的デコーディングのドラフトモデル（有効化時にモデルごとに読み込む）
+        self.draft_model = None
+        self.draft_model_id = None
+
+    @property
+    def key(self):
+        """常駐モデルのキー (モデルID, 量子化モード)"""
+        return self.model_id, self.quantization_mode
+
+    def nbytes(self):
+        """
+        モデル（ドラフトモデルを含む）のメモリ上のサイズ（バイト）を返す
+
+        Returns
+        -------
+        int
+            サイズ（バイト）
+        """
+        size = model_nbytes(self.model)
+        if self.draft_model is not None:
+            size += model_nbytes(self.draft_model)
+        return size
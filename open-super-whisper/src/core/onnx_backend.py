@@ -0,0 +1,176 @@
+import os
+import platform
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from optimum.version import __version__ as optimum_version
+except ImportError:
+    onnxruntime = None
+
+from src.core.whisper_engine import WhisperGenerateEngine
+
+
+# エクスポートしたONNXモデルの保存先
+ONNX_CACHE_DIR = os.path.expanduser("~/.cache/open_super_whisper/onnx")
+
+# int8量子化したONNXファイルの接尾辞
+QUANTIZED_SUFFIX = "_quantized"
+
+
+def is_onnx_available():
+    """
+    ONNX Runtimeバックエンドが使えるかどうか（onnxruntimeとoptimumが必要）
+
+    Returns
+    -------
+    bool
+        使用可能かどうか
+    """
+    return onnxruntime is not None
+
+
+def onnx_export_dir(model_id):
+    """
+    ONNXモデルの保存先ディレクトリを返す
+
+    エクスポート形式はoptimum/onnxruntimeのバージョンに依存するため、ディレクトリ名に含めます。
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+
+    Returns
+    -------
+    pathlib.Path
+        保存先のディレクトリ
+    """
+    name = f"{model_id.replace('/', '--')}--optimum{optimum_version}-ort{onnxruntime.__version__}"
+    return Path(ONNX_CACHE_DIR) / re.sub(r"[^\w.\-+]", "_", name)
+
+
+def _onnx_files(export_dir, quantized):
+    """エクスポート済みのONNXファイル名（量子化済み/未量子化）を返す"""
+    return sorted(
+        path.name for path in Path(export_dir).glob("*.onnx")
+        if path.stem.endswith(QUANTIZED_SUFFIX) == quantized
+    )
+
+
+def export_onnx_model(model_id, export_dir, cache_dir=None):
+    """
+    Hugging FaceのWhisperモデルをエンコーダー・デコーダー（KVキャッシュ付き）のONNXにエクスポートする
+
+    途中で中断しても壊れたエクスポートを使わないよう、一時ディレクトリに書き出してから置き換えます。
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    export_dir : pathlib.Path
+        保存先のディレクトリ
+    cache_dir : str, optional
+        Hugging Faceのキャッシュディレクトリ
+    """
+    print(f"[INFO] Exporting {model_id} to ONNX (first use only, this may take a few minutes)")
+    start_time = time.time()
+    export_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=export_dir.parent, prefix=".export-")
+    try:
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            model_id, export=True, use_cache=True, cache_dir=cache_dir
+        )
+        model.save_pretrained(tmp_dir)
+        del model
+        if export_dir.exists():
+            shutil.rmtree(export_dir)
+        os.replace(tmp_dir, export_dir)
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"[INFO] ONNX export completed in {time.time() - start_time:.1f}s: {export_dir}")
+
+
+def quantize_onnx_model(export_dir):
+    """
+    エクスポートしたONNXモデルを動的int8量子化する（MatMulの重みをint8に変換）
+
+    Parameters
+    ----------
+    export_dir : pathlib.Path
+        エクスポート済みのディレクトリ（量子化したファイルは同じディレクトリに保存）
+    """
+    print(f"[INFO] Quantizing ONNX model to int8: {export_dir}")
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        config = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    else:
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+    for file_name in _onnx_files(export_dir, quantized=False):
+        quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+        quantizer.quantize(save_dir=export_dir, quantization_config=config, file_suffix=QUANTIZED_SUFFIX[1:])
+
+
+def load_onnx_engine(model_id, processor, int8=False, cache_dir=None):
+    """
+    ONNX Runtimeで推論する文字起こしエンジンを作成する（未エクスポートの場合はエクスポートする）
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    processor : transformers.WhisperProcessor
+        特徴量抽出器とトークナイザー
+    int8 : bool, optional
+        int8量子化したモデルを使用するかどうか
+    cache_dir : str, optional
+        Hugging Faceのキャッシュディレクトリ
+
+    Returns
+    -------
+    WhisperGenerateEngine
+        ONNX Runtimeのモデルで推論するエンジン
+    """
+    if not is_onnx_available():
+        raise ImportError("ONNX Runtime backend requires onnxruntime and optimum (pip install optimum[onnxruntime])")
+
+    export_dir = onnx_export_dir(model_id)
+    if not _onnx_files(export_dir, quantized=False):
+        export_onnx_model(model_id, export_dir, cache_dir)
+    if int8 and not _onnx_files(export_dir, quantized=True):
+        quantize_onnx_model(export_dir)
+
+    # グラフ最適化をすべて有効にしてCPUで実行
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    suffix = QUANTIZED_SUFFIX if int8 else ""
+    file_names = {}
+    for file_name in _onnx_files(export_dir, quantized=int8):
+        stem = file_name[:-len(".onnx")]
+        base = stem[:-len(suffix)] if suffix else stem
+        if base == "encoder_model":
+            file_names["encoder_file_name"] = file_name
+        elif base == "decoder_model":
+            file_names["decoder_file_name"] = file_name
+        elif base == "decoder_with_past_model":
+            file_names["decoder_with_past_file_name"] = file_name
+
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(
+        export_dir,
+        use_cache="decoder_with_past_file_name" in file_names,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+        **file_names
+    )
+    print(f"[INFO] ONNX Runtime model loaded: {model_id} ({'int8' if int8 else 'float32'})")
+    return WhisperGenerateEngine(model, processor, "cpu", torch.float32)
@@ -0,0 +1,112 @@
+import hashlib
+import inspect
+
+import torch
+
+
+# Whisperのデコーダーの最大長とプロンプトに使える最大トークン数（<|startofprev|>を除く）
+MAX_DECODER_LENGTH = 448
+MAX_PROMPT_TOKENS = MAX_DECODER_LENGTH // 2 - 1
+
+# <|startoftranscript|>、言語、タスク、<|notimestamps|>
+DECODER_PREFIX_TOKENS = 4
+
+
+class CompiledPrompt:
+    """
+    トークン化済みのプロンプト
+
+    カスタム語彙・システム指示が変わったときに1回だけ作成し、文字起こしのたびに
+    文字列の組み立てやトークン化を行わずに済むようにします。
+    Whisperのプロンプトの上限（223トークン）を超える場合は、Whisperの学習時と同じく末尾側を残します。
+    """
+
+    def __init__(self, text, tokenizer):
+        """
+        プロンプトのトークン化
+
+        Parameters
+        ----------
+        text : str
+            プロンプト文字列
+        tokenizer : transformers.WhisperTokenizer
+            モデルのトークナイザー
+        """
+        self.text = text
+        tokens = tokenizer.encode(" " + text.strip(), add_special_tokens=False) if text else []
+        self.truncated = len(tokens) > MAX_PROMPT_TOKENS
+        if self.truncated:
+            tokens = tokens[-MAX_PROMPT_TOKENS:]
+            print(f"[WARNING] Prompt exceeds {MAX_PROMPT_TOKENS} tokens, keeping the last {MAX_PROMPT_TOKENS}")
+
+        # <|startofprev|>付きのトークンID（processor.get_prompt_idsと同じ形式）
+        self.token_ids = [tokenizer.convert_tokens_to_ids("<|startofprev|>")] + tokens if tokens else []
+        self.token_count = len(tokens)
+        self._tensors = {}
+
+        # トークン列のハッシュ（文字起こし結果のキャッシュのキーに使う）
+        self.digest = hashlib.blake2b(",".join(map(str, self.token_ids)).encode(), digest_size=8).hexdigest()
+
+    def __bool__(self):
+        return bool(self.token_ids)
+
+    def __len__(self):
+        """<|startofprev|>を含むトークン数"""
+        return len(self.token_ids)
+
+    def input_ids(self, device):
+        """
+        プロンプトのトークンIDをテンソルで返す（デバイスごとに1回だけ作成）
+
+        Parameters
+        ----------
+        device : str
+            テンソルを配置するデバイス
+
+        Returns
+        -------
+        torch.Tensor or None
+            model.generateのprompt_idsに渡せる1次元テンソル、プロンプトがない場合はNone
+        """
+        if not self.token_ids:
+            return None
+        device = str(device)
+        if device not in self._tensors:
+            self._tensors[device] = torch.tensor(self.token_ids, dtype=torch.long, device=device)
+        return self._tensors[device]
+
+    def max_new_tokens(self, requested):
+        """
+        プロンプトと合わせてデコーダーの最大長に収まる生成トークン数を返す
+
+        Parameters
+        ----------
+        requested : int
+            希望する最大生成トークン数
+
+        Returns
+        -------
+        int
+            デコーダーの最大長を超えない最大生成トークン数
+        """
+        return min(requested, MAX_DECODER_LENGTH - len(self.token_ids) - DECODER_PREFIX_TOKENS)
+
+
+def probe_prompt_support(model):
+    """
+    読み込んだモデルのgenerateがprompt_idsを受け付けるかどうかを調べる（モデルの読み込み時に1回だけ）
+
+    Parameters
+    ----------
+    model : transformers.PreTrainedModel
+        読み込み済みのWhisperモデル
+
+    Returns
+    -------
+    bool
+        generate(prompt_ids=...)でプロンプトを渡せるかどうか
+    """
+    try:
+        return "prompt_ids" in inspect.signature(model.generate).parameters
+    except (TypeError, ValueError):
+        return False
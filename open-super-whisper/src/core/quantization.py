@@ -0,0 +1,185 @@
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import torch
+import transformers
+from transformers import AutoConfig, AutoModelForSpeechSeq2Seq, GenerationConfig
+
+try:
+    # torchaoはインポート時に量子化テンソルをtorch.loadのsafe globalsに登録する
+    import torchao
+    from torchao.quantization import quantize_, int8_weight_only
+except ImportError:
+    torchao = None
+
+
+# 量子化済みモデルの保存先
+QUANTIZED_CACHE_DIR = os.path.expanduser("~/.cache/open_super_whisper/quantized")
+
+# 利用可能な量子化モード（CPU推論でのみ使用）
+# int4の重みのみ量子化（torchaoのint4_weight_only）はCUDAまたはbfloat16のCPUレイアウトが前提で、
+# float32のCPU推論では使えないため提供していない
+AVAILABLE_QUANTIZATIONS = [
+    {"id": "none", "name": "None (float32)", "description": "No quantization"},
+    {"id": "dynamic_int8", "name": "Dynamic int8", "description": "int8 weights and activations for Linear layers (torch built-in)"},
+    {"id": "weight_only_int8", "name": "Weight-only int8", "description": "int8 weights, float32 activations for Linear layers (requires torchao)"},
+]
+
+
+def is_quantization_available(mode):
+    """
+    量子化モードが現在の環境で使えるかどうかを判定する
+
+    Parameters
+    ----------
+    mode : str
+        量子化モードのID
+
+    Returns
+    -------
+    bool
+        使用可能かどうか
+    """
+    if mode == "none":
+        return True
+    if mode == "dynamic_int8":
+        return bool(torch.backends.quantized.supported_engines)
+    if mode == "weight_only_int8":
+        return torchao is not None
+    return False
+
+
+def quantize_model(model, mode):
+    """
+    モデルのLinear層を量子化する
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        float32のWhisperモデル（CPU上）
+    mode : str
+        量子化モードのID
+
+    Returns
+    -------
+    torch.nn.Module
+        量子化したモデル
+    """
+    if mode == "dynamic_int8":
+        # Apple Silicon等のARM環境ではfbgemmが使えないためqnnpackを使用
+        engines = torch.backends.quantized.supported_engines
+        if "fbgemm" not in engines and "qnnpack" in engines:
+            torch.backends.quantized.engine = "qnnpack"
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if mode == "weight_only_int8":
+        if torchao is None:
+            raise ImportError("weight_only_int8 requires torchao (pip install torchao)")
+        quantize_(model, int8_weight_only())
+        return model
+
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def quantized_cache_path(model_id, mode):
+    """
+    量子化済みモデルの保存先パスを返す
+
+    ライブラリのバージョンが変わると保存形式の互換性が失われるため、ファイル名に含めます。
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    mode : str
+        量子化モードのID
+
+    Returns
+    -------
+    pathlib.Path
+        保存先のファイルパス
+    """
+    versions = f"torch{torch.__version__}-transformers{transformers.__version__}"
+    if mode == "weight_only_int8":
+        versions += f"-torchao{torchao.__version__}"
+    name = f"{model_id.replace('/', '--')}--{mode}--{versions}--state_dict.pt"
+    return Path(QUANTIZED_CACHE_DIR) / re.sub(r"[^\w.\-+]", "_", name)
+
+
+def load_quantized_model(model_id, mode, cache_dir=None):
+    """
+    保存済みの量子化モデルを読み込む
+
+    保存しているのはstate_dictのみのため、設定からモデルを組み立ててから重みを読み込みます。
+    ユーザーのキャッシュディレクトリのファイルで任意のコードが実行されないよう、
+    weights_only=Trueで読み込みます。
+
+    Parameters
+    ----------
+    model_id : str
+        モデルのID
+    mode : str
+        量子化モードのID
+    cache_dir : str, optional
+        モデル設定を読み込むHugging Faceのキャッシュディレクトリ
+
+    Returns
+    -------
+    torch.nn.Module or None
+        量子化済みモデル、保存されていない・読み込めない場合はNone
+    """
+    path = quantized_cache_path(model_id, mode)
+    if not path.exists():
+        return None
+    try:
+        state_dict = torch.load(path, map_location="cpu", weights_only=True)
+
+        config = AutoConfig.from_pretrained(model_id, cache_dir=cache_dir)
+        model = AutoModelForSpeechSeq2Seq.from_config(config)
+        model.generation_config = GenerationConfig.from_pretrained(model_id, cache_dir=cache_dir)
+        model.eval()
+
+        if mode == "dynamic_int8":
+            # 量子化済みのLinear層に置き換えてからパック済みの重みを読み込む
+            model = quantize_model(model, mode)
+            model.load_state_dict(state_dict)
+        else:
+            # torchaoの量子化テンソルはパラメータごと置き換える
+            model.load_state_dict(state_dict, assign=True)
+        print(f"[INFO] Loaded quantized model from cache: {path}")
+        return model
+    except Exception as e:
+        print(f"[WARNING] Failed to load quantized model cache {path}: {e}")
+        return None
+
+
+def save_quantized_model(model, model_id, mode):
+    """
+    量子化したモデルのstate_dictを保存する（次回以降の起動で再量子化を不要にする）
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        量子化済みモデル
+    model_id : str
+        モデルのID
+    mode : str
+        量子化モードのID
+    """
+    path = quantized_cache_path(model_id, mode)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中のファイルを読み込まないよう一時ファイル経由で置き換える
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        print(f"[INFO] Saved quantized model: {path} ({path.stat().st_size / (1024*1024):.0f} MB)")
+    except Exception as e:
+        print(f"[WARNING] Failed to save quantized model: {e}")
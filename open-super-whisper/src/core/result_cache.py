@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+# 文字起こし結果のキャッシュの保存先
+RESULT_CACHE_DIR = os.path.expanduser("~/.cache/open_super_whisper/results")
+
+# キャッシュの上限（JSONのバイト数）
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def audio_fingerprint(array, sampling_rate):
+    """
+    音声の内容のハッシュを計算する（ファイル名や録音方法によらず、同じ音声であれば同じ値）
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        float32の音声配列
+    sampling_rate : int
+        サンプリングレート
+
+    Returns
+    -------
+    str
+        16バイトのBLAKE2bハッシュの16進文字列
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(int(sampling_rate)).encode())
+    digest.update(np.ascontiguousarray(array, dtype=np.float32).data)
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts):
+    """
+    キャッシュのキーを作成する
+
+    Parameters
+    ----------
+    *parts
+        結果に影響する値（音声のハッシュ、モデルID、言語、プロンプトのハッシュなど、JSONに変換できるもの）
+
+    Returns
+    -------
+    str
+        キーの16進文字列
+    """
+    encoded = json.dumps(parts, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    文字起こし結果をSQLiteに保存する永続キャッシュ
+
+    結果はJSONで保存し、合計サイズが上限を超えた場合は最後に使われた時刻が古いものから削除します（LRU）。
+    複数のスレッドから呼び出せます。
+    """
+
+    def __init__(self, path=None, max_bytes=RESULT_CACHE_MAX_BYTES):
+        """
+        キャッシュを開く（ファイルがなければ作成する）
+
+        Parameters
+        ----------
+        path : str, optional
+            SQLiteファイルのパス（デフォルト: RESULT_CACHE_DIR/results.sqlite3）
+        max_bytes : int, optional
+            保存する結果の合計サイズの上限（バイト）
+        """
+        if path is None:
+            Path(RESULT_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+            path = str(Path(RESULT_CACHE_DIR) / "results.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._bytes, self._entries = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM results"
+        ).fetchone()
+
+    def get(self, key):
+        """
+        キャッシュした結果を取得する
+
+        Parameters
+        ----------
+        key : str
+            make_cache_keyで作成したキー
+
+        Returns
+        -------
+        dict or None
+            保存した結果、ない場合はNone
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._connection:
+                self._connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """
+        結果を保存し、上限を超えた場合は古い結果を削除する
+
+        Parameters
+        ----------
+        key : str
+            make_cache_keyで作成したキー
+        value : dict
+            JSONに変換できる結果
+        """
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._bytes -= row[0]
+                self._entries -= 1
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, encoded, size, time.time())
+            )
+            self._bytes += size
+            self._entries += 1
+            self._evict()
+
+    def _evict(self):
+        """合計サイズが上限に収まるまで最後に使われた時刻が古い結果を削除する（ロック取得済みで呼び出す）"""
+        while self._bytes > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT key, size FROM results ORDER BY accessed LIMIT 32"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._bytes -= size
+                self._entries -= 1
+
+    def set_max_bytes(self, max_bytes):
+        """
+        合計サイズの上限を変更する（超えている場合は古い結果を削除する）
+
+        Parameters
+        ----------
+        max_bytes : int
+            保存する結果の合計サイズの上限（バイト）
+        """
+        with self._lock, self._connection:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """保存したすべての結果を削除する"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
+            self._bytes = 0
+            self._entries = 0
+
+    def get_stats(self):
+        """
+        キャッシュの使用状況を取得する
+
+        Returns
+        -------
+        dict
+            ヒット数（hits）、ミス数（misses）、ヒット率（hit_rate）、件数（entries）、
+            合計サイズ（bytes）、上限（max_bytes）
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": self._entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self):
+        """データベースを閉じる"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,290 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class StreamingTranscriptionSession:
+    """
+    録音中に音声ウィンドウを逐次文字起こしするセッション
+
+    AudioRecorderから受け取った音声ブロックをバックグラウンドで蓄積し、
+    ウィンドウ長に達するたびに文字起こしして確定させます。
+    録音停止時には最後の未確定部分だけを文字起こしすればよいため、
+    録音時間に関わらず停止からテキスト取得までの待ち時間がほぼ一定になります。
+    """
+
+    def __init__(self, transcriber, language=None, sample_rate=16000,
+                 window_seconds=20.0, boundary_search_seconds=2.0, min_tail_seconds=0.3):
+        """
+        逐次文字起こしセッションの初期化
+
+        Parameters
+        ----------
+        transcriber : WhisperTranscriber
+            文字起こしに使用するインスタンス
+        language : str, optional
+            文字起こしの言語コード（None または空文字列で自動検出）
+        sample_rate : int, optional
+            入力音声のサンプリングレート（デフォルト: 16000Hz）
+        window_seconds : float, optional
+            1回に文字起こしするウィンドウの長さ（秒）
+        boundary_search_seconds : float, optional
+            単語の途中で切らないよう、ウィンドウ末尾から無音に近い区切り位置を探す範囲（秒）
+        min_tail_seconds : float, optional
+            停止時に残った音声がこれより短い場合は文字起こしを省略する（秒）
+        """
+        self.transcriber = transcriber
+        self.language = language
+        self.sample_rate = sample_rate
+        self._window_samples = int(window_seconds * sample_rate)
+        self._search_samples = min(int(boundary_search_seconds * sample_rate), self._window_samples // 2)
+        self._min_tail_samples = int(min_tail_seconds * sample_rate)
+
+        # オーディオスレッドからの音声ブロック受け渡し用キュー
+        self._queue = queue.Queue()
+
+        # 未確定の音声と確定済みテキスト（ワーカースレッドのみが触る）
+        self._pending = []
+        self._pending_samples = 0
+        self._committed = []
+
+        self._cancelled = False
+        self._failed = False
+        self._error = None
+        self._windows_committed = 0
+        self._windows_with_speech = 0
+        self._windows_transcribed = 0
+        self._tail_transcription_time = 0.0
+
+        self._worker = threading.Thread(target=self._run)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def feed(self, chunk):
+        """
+        録音した音声ブロックをセッションに渡す
+
+        オーディオスレッドから呼ばれるため、キューに積むだけで即座に戻ります。
+        ワーカーが失敗した後は誰も消費しないため、キューに積みません。
+
+        Parameters
+        ----------
+        chunk : numpy.ndarray
+            (frames, channels) または (frames,) 形状のfloat32音声ブロック
+        """
+        if not self._cancelled and not self._failed:
+            self._queue.put_nowait(chunk)
+
+    def finish(self, timeout=None):
+        """
+        残りの音声を文字起こしし、全体のテキストを返す
+
+        Parameters
+        ----------
+        timeout : float, optional
+            ワーカースレッドの終了を待つ最大時間（秒）
+
+        Returns
+        -------
+        str
+            確定済みウィンドウと最後の部分を連結した文字起こし結果
+        """
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+        if self._error is not None:
+            raise self._error
+
+        return self.get_text()
+
+    def cancel(self):
+        """
+        セッションを中断する（未処理の音声は破棄される）
+        """
+        self._cancelled = True
+        self._queue.put(None)
+
+    def has_failed(self):
+        """
+        ウィンドウの文字起こしに失敗してセッションが停止したかどうか
+
+        Returns
+        -------
+        bool
+            失敗していればTrue（以降の音声は受け付けない）
+        """
+        return self._failed
+
+    def get_text(self):
+        """
+        現在までに確定したテキストを取得する
+
+        Returns
+        -------
+        str
+            確定済みテキスト
+        """
+        return _join_transcripts(self._committed)
+
+    def is_no_speech(self):
+        """
+        文字起こししたすべてのウィンドウが無音と判定されたかどうか
+
+        Returns
+        -------
+        bool
+            1つ以上のウィンドウを文字起こしし、そのすべてが無音と判定された場合はTrue
+        """
+        return self._windows_transcribed > 0 and self._windows_with_speech == 0
+
+    def get_windows_committed(self):
+        """
+        録音中に確定したウィンドウ数を取得する
+
+        Returns
+        -------
+        int
+            確定済みウィンドウ数（最後の部分は含まない）
+        """
+        return self._windows_committed
+
+    def get_tail_transcription_time(self):
+        """
+        停止後に最後の部分の文字起こしにかかった時間を取得する
+
+        Returns
+        -------
+        float
+            最後の部分の文字起こし時間（秒）
+        """
+        return self._tail_transcription_time
+
+    def _run(self):
+        """
+        音声ブロックを蓄積し、ウィンドウ単位で文字起こしするワーカー
+        """
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    break
+                if self._cancelled:
+                    continue
+
+                # モノラル1次元配列に変換
+                if chunk.ndim > 1:
+                    chunk = chunk[:, 0] if chunk.shape[1] == 1 else chunk.mean(axis=1)
+                self._pending.append(chunk)
+                self._pending_samples += len(chunk)
+
+                # ウィンドウ長に達したら確定させる
+                while self._pending_samples >= self._window_samples and not self._cancelled:
+                    self._commit_window()
+
+            # 停止時: 残った部分のみ文字起こし
+            if not self._cancelled and self._pending_samples >= self._min_tail_samples:
+                start_time = time.time()
+                audio = np.concatenate(self._pending)
+                self._pending = []
+                self._pending_samples = 0
+                self._transcribe_and_commit(audio)
+                self._tail_transcription_time = time.time() - start_time
+
+        except Exception as e:
+            print(f"[ERROR] Streaming transcription failed: {e}")
+            self._error = e
+            self._failed = True
+            # 以降は消費されないため、キューに残った音声を解放する
+            self._pending = []
+            self._pending_samples = 0
+            try:
+                while True:
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    def _commit_window(self):
+        """
+        未確定音声の先頭1ウィンドウ分を切り出して文字起こしする
+        """
+        audio = np.concatenate(self._pending)
+        cut = self._find_cut(audio)
+
+        # 区切り以降は次のウィンドウに持ち越す
+        rest = audio[cut:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_samples = len(rest)
+
+        self._transcribe_and_commit(audio[:cut])
+        self._windows_committed += 1
+        print(f"[INFO] Streaming window committed: {cut / self.sample_rate:.2f}s (pending: {self._pending_samples / self.sample_rate:.2f}s)")
+
+    def _find_cut(self, audio):
+        """
+        ウィンドウ末尾付近で最もエネルギーの低い位置を区切りとして返す
+
+        Parameters
+        ----------
+        audio : numpy.ndarray
+            未確定の音声（ウィンドウ長以上）
+
+        Returns
+        -------
+        int
+            区切り位置（サンプル）
+        """
+        frame = max(1, int(0.02 * self.sample_rate))
+        search_start = self._window_samples - self._search_samples
+        n_frames = self._search_samples // frame
+        if n_frames == 0:
+            return self._window_samples
+
+        region = audio[search_start:search_start + n_frames * frame]
+        energy = np.square(region).reshape(n_frames, frame).mean(axis=1)
+        quietest = int(np.argmin(energy))
+        return search_start + quietest * frame + frame // 2
+
+    def _transcribe_and_commit(self, audio):
+        """
+        音声を文字起こしして確定テキストに追加する
+
+        Parameters
+        ----------
+        audio : numpy.ndarray
+            16kHzモノラルの音声配列
+        """
+        text = self.transcriber.transcribe(audio, self.language)
+        self._windows_transcribed += 1
+        # ワーカースレッドでの直前の呼び出しの判定結果（他のスレッドの文字起こしの影響を受けない）
+        if self.transcriber.get_no_speech_tier() is None:
+            self._windows_with_speech += 1
+        if text and text.strip():
+            self._committed.append(text.strip())
+
+
+def _join_transcripts(parts):
+    """
+    ウィンドウごとのテキストを連結する
+
+    英数字同士の境界にのみ空白を入れ、日本語などの文字間には空白を入れません。
+
+    Parameters
+    ----------
+    parts : list of str
+        連結するテキスト
+
+    Returns
+    -------
+    str
+        連結したテキスト
+    """
+    result = ""
+    for part in parts:
+        if result and result[-1].isascii() and result[-1].isalnum() and part[0].isascii() and part[0].isalnum():
+            result += " "
+        elif result and result[-1] in ".,!?;:" and part[0].isascii():
+            result += " "
+        result += part
+    return result
@@ -0,0 +1,291 @@
+import numpy as np
+
+
+class VADResult:
+    """
+    無音除去の結果
+
+    除去後の音声と、除去後の時刻を元の音声の時刻に戻すための区間情報を保持します。
+    """
+
+    def __init__(self, samples, sample_rate, segments, original_length):
+        """
+        無音除去結果の初期化
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            無音を除去した音声
+        sample_rate : int
+            サンプリングレート
+        segments : list of tuple
+            残した区間の (元の音声での開始サンプル, 除去後の開始サンプル, 長さ) のリスト
+        original_length : int
+            元の音声のサンプル数
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.segments = segments
+        self.original_length = original_length
+
+    @property
+    def original_duration(self):
+        """元の音声の長さ（秒）"""
+        return self.original_length / self.sample_rate
+
+    @property
+    def duration(self):
+        """無音除去後の長さ（秒）"""
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def removed_seconds(self):
+        """除去した無音の合計（秒）"""
+        return self.original_duration - self.duration
+
+    @property
+    def leading_seconds(self):
+        """先頭で除去した無音（秒）"""
+        return self.segments[0][0] / self.sample_rate if self.segments else 0.0
+
+    @property
+    def trailing_seconds(self):
+        """末尾で除去した無音（秒）"""
+        if not self.segments:
+            return 0.0
+        start, _, length = self.segments[-1]
+        return (self.original_length - start - length) / self.sample_rate
+
+    @property
+    def has_speech(self):
+        """発話区間が見つかったかどうか"""
+        return bool(self.segments)
+
+    def to_original_time(self, seconds):
+        """
+        無音除去後の時刻を元の音声の時刻に変換する
+
+        Parameters
+        ----------
+        seconds : float
+            無音除去後の音声での時刻（秒）
+
+        Returns
+        -------
+        float
+            元の音声での時刻（秒）
+        """
+        if not self.segments:
+            return seconds
+        position = seconds * self.sample_rate
+        for start, kept_start, length in self.segments:
+            if position <= kept_start + length:
+                return (start + max(0.0, position - kept_start)) / self.sample_rate
+        start, kept_start, _ = self.segments[-1]
+        return (start + position - kept_start) / self.sample_rate
+
+    def get_stats(self):
+        """
+        除去した無音の内訳を返す
+
+        Returns
+        -------
+        dict
+            元の長さ・除去後の長さ・除去した秒数（合計/先頭/末尾/途中）
+        """
+        removed = self.removed_seconds
+        return {
+            "original_seconds": self.original_duration,
+            "kept_seconds": self.duration,
+            "removed_seconds": removed,
+            "leading_seconds": self.leading_seconds,
+            "trailing_seconds": self.trailing_seconds,
+            "internal_seconds": max(0.0, removed - self.leading_seconds - self.trailing_seconds),
+        }
+
+
+class EnergyVAD:
+    """
+    フレームエネルギーとゼロ交差率による軽量な音声区間検出（VAD）
+
+    NumPyのベクトル演算のみで処理するため、録音時間に比例したごく短い時間で完了します。
+    録音開始直後・停止直前の無音を取り除き、長い間（ま）を短く詰めることで、
+    エンコーダー・デコーダーが処理する音声を減らします。
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, threshold_db=12.0, min_energy_db=-55.0,
+                 zcr_threshold=0.3, hangover_ms=300, padding_ms=200, max_pause_ms=1000, keep_pause_ms=400):
+        """
+        VADの初期化
+
+        Parameters
+        ----------
+        sample_rate : int, optional
+            サンプリングレート（デフォルト: 16000Hz）
+        frame_ms : int, optional
+            判定するフレームの長さ（ミリ秒）
+        threshold_db : float, optional
+            ノイズフロア（下位10%のフレームエネルギー）からこれ以上大きいフレームを発話とみなす（dB）
+        min_energy_db : float, optional
+            これ以下のフレームは常に無音とみなす（dBFS）
+        zcr_threshold : float, optional
+            ゼロ交差率がこれを超えるフレームは、エネルギーが閾値より6dB低くても発話とみなす（無声子音対策）
+        hangover_ms : int, optional
+            発話の後に発話として残す長さ（語尾の減衰を切らないため、0で無効）
+        padding_ms : int, optional
+            発話の前に発話として残す長さ
+        max_pause_ms : int, optional
+            これより長い発話途中の無音を詰める（0で詰めない）
+        keep_pause_ms : int, optional
+            詰めた無音の代わりに残す長さ
+        """
+        self.sample_rate = sample_rate
+        self.frame = max(1, int(sample_rate * frame_ms / 1000))
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = int(hangover_ms / frame_ms)
+        self.padding_frames = int(padding_ms / frame_ms)
+        self.max_pause = int(sample_rate * max_pause_ms / 1000)
+        self.keep_pause = min(int(sample_rate * keep_pause_ms / 1000), self.max_pause) if self.max_pause else 0
+
+    def _frame_features(self, samples):
+        """フレームごとのエネルギー（dBFS）とゼロ交差率を計算する"""
+        n_frames = len(samples) // self.frame
+        frames = samples[:n_frames * self.frame].reshape(n_frames, self.frame)
+        energy_db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame
+        return energy_db, zcr
+
+    def speech_mask(self, samples):
+        """
+        フレームごとの発話判定を行う
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            1次元のfloat32音声配列
+
+        Returns
+        -------
+        numpy.ndarray
+            フレームごとの発話判定（bool配列、ハングオーバー・前方パディング適用済み）
+        """
+        energy_db, zcr = self._frame_features(samples)
+        n_frames = len(energy_db)
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        # ノイズフロアに対する相対閾値（マイクのゲインや環境ノイズに合わせる）
+        noise_floor = np.percentile(energy_db, 10)
+        threshold = max(noise_floor + self.threshold_db, self.min_energy_db)
+        mask = (energy_db > threshold) | ((energy_db > threshold - 6.0) & (zcr > self.zcr_threshold))
+
+        # ハングオーバー（後方）とパディング（前方）で発話区間を広げる
+        if self.hangover_frames or self.padding_frames:
+            kernel = np.ones(self.padding_frames + self.hangover_frames + 1, dtype=np.int32)
+            spread = np.convolve(mask.astype(np.int32), kernel, mode="full")
+            mask = spread[self.padding_frames:self.padding_frames + n_frames] > 0
+        return mask
+
+    def _speech_runs(self, samples, mask):
+        """発話フレームの連続区間の開始・終了サンプル位置を返す"""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1) * self.frame
+        ends = np.flatnonzero(edges == -1) * self.frame
+        if len(ends) and ends[-1] == len(mask) * self.frame:
+            # 最後のフレームまで発話の場合はフレームに満たない端数も残す
+            ends[-1] = len(samples)
+        return starts, ends
+
+    def segment(self, samples, max_seconds=30.0):
+        """
+        長い音声を発話の切れ目で分割し、max_seconds以下の発話区間のリストを返す
+
+        隣接する発話を区間の長さがmax_secondsを超えない範囲でまとめ、区間の間の無音は含めません。
+        1つの発話がmax_secondsを超える場合は、後半のうち最もエネルギーの小さいフレームで分割します。
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            1次元のfloat32音声配列
+        max_seconds : float, optional
+            区間の最大の長さ（秒）
+
+        Returns
+        -------
+        list of tuple
+            (開始サンプル, 終了サンプル) のリスト（時刻順）、発話が見つからない場合は空リスト
+        """
+        mask = self.speech_mask(samples)
+        if not mask.any():
+            return []
+        starts, ends = self._speech_runs(samples, mask)
+        max_length = int(max_seconds * self.sample_rate)
+
+        # 長すぎる発話は後半の最も静かなフレームで分割する
+        runs = []
+        energy_db = None
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            while end - start > max_length:
+                if energy_db is None:
+                    energy_db, _ = self._frame_features(samples)
+                low = (start + max_length // 2) // self.frame
+                high = (start + max_length) // self.frame
+                split = (low + int(np.argmin(energy_db[low:high]))) * self.frame
+                runs.append((start, split))
+                start = split
+            runs.append((start, end))
+
+        # 発話の切れ目で区切りつつ、max_secondsに収まる範囲でまとめる
+        segments = [list(runs[0])]
+        for start, end in runs[1:]:
+            if end - segments[-1][0] <= max_length:
+                segments[-1][1] = end
+            else:
+                segments.append([start, end])
+        return [tuple(segment) for segment in segments]
+
+    def process(self, samples):
+        """
+        先頭・末尾の無音を取り除き、発話途中の長い無音を詰める
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            1次元のfloat32音声配列
+
+        Returns
+        -------
+        VADResult
+            無音除去後の音声と区間情報（発話が見つからない場合は空の音声）
+        """
+        mask = self.speech_mask(samples)
+        if not mask.any():
+            return VADResult(samples[:0], self.sample_rate, [], len(samples))
+
+        starts, ends = self._speech_runs(samples, mask)
+
+        # 発話間の無音が長すぎなければそのまま残し、長い場合はkeep_pause分だけ残して詰める
+        keep_starts = [int(starts[0])]
+        keep_ends = []
+        for prev_end, next_start in zip(ends[:-1], starts[1:]):
+            gap = next_start - prev_end
+            if not self.max_pause or gap <= self.max_pause:
+                continue
+            half = self.keep_pause // 2
+            keep_ends.append(int(prev_end) + half)
+            keep_starts.append(int(next_start) - (self.keep_pause - half))
+        keep_ends.append(int(ends[-1]))
+
+        segments = []
+        pieces = []
+        kept = 0
+        for start, end in zip(keep_starts, keep_ends):
+            pieces.append(samples[start:end])
+            segments.append((start, kept, end - start))
+            kept += end - start
+
+        trimmed = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        return VADResult(trimmed, self.sample_rate, segments, len(samples))
@@ -0,0 +1,170 @@
+import unicodedata
+from collections import defaultdict
+
+
+# プロンプトに含めるカスタム語彙の上限（トークン数）
+VOCABULARY_TOKEN_BUDGET = 96
+
+
+def normalize_term(text):
+    """
+    語彙照合用に文字列を正規化する（NFKC・小文字化・空白の除去）
+
+    Parameters
+    ----------
+    text : str
+        正規化する文字列
+
+    Returns
+    -------
+    str
+        正規化した文字列
+    """
+    return "".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def _ngrams(text, n):
+    """文字n-gramの集合を返す（nより短い場合は文字列全体）"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class VocabularyIndex:
+    """
+    大量のカスタム語彙から、録音ごとにプロンプトへ含める語彙をトークン数の上限内で選ぶ索引
+
+    すべての語彙をプロンプトに入れるとデコーダーの前置部分が語彙数に比例して長くなるため、
+    最近の文字起こし結果に現れた語彙（完全一致）や、表記が近い語彙（誤認識の可能性が高い）を優先し、
+    残りの枠を登録順の語彙で埋めます。文字起こし結果との照合は文字n-gramの転置索引で行うため、
+    語彙数ではなく文字起こし結果の長さに比例した時間で済みます。
+    """
+
+    # 文字起こし結果ごとのスコアの減衰率（古い結果ほど影響を小さくする）
+    DECAY = 0.8
+    # 表記が近いとみなすn-gramの一致率
+    PARTIAL_MATCH_RATIO = 0.6
+
+    def __init__(self, terms, tokenizer, token_budget=VOCABULARY_TOKEN_BUDGET):
+        """
+        索引の作成（語彙が変わったときに1回だけ）
+
+        Parameters
+        ----------
+        terms : list of str
+            カスタム語彙
+        tokenizer : transformers.WhisperTokenizer
+            トークン数の計算に使うトークナイザー
+        token_budget : int, optional
+            選択する語彙の合計トークン数の上限
+        """
+        seen = set()
+        self.terms = []
+        for term in terms:
+            term = term.strip()
+            if term and term not in seen:
+                seen.add(term)
+                self.terms.append(term)
+        self.token_budget = token_budget
+
+        # 語彙ごとのトークン数（プロンプト内では空白区切りで並ぶため先頭に空白を付けて数える）
+        if self.terms:
+            encoded = tokenizer([" " + term for term in self.terms], add_special_tokens=False).input_ids
+            self.token_costs = [len(ids) for ids in encoded]
+        else:
+            self.token_costs = []
+
+        # 正規化した表記と文字n-gramの転置索引
+        self._keys = [normalize_term(term) for term in self.terms]
+        self._grams = [_ngrams(key, self._gram_size(key)) for key in self._keys]
+        self._index = defaultdict(list)
+        for term_id, grams in enumerate(self._grams):
+            for gram in grams:
+                self._index[gram].append(term_id)
+
+        self._scores = {}
+        self._selection = None
+        self.fits_all = sum(self.token_costs) <= token_budget
+
+    @staticmethod
+    def _gram_size(key):
+        """照合に使うn-gramの長さ（英数字は3文字、日本語などは2文字）"""
+        return 3 if key.isascii() else 2
+
+    def __len__(self):
+        return len(self.terms)
+
+    def observe(self, text):
+        """
+        文字起こし結果を記録し、次回のプロンプトに含める語彙の優先度を更新する
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果
+
+        Returns
+        -------
+        bool
+            選択される語彙が変わったかどうか
+        """
+        if self.fits_all or not text:
+            return False
+        key = normalize_term(text)
+        text_grams = _ngrams(key, 2) | _ngrams(key, 3)
+
+        scores = {term_id: score * self.DECAY for term_id, score in self._scores.items() if score * self.DECAY > 0.05}
+        counts = defaultdict(int)
+        for gram in text_grams:
+            for term_id in self._index.get(gram, ()):
+                counts[term_id] += 1
+        for term_id, count in counts.items():
+            if self._keys[term_id] in key:
+                # 結果に現れた語彙は続く録音でも使われやすい
+                scores[term_id] = scores.get(term_id, 0.0) + 1.0
+            else:
+                ratio = count / len(self._grams[term_id])
+                if ratio >= self.PARTIAL_MATCH_RATIO:
+                    # 表記の近い語彙は誤認識された可能性が高いため、プロンプトで補正する
+                    scores[term_id] = scores.get(term_id, 0.0) + ratio * 0.5
+        self._scores = scores
+
+        previous = self._selection
+        self._selection = None
+        return self.select() != previous
+
+    def select(self):
+        """
+        プロンプトに含める語彙をトークン数の上限内で選ぶ
+
+        Returns
+        -------
+        list of str
+            選択した語彙（優先度の高い順、同じ優先度では登録順）
+        """
+        if self.fits_all:
+            return list(self.terms)
+        if self._selection is None:
+            ranked = sorted(self._scores, key=lambda term_id: (-self._scores[term_id], term_id))
+            selected = []
+            chosen = set()
+            used = 0
+            for term_id in ranked:
+                if used + self.token_costs[term_id] <= self.token_budget:
+                    selected.append(term_id)
+                    chosen.add(term_id)
+                    used += self.token_costs[term_id]
+            # 残りの枠は登録順の語彙で埋める（枠が埋まるか、収まらない語彙が続いた時点で打ち切る）
+            skipped = 0
+            for term_id, cost in enumerate(self.token_costs):
+                if used >= self.token_budget or skipped > 32:
+                    break
+                if term_id in chosen:
+                    continue
+                if used + cost <= self.token_budget:
+                    selected.append(term_id)
+                    used += cost
+                else:
+                    skipped += 1
+            self._selection = [self.terms[term_id] for term_id in selected]
+        return self._selection
@@ -1,12 +1,32 @@
+import gc
 import os
 import json
+import threading
+import zlib
 import torch
 from pathlib import Path
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+from transformers import AutoModelForCausalLM, AutoModelForSpeechSeq2Seq, AutoProcessor, LogitsProcessorList, pipeline
 import soundfile as sf
 import numpy as np
 import time
 
+from src.core.audio_buffer import AudioBuffer
+from src.core.correction import VocabularyCorrector
+from src.core.whisper_engine import WhisperGenerateEngine
+from src.core.ctranslate2_backend import is_ctranslate2_available, load_ctranslate2_engine
+from src.core.onnx_backend import is_onnx_available, load_onnx_engine
+from src.core.lru_cache import LRUCache, file_cache_key
+from src.core.model_registry import MODEL_REGISTRY_MAX_BYTES, MODEL_REGISTRY_MAX_MODELS, ResidentModel
+from src.core.hotwords import HOTWORD_BOOST, HotwordLogitsProcessor, HotwordTrie
+from src.core.prompt import CompiledPrompt, probe_prompt_support
+from src.core.vad import EnergyVAD
+from src.core.vocabulary import VOCABULARY_TOKEN_BUDGET, VocabularyIndex
+from src.core.result_cache import RESULT_CACHE_MAX_BYTES, ResultCache, audio_fingerprint, make_cache_key
+from src.core.quantization import (
+    AVAILABLE_QUANTIZATIONS, is_quantization_available, quantize_model,
+    load_quantized_model, save_quantized_model
+)
+
 
 class WhisperTranscriber:
     """
@@ -18,15 +38,79 @@ class WhisperTranscriber:
     
     # 利用可能なモデルのリスト
     AVAILABLE_MODELS = [
-        {"id": "openai/whisper-tiny", "name": "Whisper Tiny", "description": "Fastest model, 39M parameters"},
-        {"id": "openai/whisper-base", "name": "Whisper Base", "description": "Fast model, 74M parameters"},
-        {"id": "openai/whisper-small", "name": "Whisper Small", "description": "Good balance, 244M parameters"},
-        {"id": "openai/whisper-medium", "name": "Whisper Medium", "description": "High accuracy, 769M parameters"},
-        {"id": "openai/whisper-large-v3", "name": "Whisper Large V3", "description": "Highest accuracy, 1550M parameters"},
-        {"id": "openai/whisper-large-v3-turbo", "name": "Whisper Large V3 Turbo", "description": "Ultra-fast with high accuracy, 809M parameters"}
+        {"id": "openai/whisper-tiny", "name": "Whisper Tiny", "description": "Fastest model, 39M parameters",
+         "parameters": 39_000_000},
+        {"id": "openai/whisper-base", "name": "Whisper Base", "description": "Fast model, 74M parameters",
+         "parameters": 74_000_000},
+        {"id": "openai/whisper-small", "name": "Whisper Small", "description": "Good balance, 244M parameters",
+         "parameters": 244_000_000},
+        {"id": "openai/whisper-medium", "name": "Whisper Medium", "description": "High accuracy, 769M parameters",
+         "parameters": 769_000_000},
+        {"id": "openai/whisper-large-v3", "name": "Whisper Large V3", "description": "Highest accuracy, 1550M parameters",
+         "parameters": 1_550_000_000},
+        {"id": "openai/whisper-large-v3-turbo", "name": "Whisper Large V3 Turbo", "description": "Ultra-fast with high accuracy, 809M parameters",
+         "parameters": 809_000_000}
+    ]
+    
+    # 推論バックエンド（transformers以外はバックグラウンドで準備し、準備が済むまではtransformersで処理）
+    AVAILABLE_BACKENDS = [
+        {"id": "transformers", "name": "Transformers", "description": "PyTorch inference (default)"},
+        {"id": "onnxruntime", "name": "ONNX Runtime", "description": "Graph-optimized ONNX export on CPU (requires optimum[onnxruntime])"},
+        {"id": "ctranslate2", "name": "CTranslate2", "description": "int8 CTranslate2 conversion on CPU, as used by faster-whisper (requires ctranslate2)"},
     ]
     
-    def __init__(self, model_id="openai/whisper-large-v3-turbo"):
+    # 投機的デコーディングのドラフトモデル（メル周波数ビン数ごと）
+    # 128ビン（large-v3系）はlarge-v3と同じエンコーダーを持つdistil-large-v3のデコーダーのみを使い、
+    # 80ビン（tiny〜medium、large-v2以前）はwhisper-tinyをエンコーダーごと使う
+    DRAFT_MODELS = {
+        128: {"id": "distil-whisper/distil-large-v3", "shares_encoder": True},
+        80: {"id": "openai/whisper-tiny", "shares_encoder": False},
+    }
+    
+    # 推論経路（direct: 特徴量抽出→generateを直接実行、pipeline: Transformersのパイプライン）
+    ENGINE_MODES = ("direct", "pipeline")
+    
+    # 短い音声の高速化（エンコーダー入力の短縮）設定
+    # Whisperのエンコーダーは常に30秒（3000メルフレーム）分の計算を行うため、
+    # 短い音声では実際の長さ+マージン分だけメルフレームを切り出して計算する（whisper.cppのaudio_ctx相当）
+    TRIMMED_ENCODER_MAX_SECONDS = 20.0  # これより長い音声は通常経路で処理
+    TRIMMED_ENCODER_MARGIN_SECONDS = 1.0  # 音声の後ろに残す無音のマージン
+    TRIMMED_ENCODER_MIN_SECONDS = 5.0  # 文脈が短すぎると精度が落ちるため最低限確保する長さ
+    TRIMMED_COMPRESSION_RATIO_THRESHOLD = 2.4  # これを超える繰り返し出力は通常経路でやり直す
+    TRIMMED_MAX_CHARS_PER_SECOND = 30.0  # 発話速度として不自然な出力は通常経路でやり直す
+    
+    # 無音・誤操作の録音の判定（2段階）
+    # 1. 録音のレベル（最大振幅・平均振幅）と長さでモデルを実行せずにスキップ
+    # 2. エンコーダーと最初のデコーダーステップで求めた無音確率が高い場合は全体のデコードを省く
+    #    （Whisper本来の判定は平均対数確率と組み合わせるが、デコード前に判定するため閾値を高めにする）
+    NO_SPEECH_MIN_SECONDS = 0.3
+    NO_SPEECH_PEAK_THRESHOLD = 0.01  # AudioRecorderの低レベル警告と同じ値
+    NO_SPEECH_MEAN_THRESHOLD = 0.0005
+    NO_SPEECH_PROB_THRESHOLD = 0.8
+    # 短縮した入力での無音確率が閾値をこの幅以上超えた場合はそのまま採用し、閾値付近のみ30秒分の入力で確認し直す
+    NO_SPEECH_RECHECK_MARGIN = 0.1
+    
+    # 長い音声（30秒超）の分割文字起こし設定
+    # vad: 発話の切れ目で30秒以下の区間に分割し、無音を除いた区間だけをバッチで推論する
+    # window: 30秒のウィンドウを重ねて切り出してバッチで推論し、重なりの中点でタイムスタンプ付きの区間を振り分ける
+    LONG_FORM_SEGMENTATIONS = ("vad", "window")
+    LONG_FORM_WINDOW_SECONDS = 30.0
+    LONG_FORM_OVERLAP_SECONDS = 5.0  # 隣接ウィンドウの重なり（ウィンドウ間隔は30秒 - 重なり）
+    LONG_FORM_BATCH_SIZE = 4
+    LONG_FORM_MAX_NEW_TOKENS = 220  # プロンプトと合わせてデコーダーの最大長448に収まる長さ
+    
+    # 読み込んだ音声ファイルのキャッシュの上限（float32で16kHzモノラル約35分）
+    AUDIO_CACHE_MAX_BYTES = 128 * 1024 * 1024
+    
+    # エンコーダー出力のキャッシュの上限（large-v3のfloat16で30秒分約3.8MB、短縮入力ではその一部）
+    ENCODER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    ENCODER_CACHE_MAX_ENTRIES = 8
+    
+    # 同じ音声を同じ言語・プロンプトで文字起こしし直す場合のサンプリングの温度（別の候補を得るため）
+    RETRANSCRIBE_TEMPERATURE = 0.4
+    
+    def __init__(self, model_id="openai/whisper-large-v3-turbo", device=None, quantization_mode="none",
+                 backend="transformers"):
         """
         ローカルWhisper文字起こしクラスの初期化
         
@@ -34,13 +118,22 @@ class WhisperTranscriber:
         ----------
         model_id : str, optional
             使用するWhisperモデルのID（デフォルト: whisper-medium）
+        device : str, optional
+            使用するデバイス（"cpu"、"cuda:0"など。デフォルト: CUDAが使えればGPU）
+        quantization_mode : str, optional
+            CPU推論時のLinear層の量子化モード（"none"、"dynamic_int8"、"weight_only_int8"）
+        backend : str, optional
+            推論バックエンド（"transformers"、"onnxruntime"、"ctranslate2"）
         """
         self.model_id = model_id
-        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        self.torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+        if device is None:
+            device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.device = device
+        self.torch_dtype = torch.float16 if self.device.startswith("cuda") else torch.float32
+        self.quantization_mode = self._resolve_quantization_mode(quantization_mode)
         
         # GPU使用時の最適化設定
-        if torch.cuda.is_available():
+        if self.device.startswith("cuda"):
             torch.backends.cudnn.benchmark = True
             torch.backends.cuda.matmul.allow_tf32 = True
             print(f"[INFO] GPU optimization enabled: {torch.cuda.get_device_name()}")
@@ -51,6 +144,36 @@ class WhisperTranscriber:
         self.model = None
         self.processor = None
         self.pipe = None
+        self.engine = None
+        
+        # 読み込み済みのモデルを上限（件数・合計サイズ）内で常駐させ、切り替え時に再利用する（LRU）
+        self._model_registry = LRUCache(MODEL_REGISTRY_MAX_BYTES, max_entries=MODEL_REGISTRY_MAX_MODELS)
+        self._model_sizes = {}
+        self._resident = None
+        
+        # 常駐していないモデルへの切り替えはバックグラウンドで読み込む（読み込み中は現在のモデルで処理）
+        self._model_key = None
+        self._model_state = "ready"
+        self._model_error = None
+        self._model_thread = None
+        self._model_lock = threading.Lock()
+        
+        # 30秒以下の音声はパイプラインを介さずに直接推論する（失敗時はパイプラインにフォールバック）
+        self.engine_mode = "direct"
+        self._last_timings = {}
+        
+        # 投機的デコーディング（ドラフトモデルは有効化時に読み込む）
+        self.speculative_decoding = False
+        self.draft_model = None
+        self.draft_model_id = None
+        
+        # 推論バックエンド（モデル読み込み後にバックグラウンドで準備する）
+        self.backend = self._resolve_backend(backend)
+        self._backend_engine = None
+        self._backend_state = "idle"
+        self._backend_key = None
+        self._backend_thread = None
+        self._backend_lock = threading.Lock()
         
         # カスタム語彙（プロンプト）のキャッシュ
         self.custom_vocabulary = []
@@ -58,10 +181,68 @@ class WhisperTranscriber:
         # システム指示用のリスト
         self.system_instructions = []
         
-        # パフォーマンス最適化用のキャッシュ
-        self._audio_cache = {}
+        # トークナイザーに依存するプロンプト・語彙の索引・トライ木は (常駐モデル, 値) で保持し、
+        # 文字起こしの開始時に取得した常駐モデルと異なる場合は作り直す（切り替え中の呼び出しで混ざらないようにする）
+        # トークン化済みのプロンプト（語彙・システム指示・モデルの変更時に破棄する）
+        self._prompt = None
+        
+        # プロンプトに含める語彙をトークン数の上限内で選ぶ索引（語彙・モデルの変更時に作り直す）
+        self._vocabulary_index = None
+        self.vocabulary_token_budget = VOCABULARY_TOKEN_BUDGET
+        
+        # デコード中にカスタム語彙の続きのトークンを優遇する（プロンプトとの併用・置き換えが可能）
+        self.hotword_biasing = False
+        self.hotword_boost = HOTWORD_BOOST
+        self.vocabulary_in_prompt = True
+        self._hotword_trie = None
+        
+        # 文字起こし結果の語彙に近い誤認識を語彙の表記に置き換える（索引は語彙の変更時に作り直す）
+        self.vocabulary_correction = False
+        self._corrector = None
+        self._correction_stats = {"corrected": 0, "seconds": 0.0, "last": []}
+        
+        # パイプラインにprompt_idsを渡せるかどうか（モデル読み込み時に1回だけ調べる）
+        self.prompt_ids_supported = False
+        
+        # 文字起こし結果の永続キャッシュ（ファイルと録音バッファのみ、初回使用時に開く）
+        self.result_caching = True
+        self.result_cache_max_bytes = RESULT_CACHE_MAX_BYTES
+        self._result_cache = None
+        
+        # 読み込んだ音声ファイルのキャッシュ（パス・サイズ・更新時刻をキーに、合計サイズの上限内でLRU）
+        self._audio_cache = LRUCache(self.AUDIO_CACHE_MAX_BYTES, sizeof=lambda audio: audio["array"].nbytes)
         self._last_transcription_time = 0
         
+        # 直近の音声のエンコーダー出力（言語・プロンプト・温度を変えた再文字起こしではデコーダーのみ実行）
+        self.encoder_caching = True
+        self._encoder_cache = LRUCache(self.ENCODER_CACHE_MAX_BYTES, max_entries=self.ENCODER_CACHE_MAX_ENTRIES)
+        
+        # 直前の文字起こしの (入力, 言語, プロンプトのハッシュ)（再文字起こしの温度の判定に使う）
+        self._last_request = None
+        
+        # 逐次文字起こしスレッドと通常の文字起こしが同時にモデルを使わないためのロック
+        self._inference_lock = threading.Lock()
+        
+        # 短い音声用のエンコーダー入力短縮（精度ガードで不自然な出力は通常経路にフォールバック）
+        self.trimmed_encoder = True
+        self._trimmed_stats = {"used": 0, "fallback": 0}
+        
+        # 録音の前後の無音・長い間を除去してから推論する（AudioRecorderの録音バッファのみ）
+        self.vad_trimming = True
+        self._vad_stats = {"recordings": 0, "original_seconds": 0.0, "removed_seconds": 0.0, "last": None}
+        
+        # 無音・誤操作の録音をスキップする（スキップした回数を記録）
+        self.no_speech_gate = True
+        self._no_speech_stats = {"energy": 0, "model": 0}
+        # 呼び出しごとの無音判定の結果（逐次文字起こし・バッチ処理のスレッドと混ざらないようスレッドごとに保持）
+        self._call_status = threading.local()
+        
+        # 長い音声の分割文字起こし（無効の場合はパイプラインで処理）
+        self.long_form = True
+        self.long_form_segmentation = "vad"
+        self.long_form_overlap_seconds = self.LONG_FORM_OVERLAP_SECONDS
+        self.long_form_batch_size = self.LONG_FORM_BATCH_SIZE
+        
         # モデルの読み込み（フォールバック付き）
         self._load_model_with_fallback()
     
@@ -97,8 +278,9 @@ class WhisperTranscriber:
         # すべてのモデルが失敗した場合
         raise Exception("すべてのWhisperモデルの読み込みに失敗しました。インターネット接続を確認してください。")
     
-    def _check_cache_status(self):
+    def _check_cache_status(self, model_id=None):
         """キャッシュの状態を確認する"""
+        model_id = model_id or self.model_id
         try:
             cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
             if os.path.exists(cache_dir):
@@ -109,12 +291,12 @@ class WhisperTranscriber:
                 print(f"[INFO] Cache size: {cache_size / (1024*1024):.2f} MB")
                 
                 # 現在のモデルがキャッシュにあるかチェック
-                model_cache_path = os.path.join(cache_dir, "models--" + self.model_id.replace("/", "--"))
+                model_cache_path = os.path.join(cache_dir, "models--" + model_id.replace("/", "--"))
                 if os.path.exists(model_cache_path):
-                    print(f"[INFO] Model {self.model_id} found in cache")
+                    print(f"[INFO] Model {model_id} found in cache")
                     return True
                 else:
-                    print(f"[INFO] Model {self.model_id} not found in cache")
+                    print(f"[INFO] Model {model_id} not found in cache")
                     return False
             else:
                 print(f"[INFO] Cache directory does not exist: {cache_dir}")
@@ -124,47 +306,87 @@ class WhisperTranscriber:
             return False
 
     def _load_model(self):
-        """モデルとプロセッサーを読み込む"""
+        """モデルとプロセッサーを読み込み、使用するモデルとして切り替える（初回・フォールバック時）"""
+        self._activate_model(self._build_model(self.model_id, self.quantization_mode))
+    
+    def _build_model(self, model_id, quantization_mode):
+        """
+        モデルを読み込み、プロセッサー・パイプライン・直接推論エンジンとまとめて返す
+        
+        使用中のモデルは変更しないため、バックグラウンドスレッドから呼び出せます。
+        読み込む前に常駐モデルを古い順に破棄して空きを作り、読み込み中のメモリの増加を抑えます。
+        
+        Parameters
+        ----------
+        model_id : str
+            モデルのID
+        quantization_mode : str
+            量子化モード
+        
+        Returns
+        -------
+        ResidentModel
+            読み込んだモデル
+        """
         try:
-            print(f"[INFO] Loading model: {self.model_id}")
-            print(f"[INFO] Device: {self.device}, dtype: {self.torch_dtype}")
+            print(f"[INFO] Loading model: {model_id}")
+            print(f"[INFO] Device: {self.device}, dtype: {self.torch_dtype}, quantization: {quantization_mode}")
+            
+            # 常駐モデルの上限に収まるよう、古いモデルを先に破棄する（使用中のモデルは切り替えまで使い続ける）
+            self._model_registry.reserve(self._estimate_model_bytes(model_id, quantization_mode))
+            self._release_memory()
             
             # キャッシュの状態を確認
-            is_cached = self._check_cache_status()
+            is_cached = self._check_cache_status(model_id)
             
             # キャッシュディレクトリの確認
             cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
             print(f"[INFO] Cache directory: {cache_dir}")
             
             if is_cached:
-                print(f"[INFO] Using cached model: {self.model_id}")
+                print(f"[INFO] Using cached model: {model_id}")
             else:
-                print(f"[INFO] Downloading model: {self.model_id}")
+                print(f"[INFO] Downloading model: {model_id}")
             
-            # モデルの読み込み（キャッシュを使用）
-            self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                self.model_id,
-                torch_dtype=self.torch_dtype,
-                low_cpu_mem_usage=True,
-                use_safetensors=True,
-                cache_dir=cache_dir,
-                local_files_only=False  # キャッシュにない場合はダウンロード
-            )
-            self.model.to(self.device)
+            # 量子化済みモデルが保存されていれば、float32の重みを読み込まずにそのまま使用
+            model = None
+            if quantization_mode != "none":
+                model = load_quantized_model(model_id, quantization_mode, cache_dir=cache_dir)
+            
+            if model is None:
+                # モデルの読み込み（キャッシュを使用）
+                model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                    model_id,
+                    torch_dtype=self.torch_dtype,
+                    low_cpu_mem_usage=True,
+                    use_safetensors=True,
+                    cache_dir=cache_dir,
+                    local_files_only=False  # キャッシュにない場合はダウンロード
+                )
+                model.to(self.device)
+                model.eval()
+                
+                if quantization_mode != "none":
+                    quantize_start = time.time()
+                    model = quantize_model(model, quantization_mode)
+                    print(f"[INFO] Quantized model ({quantization_mode}) in {time.time() - quantize_start:.1f}s")
+                    save_quantized_model(model, model_id, quantization_mode)
+            
+            model.eval()
             
             # プロセッサーの読み込み（キャッシュを使用）
-            self.processor = AutoProcessor.from_pretrained(
-                self.model_id,
+            processor = AutoProcessor.from_pretrained(
+                model_id,
                 cache_dir=cache_dir,
                 local_files_only=False
             )
             
             # パイプラインの作成
-            self.pipe = pipeline(
+            pipe = pipeline(
                 "automatic-speech-recognition",
-                model=self.model,
-                tokenizer=self.processor.tokenizer,
-                feature_extractor=self.processor.feature_extractor,
+                model=model,
+                tokenizer=processor.tokenizer,
+                feature_extractor=processor.feature_extractor,
                 torch_dtype=self.torch_dtype,
                 device=self.device,
                 # パフォーマンス最適化設定
@@ -172,7 +394,21 @@ class WhisperTranscriber:
                 generate_kwargs={"do_sample": False},  # 決定論的生成で高速化
             )
             
-            print(f"[INFO] Model loaded successfully: {self.model_id}")
+            # プロンプトの渡し方を調べる
+            prompt_ids_supported = probe_prompt_support(model)
+            if not prompt_ids_supported:
+                print(f"[WARNING] This transformers version does not support prompt_ids, custom vocabulary is ignored in the pipeline")
+            
+            # パイプラインを介さない直接推論エンジンの作成
+            engine = WhisperGenerateEngine(model, processor, self.device, self.torch_dtype)
+            resident = ResidentModel(model_id, quantization_mode, model, processor, pipe, engine, prompt_ids_supported)
+            
+            # 投機的デコーディングが有効な場合は新しいモデルに合うドラフトモデルを読み込む
+            if self.speculative_decoding:
+                self._load_draft_model(resident)
+            
+            print(f"[INFO] Model loaded successfully: {model_id}")
+            return resident
             
         except Exception as e:
             print(f"[ERROR] Failed to load model: {e}")
@@ -189,6 +425,226 @@ class WhisperTranscriber:
             else:
                 raise Exception(f"モデル読み込みエラー: {e}")
     
+    def _activate_model(self, resident):
+        """
+        読み込み済みのモデルに切り替える
+        
+        モデル・プロセッサー・パイプライン・エンジンは推論ロックを取得してまとめて差し替えるため、
+        実行中の推論は切り替え前のモデルで完了します。
+        
+        Parameters
+        ----------
+        resident : ResidentModel
+            切り替え先のモデル
+        """
+        with self._inference_lock:
+            self.model_id, self.quantization_mode = resident.key
+            self.model = resident.model
+            self.processor = resident.processor
+            self.pipe = resident.pipe
+            self.engine = resident.engine
+            self.prompt_ids_supported = resident.prompt_ids_supported
+            if not self.speculative_decoding and resident.draft_model is not None:
+                resident.draft_model = None
+                resident.draft_model_id = None
+                resident.engine.set_assistant_model(None)
+            self.draft_model = resident.draft_model
+            self.draft_model_id = resident.draft_model_id
+            self._resident = resident
+        self._register_model(resident)
+        
+        # トークナイザーが変わるためプロンプトと語彙の索引を作り直し、モデルごとに異なるエンコーダー出力は破棄する
+        self._invalidate_vocabulary()
+        self._encoder_cache.clear()
+        self._release_memory()
+        
+        # 投機的デコーディングが有効でドラフトモデルがない場合はバックグラウンドで読み込む
+        if self.speculative_decoding and resident.draft_model is None:
+            thread = threading.Thread(target=self._load_draft_model, args=(resident,))
+            thread.daemon = True
+            thread.start()
+        
+        # 選択中のバックエンドを新しいモデルで準備し直す
+        self._prepare_backend_async()
+        print(f"[INFO] Active model: {self.model_id} (quantization: {self.quantization_mode})")
+    
+    def _register_model(self, resident):
+        """モデルを常駐モデルに登録する（最後に使われたものとして扱い、上限を超えた古いモデルは破棄する）"""
+        size = resident.nbytes()
+        self._model_sizes[resident.key] = size
+        if not self._model_registry.put(resident.key, resident, size=size):
+            print(f"[WARNING] {resident.model_id} ({size / 1024 ** 2:.0f}MB) exceeds the resident model limit, it will be unloaded when switching")
+    
+    def _estimate_model_bytes(self, model_id, quantization_mode):
+        """
+        読み込む前のモデルのサイズ（バイト）を見積もる
+        
+        読み込んだことがあるモデルは実際のサイズ、それ以外はパラメータ数とデータ型から見積もります
+        （量子化する場合も量子化前の重みを読み込むため、量子化前のサイズで見積もります）。
+        """
+        size = self._model_sizes.get((model_id, quantization_mode))
+        if size is not None:
+            return size
+        parameters = next((model.get("parameters") for model in self.AVAILABLE_MODELS if model["id"] == model_id), None)
+        return parameters * (torch.finfo(self.torch_dtype).bits // 8) if parameters else 0
+    
+    def _release_memory(self):
+        """破棄したモデルのメモリを解放する"""
+        gc.collect()
+        if self.device.startswith("cuda"):
+            torch.cuda.empty_cache()
+    
+    def _switch_model(self, model_id, quantization_mode, background=False):
+        """
+        使用するモデルを切り替える
+        
+        呼び出し元では切り替え先を記録するだけで、切り替え（常駐モデルの有効化・読み込み）はすべて
+        モデル用のバックグラウンドスレッドで行います。有効化は実行中の推論の完了を待つため、
+        GUIスレッドから呼び出しても推論ロックやメモリ解放で止まりません。
+        
+        Parameters
+        ----------
+        model_id : str
+            モデルのID
+        quantization_mode : str
+            量子化モード
+        background : bool, optional
+            切り替えの完了を待たずに戻るかどうか（Falseの場合は切り替えが終わるまで待つ）
+        
+        Returns
+        -------
+        str
+            "ready"（切り替え済み）、"switching"（常駐モデルに切り替え中）、
+            または "loading"（バックグラウンドで読み込み中）
+        """
+        key = (model_id, quantization_mode)
+        with self._model_lock:
+            # 読み込み中の別のモデルへの切り替えは取り消す（読み込みが終わったモデルは常駐させる）
+            self._model_key = key
+            if key == (self.model_id, self.quantization_mode):
+                self._model_state = "ready"
+                return "ready"
+            is_resident = key in self._model_registry
+            self._model_state = "loading"
+            self._model_error = None
+            if self._model_thread is None:
+                self._model_thread = threading.Thread(target=self._load_models_in_background)
+                self._model_thread.daemon = True
+                self._model_thread.start()
+            thread = self._model_thread
+        
+        if background:
+            if is_resident:
+                return "switching"
+            print(f"[INFO] Loading {model_id} in background (still transcribing with {self.model_id})")
+            return "loading"
+        thread.join()
+        if self._model_state == "failed":
+            raise Exception(self._model_error)
+        return "ready"
+    
+    def _load_models_in_background(self):
+        """
+        要求されたモデルを読み込んで切り替える（バックグラウンドスレッドで実行）
+        
+        常駐モデルの有効化もこのスレッドで行うため、モデルの切り替えは常に1つずつ順に行われます。
+        読み込み中に別のモデルが要求された場合は、読み込んだモデルを常駐させてから要求されたモデルに進みます。
+        読み込みは常に1つずつ行うため、メモリ上のモデルは常駐モデル・使用中のモデル・読み込み中の1つに限られます。
+        """
+        loaded = None
+        while True:
+            with self._model_lock:
+                key = self._model_key
+                if key == (self.model_id, self.quantization_mode):
+                    self._model_state = "ready"
+                    self._model_thread = None
+                    return
+                resident = loaded if loaded is not None and loaded.key == key else self._model_registry.get(key)
+            
+            if resident is not None:
+                self._activate_model(resident)
+                continue
+            
+            # 読み込み済みで不要になったモデルを先に手放してから次のモデルを読み込む
+            loaded = None
+            start_time = time.time()
+            try:
+                loaded = self._build_model(*key)
+            except Exception as e:
+                print(f"[ERROR] Failed to load {key[0]} in background: {e}")
+                with self._model_lock:
+                    if self._model_key == key:
+                        # 現在のモデルを使い続ける
+                        self._model_key = (self.model_id, self.quantization_mode)
+                        self._model_error = str(e)
+                        self._model_state = "failed"
+                        self._model_thread = None
+                        return
+                continue
+            self._register_model(loaded)
+            print(f"[INFO] {key[0]} loaded in background in {time.time() - start_time:.1f}s")
+    
+    def get_model_status(self):
+        """
+        モデルの切り替え・常駐の状況を取得する
+        
+        Returns
+        -------
+        dict
+            使用中のモデルID（model_id）と量子化モード（quantization_mode）、状態（state: "ready"、"loading"、"failed"）、
+            読み込み中のモデルID（loading）と量子化モード（loading_quantization）、失敗時のエラー（error）、
+            常駐しているモデルの (モデルID, 量子化モード) のリスト（resident、古い順）と合計サイズ（resident_bytes）
+        """
+        with self._model_lock:
+            loading = self._model_key if self._model_state == "loading" else (None, None)
+            return {
+                "model_id": self.model_id,
+                "quantization_mode": self.quantization_mode,
+                "state": self._model_state,
+                "loading": loading[0],
+                "loading_quantization": loading[1],
+                "error": self._model_error,
+                "resident": self._model_registry.keys(),
+                "resident_bytes": self._model_registry.get_stats()["bytes"],
+            }
+    
+    def wait_for_model(self, timeout=None):
+        """
+        バックグラウンドでのモデルの読み込み・切り替えの完了を待つ（ベンチマーク等で使用）
+        
+        Parameters
+        ----------
+        timeout : float, optional
+            最大待機時間（秒）
+        
+        Returns
+        -------
+        bool
+            要求したモデルへの切り替えが完了したかどうか
+        """
+        with self._model_lock:
+            thread = self._model_thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.get_model_status()["state"] == "ready"
+    
+    def set_resident_models(self, max_models=None, max_mb=None):
+        """
+        常駐させるモデルの上限を設定する（超えている場合は古いモデルを破棄する）
+        
+        Parameters
+        ----------
+        max_models : int, optional
+            常駐させるモデルの数（使用中のモデルを含む。Noneの場合は変更しない）
+        max_mb : float, optional
+            常駐させるモデルの合計サイズの上限（MB、Noneの場合は変更しない）
+        """
+        if max_models is not None:
+            self._model_registry.set_max_entries(max(1, int(max_models)))
+        if max_mb is not None:
+            self._model_registry.set_max_bytes(int(max_mb * 1024 * 1024))
+        self._release_memory()
+    
     @classmethod
     def get_available_models(cls):
         """
@@ -201,18 +657,92 @@ class WhisperTranscriber:
         """
         return cls.AVAILABLE_MODELS
         
-    def set_model(self, model_id):
+    @classmethod
+    def get_available_quantizations(cls):
+        """
+        利用可能な量子化モードのリストを返す
+        
+        int4の重みのみ量子化はfloat32のCPU推論に対応するカーネルがないため含みません。
+        
+        Returns
+        -------
+        list
+            量子化モードの情報を含む辞書のリスト（現在の環境で使えないモードも含む）
+        """
+        return [
+            dict(mode, available=is_quantization_available(mode["id"]))
+            for mode in AVAILABLE_QUANTIZATIONS
+        ]
+    
+    def _resolve_quantization_mode(self, mode):
+        """
+        デバイスと環境に合わせて使用する量子化モードを決める
+        
+        Parameters
+        ----------
+        mode : str
+            要求された量子化モード
+        
+        Returns
+        -------
+        str
+            実際に使用する量子化モード（使えない場合は"none"）
+        """
+        if mode == "none":
+            return mode
+        if not self.device.startswith("cpu"):
+            print(f"[WARNING] Quantization mode {mode} is only supported on CPU, using float weights on {self.device}")
+            return "none"
+        if not is_quantization_available(mode):
+            print(f"[WARNING] Quantization mode {mode} is not available in this environment, using float32")
+            return "none"
+        return mode
+    
+    def set_quantization(self, mode, background=False):
+        """
+        量子化モードを変更してモデルを読み込み直す
+        
+        常駐しているモデル（以前に使用した量子化モード）には読み込みなしで即座に切り替えます。
+        
+        Parameters
+        ----------
+        mode : str
+            量子化モードのID
+        background : bool, optional
+            常駐していないモデルをバックグラウンドで読み込み・量子化し、完了を待たずに戻るかどうか
+            （読み込み中は現在のモデルで文字起こしし、完了後に切り替える）
+        
+        Returns
+        -------
+        str
+            実際に使用する量子化モード（backgroundの場合、読み込みの状況はget_model_statusで確認）
+        """
+        mode = self._resolve_quantization_mode(mode)
+        self._switch_model(self.model_id, mode, background)
+        return mode
+    
+    def set_model(self, model_id, background=False):
         """
         文字起こしに使用するモデルを設定する
         
+        常駐しているモデル（以前に使用したモデル）には読み込みなしで切り替えます
+        （実行中の推論があればその完了後）。
+        
         Parameters
         ----------
         model_id : str
             使用するモデルのID
+        background : bool, optional
+            切り替え・読み込みをバックグラウンドで行い、完了を待たずに戻るかどうか
+            （完了までは現在のモデルで文字起こしし、完了後に切り替える）
+        
+        Returns
+        -------
+        str
+            "ready"（切り替え済み）、"switching"（常駐モデルに切り替え中）、
+            または "loading"（バックグラウンドで読み込み中）
         """
-        if model_id != self.model_id:
-            self.model_id = model_id
-            self._load_model()
+        return self._switch_model(model_id, self.quantization_mode, background)
         
     def add_custom_vocabulary(self, terms):
         """
@@ -226,12 +756,14 @@ class WhisperTranscriber:
         if isinstance(terms, str):
             terms = [terms]
         self.custom_vocabulary.extend(terms)
+        self._invalidate_vocabulary()
     
     def clear_custom_vocabulary(self):
         """
         カスタム語彙リストをクリアする
         """
         self.custom_vocabulary = []
+        self._invalidate_vocabulary()
     
     def get_custom_vocabulary(self):
         """
@@ -256,12 +788,14 @@ class WhisperTranscriber:
         if isinstance(instructions, str):
             instructions = [instructions]
         self.system_instructions.extend(instructions)
+        self._invalidate_prompt()
     
     def clear_system_instructions(self):
         """
         システム指示リストをクリアする
         """
         self.system_instructions = []
+        self._invalidate_prompt()
     
     def get_system_instructions(self):
         """
@@ -274,23 +808,206 @@ class WhisperTranscriber:
         """
         return self.system_instructions
     
-    def _build_prompt(self):
+    def set_vocabulary_token_budget(self, tokens):
+        """
+        プロンプトに含めるカスタム語彙の上限（トークン数）を設定する
+        
+        Parameters
+        ----------
+        tokens : int
+            語彙の合計トークン数の上限（これを超える語彙は録音ごとに関連の高いものを選ぶ）
+        """
+        self.vocabulary_token_budget = max(1, int(tokens))
+        self._invalidate_vocabulary()
+    
+    def get_selected_vocabulary(self):
+        """
+        次の文字起こしでプロンプトに含めるカスタム語彙を取得する
+        
+        Returns
+        -------
+        list
+            トークン数の上限内で選択された語彙のリスト
+        """
+        index = self._get_vocabulary_index(self._resident)
+        return index.select() if index is not None else []
+    
+    def _get_vocabulary_index(self, resident):
+        """語彙の索引を返す（語彙・モデルの変更後は作り直す）"""
+        if not self.custom_vocabulary or resident is None:
+            return None
+        cached = self._vocabulary_index
+        if cached is None or cached[0] is not resident:
+            start_time = time.perf_counter()
+            index = VocabularyIndex(self.custom_vocabulary, resident.processor.tokenizer, self.vocabulary_token_budget)
+            self._vocabulary_index = cached = (resident, index)
+            if not index.fits_all:
+                print(
+                    f"[INFO] Vocabulary index built: {len(index)} terms, "
+                    f"{sum(index.token_costs)} tokens (budget {self.vocabulary_token_budget}) "
+                    f"in {time.perf_counter() - start_time:.3f}s"
+                )
+        return cached[1]
+    
+    def set_hotword_biasing(self, enabled, boost=None, vocabulary_in_prompt=None):
+        """
+        デコード中のカスタム語彙の優遇（ホットワード）の有効/無効を切り替える
+        
+        語彙をトークン列のトライ木にしておき、生成中に部分一致した語彙の続きのトークンのロジットを上げます。
+        プロンプトと違ってデコーダーの前置部分が長くならず、語彙数の上限もありません。
+        CTranslate2バックエンドはロジットを操作できないため、プロンプトのみが使われます。
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        boost : float, optional
+            部分一致した語彙の続きのトークンに加えるロジット（Noneの場合は変更しない）
+        vocabulary_in_prompt : bool, optional
+            ホットワードの有効時にも語彙をプロンプトに含めるかどうか（Noneの場合は変更しない）
+        """
+        self.hotword_biasing = enabled
+        if boost is not None:
+            self.hotword_boost = float(boost)
+        if vocabulary_in_prompt is not None:
+            self.vocabulary_in_prompt = vocabulary_in_prompt
+        self._invalidate_prompt()
+    
+    def _get_hotword_trie(self, resident):
+        """語彙のトライ木を返す（ホットワードが無効・語彙がない場合はNone、語彙・モデルの変更後は作り直す）"""
+        if not self.hotword_biasing or not self.custom_vocabulary or resident is None:
+            return None
+        cached = self._hotword_trie
+        if cached is None or cached[0] is not resident:
+            start_time = time.perf_counter()
+            trie = HotwordTrie(self.custom_vocabulary, resident.processor.tokenizer)
+            self._hotword_trie = cached = (resident, trie)
+            print(
+                f"[INFO] Hotword trie built: {len(self.custom_vocabulary)} terms, {trie.size} nodes "
+                f"in {time.perf_counter() - start_time:.3f}s"
+            )
+        return cached[1]
+    
+    def _hotword_logits_processor(self, resident):
+        """パイプラインのgenerateに渡すLogitsProcessorList（ホットワードが無効の場合はNone）"""
+        trie = self._get_hotword_trie(resident)
+        if not trie:
+            return None
+        return LogitsProcessorList([HotwordLogitsProcessor(trie, self.hotword_boost)])
+    
+    def set_vocabulary_correction(self, enabled):
+        """
+        文字起こし結果の語彙補正の有効/無効を切り替える
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        """
+        self.vocabulary_correction = enabled
+    
+    def get_correction_stats(self):
+        """
+        語彙補正の実行状況を取得する
+        
+        Returns
+        -------
+        dict
+            置き換えた合計箇所数（corrected）、補正にかかった合計秒数（seconds）、
+            直前の文字起こしで置き換えた (元の文字列, 語彙) のリスト（last）
+        """
+        stats = dict(self._correction_stats)
+        stats["last"] = list(stats["last"])
+        return stats
+    
+    def _get_corrector(self):
+        """語彙補正の索引を返す（無効・語彙がない場合はNone、語彙の変更後は作り直す）"""
+        if not self.vocabulary_correction or not self.custom_vocabulary:
+            return None
+        if self._corrector is None:
+            start_time = time.perf_counter()
+            self._corrector = VocabularyCorrector(self.custom_vocabulary)
+            print(
+                f"[INFO] Vocabulary corrector built: {len(self.custom_vocabulary)} terms "
+                f"in {time.perf_counter() - start_time:.3f}s"
+            )
+        return self._corrector
+    
+    def _correct_vocabulary(self, result):
+        """
+        文字起こし結果（textと、あればchunksの各text）の語彙に近い誤認識を語彙の表記に置き換える
+        """
+        corrector = self._get_corrector()
+        if not corrector:
+            return result
+        start_time = time.perf_counter()
+        result["text"], corrections = corrector.correct(result["text"])
+        for chunk in result.get("chunks") or []:
+            chunk["text"], _ = corrector.correct(chunk["text"])
+        self._correction_stats["seconds"] += time.perf_counter() - start_time
+        self._correction_stats["corrected"] += len(corrections)
+        self._correction_stats["last"] = corrections
+        if corrections:
+            print(f"[INFO] Vocabulary corrections: {', '.join(f'{a} -> {b}' for a, b in corrections)}")
+        return result
+    
+    def _invalidate_vocabulary(self):
+        """語彙の索引・トライ木・補正の索引とプロンプトを破棄する"""
+        self._vocabulary_index = None
+        self._hotword_trie = None
+        self._corrector = None
+        self._invalidate_prompt()
+    
+    def _observe_transcript(self, text):
+        """
+        文字起こし結果を語彙の索引に記録し、選択される語彙が変わった場合はプロンプトを作り直す
+        """
+        cached = self._vocabulary_index
+        if cached is not None and cached[1].observe(text):
+            self._invalidate_prompt()
+    
+    def _invalidate_prompt(self):
+        """トークン化済みのプロンプトを破棄する（次回の文字起こしで構築・トークン化し直す）"""
+        self._prompt = None
+    
+    def _build_prompt(self, resident):
         """
         カスタム語彙とシステム指示からプロンプトを構築する
         
+        語彙・システム指示・モデルが変わるまでは前回トークン化したプロンプトを返します。
+        
+        Parameters
+        ----------
+        resident : ResidentModel
+            文字起こしの開始時に取得した常駐モデル（このモデルのトークナイザーでトークン化する）
+        
         Returns
         -------
-        str
-            構築されたプロンプト文字列
+        CompiledPrompt
+            トークン化済みのプロンプト（Whisperの上限の223トークンに切り詰め済み）
         """
+        cached = self._prompt
+        if cached is None or cached[0] is not resident:
+            prompt = CompiledPrompt(self._compose_prompt(resident), resident.processor.tokenizer)
+            self._prompt = cached = (resident, prompt)
+            print(f"[INFO] Prompt compiled: {prompt.token_count} tokens")
+        return cached[1]
+    
+    def _compose_prompt(self, resident):
+        """カスタム語彙とシステム指示からプロンプト文字列を組み立てる"""
         prompt_parts = []
         
         # 日本語対応のデフォルト指示を追加
         prompt_parts.append("Transcribe accurately in the original language. For Japanese, use proper Japanese characters and punctuation.")
         
-        # カスタム語彙を追加
-        if self.custom_vocabulary:
-            vocab_text = " ".join(self.custom_vocabulary)
+        # カスタム語彙を追加（多い場合はトークン数の上限内で関連の高いものを選ぶ）
+        # （ホットワードで語彙を優遇し、プロンプトに含めない設定の場合は省く）
+        vocabulary = []
+        if self.vocabulary_in_prompt or not self.hotword_biasing:
+            index = self._get_vocabulary_index(resident)
+            vocabulary = index.select() if index is not None else []
+        if vocabulary:
+            vocab_text = " ".join(vocabulary)
             prompt_parts.append(f"Vocabulary: {vocab_text}")
         
         # システム指示を追加
@@ -300,75 +1017,1154 @@ class WhisperTranscriber:
         
         return " ".join(prompt_parts)
     
-    def _load_audio(self, audio_file):
+    def set_audio_cache_size(self, max_mb):
         """
-        音声ファイルを読み込んで適切な形式に変換する
+        読み込んだ音声ファイルのキャッシュの上限を設定する
         
         Parameters
         ----------
-        audio_file : str
-            音声ファイルのパス
-            
+        max_mb : float
+            保持する音声の合計サイズの上限（MB、0でキャッシュしない）
+        """
+        self._audio_cache.set_max_bytes(int(max_mb * 1024 * 1024))
+    
+    def get_audio_cache_stats(self):
+        """
+        読み込んだ音声ファイルのキャッシュの使用状況を取得する
+        
         Returns
         -------
         dict
-            音声データとサンプリングレートを含む辞書
+            ヒット数（hits）、ミス数（misses）、ヒット率（hit_rate）、削除数（evictions）、
+            件数（entries）、合計サイズ（bytes）、上限（max_bytes）
         """
-        try:
-            # キャッシュをチェック
-            if audio_file in self._audio_cache:
-                print(f"[INFO] Using cached audio data for: {audio_file}")
-                return self._audio_cache[audio_file]
-            
-            # 音声ファイルを読み込み
-            audio_data, sample_rate = sf.read(audio_file)
-            
-            # モノラルに変換（ステレオの場合）
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)
-            
-            # 16kHzにリサンプリング（必要に応じて）
-            if sample_rate != 16000:
-                # 簡単なリサンプリング（実際のプロジェクトではlibrosaなどを使用）
-                print(f"[WARNING] Sample rate {sample_rate}Hz detected. Whisper expects 16kHz.")
-            
-            result = {
-                "array": audio_data,
-                "sampling_rate": sample_rate
-            }
-            
-            # キャッシュに保存（メモリ使用量を考慮して最大10個まで）
-            if len(self._audio_cache) < 10:
-                self._audio_cache[audio_file] = result
-            
-            return result
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to load audio file: {e}")
-            raise
+        return self._audio_cache.get_stats()
     
-    def _optimize_generation_params(self, audio_duration):
+    def set_encoder_cache(self, enabled, max_mb=None, max_entries=None):
         """
-        音声の長さに基づいて生成パラメータを最適化する
+        エンコーダー出力のキャッシュの有効/無効を切り替える
         
         Parameters
         ----------
-        audio_duration : float
-            音声の長さ（秒）
-            
+        enabled : bool
+            有効にするかどうか（無効にした場合は保持している出力を破棄する）
+        max_mb : float, optional
+            保持する出力の合計サイズの上限（MB、Noneの場合は変更しない）
+        max_entries : int, optional
+            保持する出力の件数の上限（Noneの場合は変更しない）
+        """
+        self.encoder_caching = enabled
+        if max_mb is not None:
+            self._encoder_cache.set_max_bytes(int(max_mb * 1024 * 1024))
+        if max_entries is not None:
+            self._encoder_cache.set_max_entries(max_entries)
+        if not enabled:
+            self._encoder_cache.clear()
+    
+    def get_encoder_cache_stats(self):
+        """
+        エンコーダー出力のキャッシュの使用状況を取得する
+        
         Returns
         -------
         dict
-            最適化された生成パラメータ
+            ヒット数（hits）、ミス数（misses）、ヒット率（hit_rate）、削除数（evictions）、
+            件数（entries）、合計サイズ（bytes）、上限（max_bytes、max_entries）
         """
-        # 音声の長さに基づいてパラメータを調整
-        if audio_duration <= 10.0:
-            # 短い音声（10秒以下）- より高速化
-            max_tokens = 64  # より少ないトークン数
-            temperature = 0.0  # 単一の温度値で高速化
-            print(f"[INFO] Short audio detected ({audio_duration:.2f}s), using optimized parameters")
-        elif audio_duration <= 30.0:
-            # 中程度の音声（10-30秒）
+        return self._encoder_cache.get_stats()
+    
+    def _encoder_cache_key(self, audio, path):
+        """
+        エンコーダー出力のキャッシュのキーを作成する
+        
+        推論経路（バックエンド）ごとに出力の形式が異なるため、音声の内容のハッシュに経路名を加えます。
+        
+        Returns
+        -------
+        tuple or None
+            (経路名, 音声のハッシュ)、キャッシュしない場合はNone
+        """
+        if not self.encoder_caching:
+            return None
+        return path, audio_fingerprint(audio["array"], audio["sampling_rate"])
+    
+    def set_result_cache(self, enabled, max_mb=None):
+        """
+        文字起こし結果の永続キャッシュの有効/無効を切り替える
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        max_mb : float, optional
+            保存する結果の合計サイズの上限（MB、Noneの場合は変更しない）
+        """
+        self.result_caching = enabled
+        if max_mb is not None:
+            self.result_cache_max_bytes = int(max_mb * 1024 * 1024)
+            if self._result_cache is not None:
+                self._result_cache.set_max_bytes(self.result_cache_max_bytes)
+    
+    def get_result_cache_stats(self):
+        """
+        文字起こし結果のキャッシュの使用状況を取得する
+        
+        Returns
+        -------
+        dict
+            ヒット数（hits）、ミス数（misses）、ヒット率（hit_rate）、件数（entries）、
+            合計サイズ（bytes）、上限（max_bytes）
+        """
+        if self._result_cache is None:
+            return {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0, "bytes": 0,
+                    "max_bytes": self.result_cache_max_bytes}
+        return self._result_cache.get_stats()
+    
+    def clear_result_cache(self):
+        """保存した文字起こし結果をすべて削除する"""
+        cache = self._get_result_cache()
+        if cache is not None:
+            cache.clear()
+    
+    def _get_result_cache(self):
+        """結果のキャッシュを返す（開けない場合はキャッシュを無効にしてNone）"""
+        if self._result_cache is None and self.result_caching:
+            try:
+                self._result_cache = ResultCache(max_bytes=self.result_cache_max_bytes)
+            except Exception as e:
+                print(f"[WARNING] Failed to open result cache, caching disabled: {e}")
+                self.result_caching = False
+        return self._result_cache
+    
+    def _result_cache_key(self, audio_file, audio, language, prompt, return_timestamps, resident, path,
+                          vad_trimmed=False):
+        """
+        文字起こし結果のキャッシュのキーを作成する
+        
+        音声の内容のハッシュに、結果に影響する設定（モデル・バックエンド・量子化・言語・プロンプト・
+        ホットワード・推論経路）を加えます。メモリ上の音声配列（逐次文字起こしの途中経過）はキャッシュしません。
+        モデル・バックエンドは文字起こしの開始時に取得した常駐モデルとエンジンの経路名（resident、path）を使います。
+        
+        Returns
+        -------
+        str or None
+            キー（キャッシュしない場合はNone）
+        """
+        if not self.result_caching or isinstance(audio_file, np.ndarray) or self._get_result_cache() is None:
+            return None
+        trie = self._get_hotword_trie(resident)
+        return make_cache_key(
+            audio_fingerprint(audio["array"], audio["sampling_rate"]),
+            resident.model_id,
+            path if path != "direct" else "transformers",
+            resident.quantization_mode,
+            language if language and language != "auto" else None,
+            prompt.digest if prompt else None,
+            [trie.digest, self.hotword_boost] if trie else None,
+            return_timestamps,
+            vad_trimmed,
+            [self.engine_mode, self.trimmed_encoder, self.long_form, self.long_form_segmentation],
+        )
+    
+    def _get_cached_result(self, key):
+        """キャッシュした文字起こし結果を取得する（ない場合はNone）"""
+        if key is None:
+            return None
+        try:
+            result = self._result_cache.get(key)
+        except Exception as e:
+            print(f"[WARNING] Failed to read result cache: {e}")
+            return None
+        if result is not None:
+            # JSONではタプルがリストになるため、パイプラインの結果と同じ形に戻す
+            for chunk in result.get("chunks") or []:
+                if isinstance(chunk.get("timestamp"), list):
+                    chunk["timestamp"] = tuple(chunk["timestamp"])
+        return result
+    
+    def _store_result(self, key, result):
+        """文字起こし結果（補正前のモデルの出力）をキャッシュに保存する"""
+        if key is None:
+            return
+        value = {"text": result["text"], "language": result.get("language")}
+        if result.get("chunks"):
+            value["chunks"] = [
+                {"text": chunk["text"], "timestamp": list(chunk["timestamp"])} for chunk in result["chunks"]
+            ]
+        try:
+            self._result_cache.put(key, value)
+        except Exception as e:
+            print(f"[WARNING] Failed to write result cache: {e}")
+    
+    def _load_audio(self, audio_file):
+        """
+        音声ファイルを読み込んで適切な形式に変換する
+        
+        Parameters
+        ----------
+        audio_file : str
+            音声ファイルのパス
+            
+        Returns
+        -------
+        dict
+            音声データとサンプリングレートを含む辞書
+        """
+        try:
+            # キャッシュをチェック（同じパスに上書きされたファイルはサイズ・更新時刻で区別する）
+            cache_key = file_cache_key(audio_file)
+            cached = self._audio_cache.get(cache_key)
+            if cached is not None:
+                print(f"[INFO] Using cached audio data for: {audio_file}")
+                return dict(cached)
+            
+            # 音声ファイルをfloat32で読み込み（float64での読み込みはメモリを倍消費する）
+            audio_data, sample_rate = sf.read(audio_file, dtype="float32")
+            
+            # モノラルに変換（ステレオの場合）
+            if len(audio_data.shape) > 1:
+                audio_data = audio_data.mean(axis=1, dtype=np.float32)
+            
+            # 16kHzにリサンプリング（必要に応じて）
+            if sample_rate != 16000:
+                # 簡単なリサンプリング（実際のプロジェクトではlibrosaなどを使用）
+                print(f"[WARNING] Sample rate {sample_rate}Hz detected. Whisper expects 16kHz.")
+            
+            result = {
+                "array": audio_data,
+                "sampling_rate": sample_rate
+            }
+            
+            # キャッシュに保存（上限を超えた場合は最後に使われた時刻が古い音声から破棄）
+            self._audio_cache.put(cache_key, result)
+            
+            return dict(result)
+            
+        except Exception as e:
+            print(f"[ERROR] Failed to load audio file: {e}")
+            raise
+    
+    @classmethod
+    def get_available_backends(cls):
+        """
+        利用可能な推論バックエンドのリストを返す
+        
+        Returns
+        -------
+        list
+            バックエンドの情報を含む辞書のリスト（現在の環境で使えないものも含む）
+        """
+        return [
+            dict(backend, available=cls._is_backend_available(backend["id"]))
+            for backend in cls.AVAILABLE_BACKENDS
+        ]
+    
+    @staticmethod
+    def _is_backend_available(backend):
+        """推論バックエンドが現在の環境で使えるかどうか"""
+        if backend == "transformers":
+            return True
+        if backend == "onnxruntime":
+            return is_onnx_available()
+        if backend == "ctranslate2":
+            return is_ctranslate2_available()
+        return False
+    
+    def _resolve_backend(self, backend):
+        """
+        使用する推論バックエンドを決める
+        
+        Parameters
+        ----------
+        backend : str
+            要求されたバックエンド
+        
+        Returns
+        -------
+        str
+            実際に使用するバックエンド（使えない場合は"transformers"）
+        """
+        if backend not in [b["id"] for b in self.AVAILABLE_BACKENDS]:
+            print(f"[WARNING] Unknown backend {backend}, using transformers")
+            return "transformers"
+        if not self._is_backend_available(backend):
+            print(f"[WARNING] Backend {backend} is not available in this environment, using transformers")
+            return "transformers"
+        return backend
+    
+    def set_backend(self, backend):
+        """
+        推論バックエンドを切り替える
+        
+        transformers以外のバックエンドは初回にモデルの変換が必要なため、バックグラウンドで準備します。
+        準備が済むまではtransformersで文字起こしを行います。
+        
+        Parameters
+        ----------
+        backend : str
+            バックエンドのID
+        
+        Returns
+        -------
+        str
+            実際に使用するバックエンド
+        """
+        backend = self._resolve_backend(backend)
+        if backend != self.backend:
+            self.backend = backend
+            self._prepare_backend_async()
+        return self.backend
+    
+    def get_backend_status(self):
+        """
+        推論バックエンドの準備状況を取得する
+        
+        Returns
+        -------
+        dict
+            バックエンドのID（backend）と状態（state: "ready"、"preparing"、"failed"）
+        """
+        if self.backend == "transformers":
+            return {"backend": self.backend, "state": "ready"}
+        return {"backend": self.backend, "state": self._backend_state}
+    
+    def wait_for_backend(self, timeout=None):
+        """
+        推論バックエンドの準備完了を待つ（ベンチマーク等で使用）
+        
+        Parameters
+        ----------
+        timeout : float, optional
+            最大待機時間（秒）
+        
+        Returns
+        -------
+        bool
+            バックエンドの準備が完了したかどうか
+        """
+        if self._backend_thread is not None:
+            self._backend_thread.join(timeout)
+        return self.get_backend_status()["state"] == "ready"
+    
+    def _prepare_backend_async(self):
+        """
+        選択中のバックエンドをバックグラウンドで準備する
+        """
+        with self._backend_lock:
+            self._backend_engine = None
+            if self.backend == "transformers" or self.processor is None:
+                self._backend_state = "idle"
+                self._backend_key = None
+                return
+            key = (self.backend, self.model_id, self.quantization_mode)
+            self._backend_key = key
+            self._backend_state = "preparing"
+        
+        self._backend_thread = threading.Thread(target=self._prepare_backend, args=(key,))
+        self._backend_thread.daemon = True
+        self._backend_thread.start()
+    
+    def _prepare_backend(self, key):
+        """
+        バックエンドのエンジンを作成する（バックグラウンドスレッドで実行）
+        
+        Parameters
+        ----------
+        key : tuple
+            (バックエンド, モデルID, 量子化モード)。準備中に設定が変わった場合は結果を破棄する
+        """
+        backend, model_id, quantization_mode = key
+        start_time = time.time()
+        try:
+            cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
+            if backend == "onnxruntime":
+                engine = load_onnx_engine(
+                    model_id, self.processor, int8=quantization_mode != "none", cache_dir=cache_dir
+                )
+            elif backend == "ctranslate2":
+                # 重みは常にint8で変換し、量子化モード指定時は計算もint8で行う
+                engine = load_ctranslate2_engine(
+                    model_id, self.processor,
+                    compute_type="int8" if quantization_mode != "none" else "int8_float32",
+                    cache_dir=cache_dir
+                )
+            else:
+                raise ValueError(f"Unknown backend: {backend}")
+        except Exception as e:
+            print(f"[ERROR] Failed to prepare {backend} backend: {e}")
+            with self._backend_lock:
+                if self._backend_key == key:
+                    self._backend_state = "failed"
+            return
+        
+        with self._backend_lock:
+            if self._backend_key != key:
+                print(f"[INFO] Discarding {backend} backend for {model_id} (settings changed)")
+                return
+            self._backend_engine = engine
+            self._backend_state = "ready"
+        print(f"[INFO] {backend} backend ready for {model_id} in {time.time() - start_time:.1f}s")
+    
+    def _active_engine(self, resident):
+        """
+        文字起こしに使用するエンジンを返す
+        
+        Parameters
+        ----------
+        resident : ResidentModel
+            文字起こしの開始時に取得した常駐モデル
+        
+        Returns
+        -------
+        tuple
+            (エンジン, 経路名)。バックエンドがこのモデル用に準備済みでない場合はtransformersのエンジン
+        """
+        with self._backend_lock:
+            engine, path, key = self._backend_engine, self.backend, self._backend_key
+        if engine is None or key is None or key[1:] != resident.key:
+            engine, path = resident.engine, "direct"
+        if engine.supports_hotwords:
+            engine.set_hotwords(self._get_hotword_trie(resident), self.hotword_boost)
+        engine.set_encoder_cache(self._encoder_cache if self.encoder_caching else None)
+        return engine, path
+    
+    def set_engine(self, engine_mode):
+        """
+        文字起こしに使用する推論経路を切り替える
+        
+        Parameters
+        ----------
+        engine_mode : str
+            "direct"（特徴量抽出→generateを直接実行）または "pipeline"（Transformersのパイプライン）
+        """
+        if engine_mode not in self.ENGINE_MODES:
+            raise ValueError(f"Unknown engine mode: {engine_mode}")
+        self.engine_mode = engine_mode
+    
+    def get_last_timings(self):
+        """
+        直前の文字起こしの処理時間の内訳を取得する
+        
+        Returns
+        -------
+        dict
+            使用した経路（path）と各段階の処理時間（秒）
+        """
+        return dict(self._last_timings)
+    
+    def set_speculative_decoding(self, enabled):
+        """
+        投機的デコーディング（ドラフトモデルによるassisted generation）の有効/無効を切り替える
+        
+        貪欲デコーディングと同じ出力のまま、デコーダーの逐次実行回数を減らします。
+        有効化時にドラフトモデルを読み込むため、初回はダウンロードに時間がかかります。
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        
+        Returns
+        -------
+        bool
+            投機的デコーディングが使える状態かどうか（対応するドラフトモデルがない場合はFalse）
+        """
+        self.speculative_decoding = enabled
+        resident = self._resident
+        if not enabled:
+            self.draft_model = None
+            self.draft_model_id = None
+            if resident is not None:
+                resident.draft_model = None
+                resident.draft_model_id = None
+                resident.engine.set_assistant_model(None)
+            return False
+        if self.draft_model is None and resident is not None:
+            self._load_draft_model(resident)
+        return self.draft_model is not None
+    
+    def _load_draft_model(self, resident):
+        """
+        本体のモデルに合うドラフトモデルを読み込み、直接推論エンジンに設定する
+        
+        Parameters
+        ----------
+        resident : ResidentModel
+            ドラフトモデルを設定するモデル（使用中のモデルであれば使用中のドラフトモデルも更新する）
+        """
+        config = resident.model.config
+        draft = self.DRAFT_MODELS.get(getattr(config, "num_mel_bins", None))
+        if draft is None or draft["id"] == resident.model_id:
+            print(f"[WARNING] No draft model available for {resident.model_id}, speculative decoding disabled")
+            return
+        
+        try:
+            print(f"[INFO] Loading draft model for speculative decoding: {draft['id']}")
+            cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
+            # エンコーダーを共有する場合はデコーダーのみを読み込む
+            model_class = AutoModelForCausalLM if draft["shares_encoder"] else AutoModelForSpeechSeq2Seq
+            draft_model = model_class.from_pretrained(
+                draft["id"],
+                torch_dtype=self.torch_dtype,
+                low_cpu_mem_usage=True,
+                use_safetensors=True,
+                cache_dir=cache_dir
+            )
+            draft_model.to(self.device)
+            draft_model.eval()
+        except Exception as e:
+            print(f"[WARNING] Failed to load draft model {draft['id']}: {e}")
+            return
+        
+        # 提案したトークンを本体で検証するため、語彙が一致している必要がある
+        if draft_model.config.vocab_size != config.vocab_size:
+            print(f"[WARNING] Draft model {draft['id']} has a different vocabulary, speculative decoding disabled")
+            return
+        
+        resident.draft_model = draft_model
+        resident.draft_model_id = draft["id"]
+        resident.engine.set_assistant_model(draft_model, shares_encoder=draft["shares_encoder"])
+        if resident is self._resident:
+            self.draft_model = draft_model
+            self.draft_model_id = draft["id"]
+        # 常駐モデルのサイズにドラフトモデルを含める
+        if resident.key in self._model_registry:
+            self._register_model(resident)
+        print(f"[INFO] Speculative decoding enabled with {draft['id']}")
+    
+    def set_trimmed_encoder(self, enabled):
+        """
+        短い音声用のエンコーダー入力短縮の有効/無効を切り替える
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        """
+        self.trimmed_encoder = enabled
+    
+    def get_trimmed_encoder_stats(self):
+        """
+        エンコーダー入力短縮の使用状況を取得する
+        
+        Returns
+        -------
+        dict
+            短縮経路で確定した回数（used）と精度ガードで通常経路に戻した回数（fallback）
+        """
+        return dict(self._trimmed_stats)
+    
+    def set_vad_trimming(self, enabled):
+        """
+        録音の無音除去（VAD）の有効/無効を切り替える
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        """
+        self.vad_trimming = enabled
+    
+    def get_vad_stats(self):
+        """
+        無音除去で削減した音声の長さを取得する
+        
+        Returns
+        -------
+        dict
+            処理した録音数（recordings）、元の合計秒数（original_seconds）、
+            除去した合計秒数（removed_seconds）、直前の録音の内訳（last）
+        """
+        stats = dict(self._vad_stats)
+        stats["last"] = dict(stats["last"]) if stats["last"] else None
+        return stats
+    
+    def set_no_speech_gate(self, enabled):
+        """
+        無音・誤操作の録音のスキップの有効/無効を切り替える
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか
+        """
+        self.no_speech_gate = enabled
+    
+    def get_no_speech_stats(self):
+        """
+        無音と判定してスキップした回数を取得する
+        
+        Returns
+        -------
+        dict
+            録音レベルでスキップした回数（energy）、モデルの無音確率でスキップした回数（model）
+        """
+        return dict(self._no_speech_stats)
+    
+    def get_no_speech_tier(self):
+        """
+        呼び出し元のスレッドで直前に実行したtranscribeが無音と判定した段階を取得する
+        
+        他のスレッド（逐次文字起こし・バッチ処理）の文字起こしの影響を受けないため、
+        transcribeの戻り値と組み合わせて判定に使えます。
+        
+        Returns
+        -------
+        str or None
+            "energy"（録音レベル）、"model"（モデルの無音確率）、無音と判定していない場合はNone
+        """
+        return getattr(self._call_status, "no_speech_tier", None)
+    
+    def skip_silent_recording(self, audio_file):
+        """
+        録音のレベルと長さだけで無音かどうかを判定し、無音であればスキップとして記録する
+        
+        transcribeを経由しない逐次文字起こしの最後の部分の前に、録音全体で1段階目の判定を行うために使います。
+        無音と判定した場合はget_no_speech_stats()・get_no_speech_tier()に"energy"として記録します。
+        
+        Parameters
+        ----------
+        audio_file : AudioBuffer
+            AudioRecorderが返した録音全体の音声バッファ
+        
+        Returns
+        -------
+        bool
+            無音と判定した場合はTrue（無音のスキップが無効、または音声バッファでない場合はFalse）
+        """
+        self._call_status.no_speech_tier = None
+        if not self.no_speech_gate or not isinstance(audio_file, AudioBuffer):
+            return False
+        reason = self._energy_gate(audio_file)
+        if reason is None:
+            return False
+        self._no_speech_response("energy", reason, None, "text", time.time())
+        return True
+    
+    def _energy_gate(self, audio_file):
+        """
+        録音のレベルと長さから、モデルを実行するまでもなく無音かどうかを判定する
+        
+        Parameters
+        ----------
+        audio_file : AudioBuffer
+            AudioRecorderが返した音声バッファ（録音中に計算したレベルを使用）
+        
+        Returns
+        -------
+        str or None
+            無音と判定した理由、発話の可能性がある場合はNone
+        """
+        if audio_file.duration < self.NO_SPEECH_MIN_SECONDS:
+            return f"too short ({audio_file.duration:.2f}s)"
+        if audio_file.peak < self.NO_SPEECH_PEAK_THRESHOLD:
+            return f"low peak level ({audio_file.peak:.4f})"
+        if audio_file.mean < self.NO_SPEECH_MEAN_THRESHOLD:
+            return f"low mean level ({audio_file.mean:.5f})"
+        return None
+    
+    def _no_speech_response(self, tier, reason, language, response_format, start_time):
+        """
+        無音と判定した録音の結果を記録して返す
+        
+        Parameters
+        ----------
+        tier : str
+            判定した段階（"energy" または "model"）
+        reason : str
+            判定の理由（ログ用）
+        language : str or None
+            指定された言語コード
+        response_format : str
+            応答フォーマット
+        start_time : float
+            文字起こしの開始時刻（time.time()）
+        
+        Returns
+        -------
+        str or dict
+            空の文字起こし結果（辞書形式の場合はno_speech=Trueを含む）
+        """
+        self._no_speech_stats[tier] += 1
+        self._call_status.no_speech_tier = tier
+        processing_time = time.time() - start_time
+        self._last_transcription_time = processing_time
+        if tier == "energy":
+            self._last_timings = {"path": "no-speech", "total": processing_time}
+        print(f"[INFO] No speech detected ({tier}: {reason}), skipped in {processing_time:.2f} seconds")
+        result = {"text": "", "chunks": [], "language": None, "no_speech": True, "no_speech_tier": tier}
+        return self._format_result(result, language, response_format)
+    
+    def _apply_vad(self, audio):
+        """
+        録音の先頭・末尾の無音を取り除き、発話途中の長い間を詰める
+        
+        Parameters
+        ----------
+        audio : dict
+            音声データとサンプリングレートを含む辞書
+        
+        Returns
+        -------
+        tuple
+            (無音除去後の音声の辞書, VADResult)、発話が見つからない場合は (元の音声の辞書, None)
+        """
+        start_time = time.perf_counter()
+        vad_result = EnergyVAD(sample_rate=audio["sampling_rate"]).process(audio["array"])
+        if not vad_result.has_speech:
+            # 発話の有無の判定はモデルに任せ、音声はそのまま使う
+            print(f"[INFO] VAD found no speech, using the full recording")
+            return audio, None
+        
+        stats = vad_result.get_stats()
+        self._vad_stats["recordings"] += 1
+        self._vad_stats["original_seconds"] += stats["original_seconds"]
+        self._vad_stats["removed_seconds"] += stats["removed_seconds"]
+        self._vad_stats["last"] = stats
+        print(
+            f"[INFO] VAD removed {stats['removed_seconds']:.2f}s of silence "
+            f"(leading {stats['leading_seconds']:.2f}s, trailing {stats['trailing_seconds']:.2f}s, "
+            f"pauses {stats['internal_seconds']:.2f}s) in {time.perf_counter() - start_time:.3f}s"
+        )
+        return {"array": vad_result.samples, "sampling_rate": audio["sampling_rate"]}, vad_result
+    
+    def _restore_vad_timestamps(self, result, vad_result):
+        """
+        無音除去後の音声でのタイムスタンプを元の録音の時刻に戻す
+        
+        Parameters
+        ----------
+        result : dict
+            chunksを含む文字起こし結果（直接変更する）
+        vad_result : VADResult
+            無音除去の結果
+        """
+        for chunk in result.get("chunks") or []:
+            chunk_start, chunk_end = chunk["timestamp"]
+            chunk["timestamp"] = (
+                round(vad_result.to_original_time(chunk_start), 2) if chunk_start is not None else None,
+                round(vad_result.to_original_time(chunk_end), 2) if chunk_end is not None else None,
+            )
+    
+    def _can_use_engine(self, audio, audio_duration, resident, path):
+        """
+        直接推論エンジンが使えるかどうかを判定する
+        
+        Parameters
+        ----------
+        audio : dict
+            音声データとサンプリングレートを含む辞書
+        audio_duration : float
+            音声の長さ（秒）
+        resident : ResidentModel
+            文字起こしの開始時に取得した常駐モデル
+        path : str
+            文字起こしの開始時に取得したエンジンの経路名
+        
+        Returns
+        -------
+        bool
+            直接推論エンジンを使えるかどうか（30秒を超える音声はパイプラインで処理）
+        """
+        return (
+            self._engine_accepts(audio, resident, path)
+            and audio_duration <= resident.processor.feature_extractor.chunk_length
+        )
+    
+    def _engine_accepts(self, audio, resident, path):
+        """直接推論エンジンが有効で、音声のサンプリングレートがモデルと一致しているかどうか"""
+        return (
+            (self.engine_mode == "direct" or path != "direct")
+            and resident.engine is not None
+            and audio["sampling_rate"] == resident.processor.feature_extractor.sampling_rate
+        )
+    
+    def _can_use_long_form(self, audio, audio_duration, resident, path):
+        """
+        長い音声の分割文字起こしが使えるかどうかを判定する
+        
+        Parameters
+        ----------
+        audio : dict
+            音声データとサンプリングレートを含む辞書
+        audio_duration : float
+            音声の長さ（秒）
+        resident : ResidentModel
+            文字起こしの開始時に取得した常駐モデル
+        path : str
+            文字起こしの開始時に取得したエンジンの経路名
+        
+        Returns
+        -------
+        bool
+            30秒を超える音声を分割文字起こしで処理できるかどうか
+        """
+        return (
+            self.long_form
+            and audio_duration > resident.processor.feature_extractor.chunk_length
+            and self._engine_accepts(audio, resident, path)
+        )
+    
+    def set_long_form(self, enabled, overlap_seconds=None, batch_size=None, segmentation=None):
+        """
+        長い音声の分割文字起こしの設定を変更する
+        
+        Parameters
+        ----------
+        enabled : bool
+            有効にするかどうか（無効の場合はパイプラインで処理）
+        overlap_seconds : float, optional
+            隣接する30秒ウィンドウの重なり（秒、0以上15未満）
+        batch_size : int, optional
+            1回に推論するウィンドウの数
+        segmentation : str, optional
+            分割方法（"vad": 発話の切れ目で分割、"window": 重なりのある固定長ウィンドウ）
+        """
+        if segmentation is not None and segmentation not in self.LONG_FORM_SEGMENTATIONS:
+            raise ValueError(f"Unknown segmentation: {segmentation}")
+        self.long_form = enabled
+        if segmentation is not None:
+            self.long_form_segmentation = segmentation
+        if overlap_seconds is not None:
+            if not 0 <= overlap_seconds < self.LONG_FORM_WINDOW_SECONDS / 2:
+                raise ValueError(f"overlap_seconds must be in [0, {self.LONG_FORM_WINDOW_SECONDS / 2})")
+            self.long_form_overlap_seconds = overlap_seconds
+        if batch_size is not None:
+            self.long_form_batch_size = max(1, int(batch_size))
+    
+    def iter_transcribe_long(self, audio_file, language=None, batch_size=None):
+        """
+        長い音声を分割して文字起こしし、確定した区間を順に返す
+        
+        発話の切れ目で30秒以下の区間に分割し（segmentation="vad"）、batch_size個ずつまとめて推論します。
+        segmentation="window"の場合は30秒のウィンドウを重ねて切り出し、重なり部分は中点を境界として、
+        区間の中央がどちらのウィンドウ側にあるかで振り分けます。
+        いずれも各区間はその区間の推論が終わった時点で確定します。
+        
+        Parameters
+        ----------
+        audio_file : str, AudioBuffer or numpy.ndarray
+            音声ファイルのパス、音声バッファ、または16kHzモノラルの音声配列
+        language : str, optional
+            文字起こしの言語コード（未指定の場合はウィンドウごとに自動検出）
+        batch_size : int, optional
+            1回に推論するウィンドウの数（デフォルト: long_form_batch_size）
+        
+        Yields
+        ------
+        dict
+            text、timestamp（音声先頭からの(開始秒, 終了秒)）、languageを含む区間
+        """
+        # 途中でモデルが切り替わっても同じモデルで処理する
+        resident = self._resident
+        engine, path = self._active_engine(resident)
+        audio = self._prepare_audio(audio_file)
+        if not self._engine_accepts(audio, resident, path):
+            raise RuntimeError("Long-form transcription requires the direct engine and 16kHz audio")
+        prompt = self._build_prompt(resident)
+        for segment in self._iter_long_form(audio, language, prompt, batch_size or self.long_form_batch_size, engine, path):
+            yield self._correct_vocabulary(segment)
+    
+    def _long_form_segments(self, array, sampling_rate):
+        """
+        発話の切れ目で分割した30秒以下の区間を計算する（区間の間の無音は推論しない）
+        
+        Parameters
+        ----------
+        array : numpy.ndarray
+            音声配列
+        sampling_rate : int
+            サンプリングレート
+        
+        Returns
+        -------
+        list of tuple
+            (開始サンプル, 終了サンプル, 担当範囲の開始秒, 担当範囲の終了秒) のリスト
+        """
+        segments = EnergyVAD(sample_rate=sampling_rate).segment(array, self.LONG_FORM_WINDOW_SECONDS)
+        # 区間は重ならないため、出力された区間はすべてその区間のものとする
+        return [(start, end, 0.0, float("inf")) for start, end in segments]
+    
+    def _long_form_windows(self, n_samples, sampling_rate):
+        """
+        ウィンドウの開始位置と、各ウィンドウが担当する区間の範囲を計算する
+        
+        Parameters
+        ----------
+        n_samples : int
+            音声のサンプル数
+        sampling_rate : int
+            サンプリングレート
+        
+        Returns
+        -------
+        list of tuple
+            (開始サンプル, 終了サンプル, 担当範囲の開始秒, 担当範囲の終了秒) のリスト
+        """
+        window = int(self.LONG_FORM_WINDOW_SECONDS * sampling_rate)
+        step = window - int(self.long_form_overlap_seconds * sampling_rate)
+        starts = [0]
+        while starts[-1] + window < n_samples:
+            starts.append(starts[-1] + step)
+        
+        # 隣接ウィンドウの重なりの中点を境界にする
+        boundaries = [(starts[i + 1] + starts[i] + window) / 2 / sampling_rate for i in range(len(starts) - 1)]
+        lows = [0.0] + boundaries
+        highs = boundaries + [float("inf")]
+        ends = [min(n_samples, start + window) for start in starts]
+        return list(zip(starts, ends, lows, highs))
+    
+    def _iter_long_form(self, audio, language, prompt, batch_size, engine, path, temperature=0.0, cache_encoder=False):
+        """
+        長い音声をウィンドウに分割してバッチで推論し、確定した区間を順に返す内部メソッド
+        
+        engine、pathは文字起こしの開始時に_active_engineで取得したもの（途中でモデルが切り替わっても変えない）
+        """
+        cache_key = self._encoder_cache_key(audio, path) if cache_encoder else None
+        array = audio["array"]
+        sampling_rate = audio["sampling_rate"]
+        start_time = time.perf_counter()
+        if self.long_form_segmentation == "vad":
+            windows = self._long_form_segments(array, sampling_rate)
+            speech_seconds = sum(end - start for start, end, _, _ in windows) / sampling_rate
+            print(f"[INFO] Long-form: {len(windows)} speech segments, {speech_seconds:.1f}s of {len(array) / sampling_rate:.1f}s")
+        else:
+            windows = self._long_form_windows(len(array), sampling_rate)
+        timings = {"segmentation": time.perf_counter() - start_time, "generate": 0.0, "total": 0.0,
+                   "windows": len(windows)}
+        
+        for batch_start in range(0, len(windows), batch_size):
+            batch = windows[batch_start:batch_start + batch_size]
+            with self._inference_lock:
+                outputs = engine.transcribe_batch(
+                    [array[start:end] for start, end, _, _ in batch], sampling_rate, language, prompt,
+                    self.LONG_FORM_MAX_NEW_TOKENS, return_timestamps=True, temperature=temperature,
+                    cache_keys=[(cache_key, start, end) for start, end, _, _ in batch] if cache_key else None
+                )
+            timings["generate"] += engine.last_timings.get("generate", 0.0)
+            
+            for (start, end, low, high), output in zip(batch, outputs):
+                offset = start / sampling_rate
+                window_end = end / sampling_rate
+                if output["text"] and _compression_ratio(output["text"]) > self.TRIMMED_COMPRESSION_RATIO_THRESHOLD:
+                    print(f"[WARNING] Repetitive output in window at {offset:.1f}s")
+                
+                # タイムスタンプが出力されなかった場合はウィンドウ全体を1区間とする
+                chunks = output["chunks"] or [{"text": output["text"], "timestamp": (0.0, None)}]
+                for chunk in chunks:
+                    chunk_start, chunk_end = chunk["timestamp"]
+                    chunk_start = offset + (chunk_start or 0.0)
+                    chunk_end = offset + chunk_end if chunk_end is not None else window_end
+                    if not chunk["text"].strip() or not low <= (chunk_start + chunk_end) / 2 < high:
+                        continue
+                    yield {
+                        "text": chunk["text"],
+                        "timestamp": (round(chunk_start, 2), round(min(chunk_end, window_end), 2)),
+                        "language": output["language"],
+                    }
+            
+            print(f"[INFO] Long-form progress: {min(batch_start + batch_size, len(windows))}/{len(windows)} windows")
+        
+        timings["total"] = time.perf_counter() - start_time
+        self._last_timings = dict(timings, path=f"{path}-long-form")
+    
+    def _transcribe_long_form(self, audio, language, prompt, engine, path, temperature=0.0, cache_encoder=False):
+        """
+        長い音声を分割文字起こしし、区間を連結した結果を返す
+        
+        Returns
+        -------
+        dict or None
+            text、chunks、languageを含む文字起こし結果、失敗した場合はNone（パイプラインで処理）
+        """
+        try:
+            chunks = list(self._iter_long_form(
+                audio, language, prompt, self.long_form_batch_size, engine, path, temperature, cache_encoder
+            ))
+        except Exception as e:
+            print(f"[WARNING] Long-form transcription failed, falling back to pipeline: {e}")
+            return None
+        
+        languages = [language for language in (chunk.pop("language") for chunk in chunks) if language]
+        return {
+            "text": "".join(chunk["text"] for chunk in chunks).strip(),
+            "chunks": chunks,
+            "language": max(set(languages), key=languages.count) if languages else None,
+        }
+    
+    def _can_use_trimmed_encoder(self, engine, audio_duration):
+        """
+        エンコーダー入力短縮が使えるかどうかを判定する
+        
+        Parameters
+        ----------
+        engine : WhisperGenerateEngine
+            文字起こしに使用するエンジン
+        audio_duration : float
+            音声の長さ（秒）
+        
+        Returns
+        -------
+        bool
+            短縮経路を使えるかどうか
+        """
+        return (
+            self.trimmed_encoder
+            and audio_duration <= self.TRIMMED_ENCODER_MAX_SECONDS
+            and engine.supports_trimmed_input
+        )
+    
+    def _trimmed_frame_count(self, engine, audio_duration):
+        """
+        音声の長さからエンコーダーに入力するメルフレーム数を決める
+        
+        Parameters
+        ----------
+        engine : WhisperGenerateEngine
+            文字起こしの開始時に取得したエンジン（読み込みの完了で切り替わるself.engineは参照しない）
+        audio_duration : float
+            音声の長さ（秒）
+        
+        Returns
+        -------
+        int
+            メルフレーム数（畳み込みのストライドに合わせて偶数、最大3000）
+        """
+        seconds = max(audio_duration + self.TRIMMED_ENCODER_MARGIN_SECONDS, self.TRIMMED_ENCODER_MIN_SECONDS)
+        return engine.frame_count(seconds)
+    
+    def _transcribe_direct(self, audio, audio_duration, language, prompt, max_new_tokens, return_timestamps,
+                           engine, path, temperature=0.0, cache_encoder=False):
+        """
+        パイプラインを介さずに直接推論エンジンで文字起こしする
+        
+        短い音声はまずエンコーダー入力を短縮して処理し、精度ガードに掛かった場合は
+        30秒分の入力でやり直します。エンジンでエラーが発生した場合はNoneを返し、
+        呼び出し側でパイプラインにフォールバックします。
+        
+        Parameters
+        ----------
+        audio : dict
+            音声データとサンプリングレートを含む辞書
+        audio_duration : float
+            音声の長さ（秒）
+        language : str or None
+            文字起こしの言語コード
+        prompt : CompiledPrompt
+            カスタム語彙とシステム指示から構築したプロンプト
+        max_new_tokens : int
+            生成する最大トークン数
+        return_timestamps : bool
+            タイムスタンプ付きのチャンクを返すかどうか
+        engine : WhisperGenerateEngine
+            文字起こしの開始時に_active_engineで取得したエンジン
+        path : str
+            エンジンの経路名
+        temperature : float, optional
+            サンプリングの温度（0の場合は貪欲デコーディング）
+        cache_encoder : bool, optional
+            エンコーダー出力をキャッシュするかどうか（再文字起こしされうる録音・ファイルのみ）
+        
+        Returns
+        -------
+        dict or None
+            text、chunks、languageを含む文字起こし結果、失敗した場合はNone
+        """
+        no_speech_threshold = self.NO_SPEECH_PROB_THRESHOLD if self.no_speech_gate else None
+        cache_key = self._encoder_cache_key(audio, path) if cache_encoder else None
+        
+        if self._can_use_trimmed_encoder(engine, audio_duration):
+            n_frames = self._trimmed_frame_count(engine, audio_duration)
+            try:
+                with self._inference_lock:
+                    output = engine.transcribe(
+                        audio["array"], audio["sampling_rate"], language, prompt, max_new_tokens,
+                        return_timestamps=return_timestamps, n_frames=n_frames,
+                        no_speech_threshold=no_speech_threshold, temperature=temperature, cache_key=cache_key
+                    )
+                reason = self._trimmed_guard(engine, output, audio_duration, max_new_tokens)
+                if reason is None:
+                    self._trimmed_stats["used"] += 1
+                    if engine.last_timings.get("encoder_cached"):
+                        print(f"[INFO] Reused cached encoder output, decoder only")
+                    self._last_timings = dict(engine.last_timings, path="trimmed")
+                    print(f"[INFO] Trimmed encoder used: {n_frames} mel frames ({n_frames / engine.max_frames:.0%} of 30s)")
+                    return output
+                self._trimmed_stats["fallback"] += 1
+                print(f"[WARNING] Trimmed encoder output rejected ({reason}), falling back to full 30s input")
+            except Exception as e:
+                self._trimmed_stats["fallback"] += 1
+                print(f"[WARNING] Trimmed encoder failed, falling back to full 30s input: {e}")
+        
+        try:
+            with self._inference_lock:
+                output = engine.transcribe(
+                    audio["array"], audio["sampling_rate"], language, prompt, max_new_tokens,
+                    return_timestamps=return_timestamps, no_speech_threshold=no_speech_threshold,
+                    temperature=temperature, cache_key=cache_key
+                )
+            self._last_timings = dict(engine.last_timings, path=path)
+            return output
+        except Exception as e:
+            print(f"[WARNING] {path} engine failed, falling back to pipeline: {e}")
+            return None
+    
+    def _trimmed_guard(self, engine, output, audio_duration, max_new_tokens):
+        """
+        エンコーダー入力を短縮した結果が信頼できるかを確認する（精度ガード）
+        
+        Parameters
+        ----------
+        engine : WhisperGenerateEngine
+            結果を出力したエンジン（読み込みの完了で切り替わるself.engineは参照しない）
+        output : dict
+            直接推論エンジンの文字起こし結果
+        audio_duration : float
+            音声の長さ（秒）
+        max_new_tokens : int
+            生成する最大トークン数
+        
+        Returns
+        -------
+        str or None
+            不採用の理由、問題がなければNone
+        """
+        text = output["text"]
+        if output.get("no_speech"):
+            # 短縮した入力での無音判定は、閾値付近の場合のみ30秒分の入力で確認し直す
+            if output["no_speech_prob"] < self.NO_SPEECH_PROB_THRESHOLD + self.NO_SPEECH_RECHECK_MARGIN:
+                return f"no speech near threshold on trimmed input (no_speech_prob={output['no_speech_prob']:.2f})"
+            return None
+        if engine.count_text_tokens(output["token_ids"]) >= max_new_tokens - 1:
+            return "max_new_tokens reached"
+        if text and _compression_ratio(text) > self.TRIMMED_COMPRESSION_RATIO_THRESHOLD:
+            return "repetitive output"
+        if len(text) > 50 and len(text) / max(audio_duration, 0.1) > self.TRIMMED_MAX_CHARS_PER_SECOND:
+            return "implausible output length"
+        return None
+    
+    def _optimize_generation_params(self, audio_duration):
+        """
+        音声の長さに基づいて生成パラメータを最適化する
+        
+        Parameters
+        ----------
+        audio_duration : float
+            音声の長さ（秒）
+            
+        Returns
+        -------
+        dict
+            最適化された生成パラメータ
+        """
+        # 音声の長さに基づいてパラメータを調整
+        if audio_duration <= 10.0:
+            # 短い音声（10秒以下）- より高速化
+            max_tokens = 64  # より少ないトークン数
+            temperature = 0.0  # 単一の温度値で高速化
+            print(f"[INFO] Short audio detected ({audio_duration:.2f}s), using optimized parameters")
+        elif audio_duration <= 30.0:
+            # 中程度の音声（10-30秒）
             max_tokens = 128  # 短縮
             temperature = 0.0
             print(f"[INFO] Medium audio detected ({audio_duration:.2f}s), using balanced parameters")
@@ -389,18 +2185,250 @@ class WhisperTranscriber:
             "return_timestamps": True,
         }
     
-    def transcribe(self, audio_file, language=None, response_format="text"):
+    def _prepare_audio(self, audio_file):
+        """
+        文字起こしの入力を音声データの辞書に変換する
+        
+        Parameters
+        ----------
+        audio_file : str, AudioBuffer or numpy.ndarray
+            音声ファイルのパス、音声バッファ、または16kHzモノラルの音声配列
+        
+        Returns
+        -------
+        dict
+            音声データとサンプリングレートを含む辞書
+        """
+        if isinstance(audio_file, AudioBuffer):
+            # 録音バッファはコピーせずにそのまま使用（float32のまま）
+            print(f"[INFO] Transcribing recorded buffer: {audio_file.duration:.2f}s")
+            return {
+                "array": audio_file.samples.astype(np.float32, copy=False),
+                "sampling_rate": audio_file.sample_rate
+            }
+        if isinstance(audio_file, np.ndarray):
+            # メモリ上の音声配列はそのまま使用（録音中の逐次文字起こし等）
+            print(f"[INFO] Transcribing in-memory audio: {len(audio_file)} samples")
+            return {
+                "array": audio_file.astype(np.float32, copy=False),
+                "sampling_rate": 16000
+            }
+        
+        # ファイルの存在確認
+        audio_path = Path(audio_file)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_file}")
+        
+        print(f"[INFO] Transcribing: {audio_file}")
+        # 音声ファイルを読み込み
+        return self._load_audio(str(audio_path))
+    
+    def _format_result(self, result, language, response_format):
+        """
+        文字起こし結果を応答フォーマットに合わせて変換する
+        
+        Parameters
+        ----------
+        result : dict
+            パイプラインまたは直接推論エンジンの結果
+        language : str or None
+            指定された言語コード
+        response_format : str
+            応答フォーマット
+        
+        Returns
+        -------
+        str or dict
+            応答フォーマットによって文字列または辞書形式の文字起こし結果
+        """
+        if response_format == "json":
+            formatted = {
+                "text": result["text"],
+                "language": result.get("language") or language,
+                "chunks": result.get("chunks", [])
+            }
+            if result.get("no_speech"):
+                formatted["no_speech"] = True
+                if result.get("no_speech_tier"):
+                    formatted["no_speech_tier"] = result["no_speech_tier"]
+            return formatted
+        elif response_format == "verbose_json":
+            return result
+        return result["text"]
+    
+    def transcribe_batch(self, paths_or_arrays, language=None, response_format="text", batch_size=8):
+        """
+        複数の音声をまとめて文字起こしする
+        
+        30秒以下の音声は長さ順に並べ替え、batch_size件ずつエンコーダー・デコーダーを
+        バッチで実行します。30秒を超える音声は1件ずつtranscribe()で処理します。
+        
+        Parameters
+        ----------
+        paths_or_arrays : list
+            音声ファイルのパス、AudioBuffer、または16kHzモノラルの音声配列のリスト
+        language : str, optional
+            文字起こしの言語コード（未指定の場合は音声ごとに自動検出）
+        response_format : str, optional
+            応答フォーマット："text"、"json"、"verbose_json"
+        batch_size : int, optional
+            1回に推論する音声の数
+        
+        Returns
+        -------
+        list of dict
+            入力と同じ順序の結果。各要素は result（応答フォーマットに応じた文字起こし結果、
+            失敗時はNone）と error（エラーメッセージ、成功時はNone）を含む辞書
+        """
+        start_time = time.time()
+        results = [None] * len(paths_or_arrays)
+        batchable = []
+        individual = []
+        # 途中でモデルが切り替わってもバッチ全体を同じモデルで処理する
+        resident = self._resident
+        engine, path = self._active_engine(resident)
+        prompt = self._build_prompt(resident)
+        return_timestamps = response_format != "text"
+        
+        for index, audio_file in enumerate(paths_or_arrays):
+            try:
+                audio = self._prepare_audio(audio_file)
+            except Exception as e:
+                print(f"[ERROR] Failed to load batch item {index}: {e}")
+                results[index] = {"result": None, "error": str(e)}
+                continue
+            audio_duration = len(audio["array"]) / audio["sampling_rate"]
+            if self._can_use_engine(audio, audio_duration, resident, path):
+                # 文字起こし済みの音声は保存した結果を使う
+                cache_key = self._result_cache_key(
+                    audio_file, audio, language, prompt, return_timestamps, resident, path
+                )
+                cached = self._get_cached_result(cache_key)
+                if cached is not None:
+                    self._correct_vocabulary(cached)
+                    results[index] = {"result": self._format_result(cached, language, response_format), "error": None}
+                    continue
+                batchable.append((index, audio, audio_duration, cache_key))
+            else:
+                individual.append(index)
+        
+        # 長さの近い音声同士をまとめてパディングを最小限にする
+        batchable.sort(key=lambda item: item[2])
+        for batch_start in range(0, len(batchable), max(1, batch_size)):
+            batch = batchable[batch_start:batch_start + max(1, batch_size)]
+            try:
+                outputs = self._transcribe_direct_batch(
+                    [audio for _, audio, _, _ in batch], [duration for _, _, duration, _ in batch],
+                    language, prompt, return_timestamps, engine, path
+                )
+                for (index, _, _, cache_key), output in zip(batch, outputs):
+                    if not output.get("no_speech"):
+                        self._store_result(cache_key, output)
+                        self._correct_vocabulary(output)
+                    results[index] = {"result": self._format_result(output, language, response_format), "error": None}
+            except Exception as e:
+                # バッチ全体が失敗した場合は1件ずつやり直し、失敗した音声のみをエラーにする
+                print(f"[WARNING] Batch transcription failed, retrying items individually: {e}")
+                individual.extend(index for index, _, _, _ in batch)
+        
+        for index in individual:
+            try:
+                result = self.transcribe(paths_or_arrays[index], language, response_format)
+                results[index] = {"result": result, "error": None}
+            except Exception as e:
+                results[index] = {"result": None, "error": str(e)}
+        
+        processing_time = time.time() - start_time
+        self._last_transcription_time = processing_time
+        failed = sum(1 for result in results if result["error"] is not None)
+        print(f"[INFO] Batch transcription completed: {len(results)} items ({failed} failed) in {processing_time:.2f} seconds")
+        return results
+    
+    def _transcribe_direct_batch(self, audios, durations, language, prompt, return_timestamps, engine, path):
+        """
+        30秒以下の音声を1バッチとして直接推論エンジンで文字起こしする
+        
+        エンコーダー入力の短縮が使える場合は最長の音声に合わせて短縮し、
+        精度ガードに掛かった音声のみを30秒入力でまとめてやり直します。
+        
+        Parameters
+        ----------
+        audios : list of dict
+            音声データとサンプリングレートを含む辞書のリスト（サンプリングレートは共通）
+        durations : list of float
+            各音声の長さ（秒）
+        language : str or None
+            文字起こしの言語コード
+        prompt : CompiledPrompt
+            カスタム語彙とシステム指示から構築したプロンプト
+        return_timestamps : bool
+            タイムスタンプ付きのチャンクを返すかどうか
+        engine : WhisperGenerateEngine
+            transcribe_batchの開始時に_active_engineで取得したエンジン
+        path : str
+            エンジンの経路名
+        
+        Returns
+        -------
+        list of dict
+            入力と同じ順序の、text、chunks、languageを含む文字起こし結果
+        """
+        longest = max(durations)
+        max_new_tokens = self._optimize_generation_params(longest)["max_new_tokens"]
+        if prompt:
+            max_new_tokens = prompt.max_new_tokens(max_new_tokens)
+        arrays = [audio["array"] for audio in audios]
+        sampling_rate = audios[0]["sampling_rate"]
+        
+        outputs = [None] * len(audios)
+        pending = list(range(len(audios)))
+        if self._can_use_trimmed_encoder(engine, longest):
+            n_frames = self._trimmed_frame_count(engine, longest)
+            with self._inference_lock:
+                trimmed_outputs = engine.transcribe_batch(
+                    arrays, sampling_rate, language, prompt, max_new_tokens,
+                    return_timestamps=return_timestamps, n_frames=n_frames
+                )
+            pending = []
+            for i, output in enumerate(trimmed_outputs):
+                reason = self._trimmed_guard(engine, output, durations[i], max_new_tokens)
+                if reason is None:
+                    self._trimmed_stats["used"] += 1
+                    outputs[i] = output
+                else:
+                    self._trimmed_stats["fallback"] += 1
+                    print(f"[WARNING] Trimmed encoder output rejected for batch item ({reason}), retrying with full 30s input")
+                    pending.append(i)
+            path = "trimmed"
+        
+        if pending:
+            with self._inference_lock:
+                full_outputs = engine.transcribe_batch(
+                    [arrays[i] for i in pending], sampling_rate, language, prompt, max_new_tokens,
+                    return_timestamps=return_timestamps
+                )
+            for i, output in zip(pending, full_outputs):
+                outputs[i] = output
+        
+        self._last_timings = dict(engine.last_timings, path=f"{path}-batch")
+        print(f"[INFO] Transcribed batch of {len(audios)} ({path}, longest {longest:.2f}s)")
+        return outputs
+    
+    def transcribe(self, audio_file, language=None, response_format="text", temperature=0.0):
         """
         ローカルWhisperモデルを使用して音声を文字起こしする
         
         Parameters
         ----------
-        audio_file : str
-            文字起こしする音声ファイルのパス
+        audio_file : str, AudioBuffer or numpy.ndarray
+            文字起こしする音声ファイルのパス、AudioRecorderが返した音声バッファ、
+            または16kHzモノラルの音声配列
         language : str, optional
             文字起こしの言語コード（例："en"、"ja"、"zh"）
         response_format : str, optional
             応答フォーマット："text"、"json"、"verbose_json"、または"vtt"
+        temperature : float, optional
+            サンプリングの温度（0の場合は貪欲デコーディング。0より大きい場合は結果をキャッシュしない）
             
         Returns
         -------
@@ -408,18 +2436,51 @@ class WhisperTranscriber:
             応答フォーマットによって文字列または辞書形式の文字起こし結果
         """
         start_time = time.time()
+        self._call_status.no_speech_tier = None
         
         try:
-            # ファイルの存在確認
-            audio_path = Path(audio_file)
-            if not audio_path.exists():
-                raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_file}")
+            # モデル・量子化の切り替えは推論と並行して進むため、常駐モデルとエンジンは開始時に一度だけ取得し、
+            # トークナイザー・エンジン・結果のキャッシュのキーはすべてこれに揃える
+            resident = self._resident
+            engine, path = self._active_engine(resident)
+            audio = self._prepare_audio(audio_file)
             
-            print(f"[INFO] Transcribing: {audio_file}")
-            print(f"[INFO] Language: {language or 'auto'}")
+            # 再文字起こしで同じ条件かどうかを判定するため、入力と条件を記録する
+            # （メモリ上の音声配列は逐次文字起こしの途中経過のため、エンコーダー出力もキャッシュしない）
+            prompt = self._build_prompt(resident)
+            cache_encoder = not isinstance(audio_file, np.ndarray)
+            if cache_encoder:
+                self._last_request = (audio_file, self._request_conditions(language, prompt))
+            
+            # 録音のレベルが低すぎる・短すぎる場合はモデルを実行しない
+            if self.no_speech_gate and isinstance(audio_file, AudioBuffer):
+                reason = self._energy_gate(audio_file)
+                if reason is not None:
+                    return self._no_speech_response("energy", reason, language, response_format, start_time)
+            
+            # 同じ音声・設定で文字起こし済みであれば保存した結果を返す（サンプリングした結果はキャッシュしない）
+            cache_key = None
+            if temperature <= 0:
+                cache_key = self._result_cache_key(
+                    audio_file, audio, language, prompt, response_format != "text", resident, path,
+                    vad_trimmed=self.vad_trimming and isinstance(audio_file, AudioBuffer)
+                )
+            result = self._get_cached_result(cache_key)
+            if result is not None:
+                processing_time = time.time() - start_time
+                self._last_transcription_time = processing_time
+                self._last_timings = {"path": "cache", "total": processing_time}
+                print(f"[INFO] Transcription loaded from result cache in {processing_time:.3f} seconds")
+                self._correct_vocabulary(result)
+                self._observe_transcript(result["text"])
+                return self._format_result(result, language, response_format)
             
-            # 音声ファイルを読み込み
-            audio = self._load_audio(str(audio_path))
+            # 録音バッファは前後の無音と長い間を除去してから推論する
+            vad_result = None
+            if self.vad_trimming and isinstance(audio_file, AudioBuffer):
+                audio, vad_result = self._apply_vad(audio)
+            
+            print(f"[INFO] Language: {language or 'auto'}")
             
             # 音声の長さをチェック
             audio_duration = len(audio["array"]) / audio["sampling_rate"]
@@ -435,68 +2496,66 @@ class WhisperTranscriber:
             else:
                 print(f"[INFO] Using automatic language detection")
             
-            # カスタム語彙とシステム指示を処理（簡素化版）
-            prompt = self._build_prompt()
+            # パイプラインは入力辞書のキーをpopするため、キャッシュを壊さないよう毎回新しい辞書を渡す
+            pipe_input = {"raw": audio["array"], "sampling_rate": audio["sampling_rate"]}
+            
+            # カスタム語彙とシステム指示のプロンプト（変更がなければトークン化済みのものを再利用）
             if prompt:
-                print(f"[INFO] Using custom prompt: {prompt}")
-                # プロンプトが長い場合はmax_new_tokensを調整
-                prompt_length = len(prompt.split())
-                if prompt_length > 50:  # プロンプトが長い場合
-                    generate_kwargs["max_new_tokens"] = max(128, generate_kwargs["max_new_tokens"] - prompt_length)
-                
-                # プロンプトを直接渡す（簡素化）
-                try:
-                    result = self.pipe(audio, generate_kwargs=generate_kwargs, prompt=prompt)
-                except TypeError:
-                    # promptパラメータがサポートされていない場合は、forced_decoder_idsを使用
-                    print(f"[WARNING] Direct prompt not supported, using forced_decoder_ids")
-                    prompt_tokens = self.processor.tokenizer.encode(prompt, add_special_tokens=False)
-                    
-                    # 言語とタスクを明示的に設定して警告を回避
-                    if language and language != "auto":
-                        generate_kwargs["language"] = language
-                    generate_kwargs["task"] = "transcribe"
-                    
-                    # forced_decoder_idsを使用（警告は出るが動作する）
-                    decoder_prompt_ids = self.processor.get_decoder_prompt_ids(language=language or "en", task="transcribe")
-                    
-                    # forced_decoder_idsを正しく設定
-                    if isinstance(decoder_prompt_ids, tuple):
-                        forced_decoder_ids = list(decoder_prompt_ids)
-                    else:
-                        forced_decoder_ids = [decoder_prompt_ids]
-                    
-                    # プロンプトトークンを追加
-                    if forced_decoder_ids and len(forced_decoder_ids) > 0:
-                        if isinstance(forced_decoder_ids[0], list):
-                            forced_decoder_ids[0].extend(prompt_tokens)
-                        else:
-                            forced_decoder_ids[0] = list(forced_decoder_ids[0]) + prompt_tokens
-                    
-                    generate_kwargs["forced_decoder_ids"] = forced_decoder_ids
-                    result = self.pipe(audio, generate_kwargs=generate_kwargs)
-            else:
-                # 文字起こしを実行（プロンプトなし）
-                result = self.pipe(audio, generate_kwargs=generate_kwargs)
+                print(f"[INFO] Using custom prompt ({prompt.token_count} tokens): {prompt.text}")
+                # プロンプトと合わせてデコーダーの最大長に収まるようにする
+                generate_kwargs["max_new_tokens"] = prompt.max_new_tokens(generate_kwargs["max_new_tokens"])
+            
+            result = None
+            
+            # 30秒以下の音声はパイプラインを介さずに直接推論（失敗した場合はパイプラインにフォールバック）
+            if self._can_use_engine(audio, audio_duration, resident, path):
+                result = self._transcribe_direct(
+                    audio, audio_duration, language, prompt, generate_kwargs["max_new_tokens"],
+                    response_format != "text", engine, path, temperature=temperature,
+                    cache_encoder=cache_encoder
+                )
+            elif self._can_use_long_form(audio, audio_duration, resident, path):
+                # 30秒を超える音声は重なりのあるウィンドウに分割してバッチで推論
+                result = self._transcribe_long_form(
+                    audio, language, prompt, engine, path, temperature, cache_encoder
+                )
+            
+            use_pipeline = result is None
+            pipeline_start = time.perf_counter()
+            if result is None:
+                if prompt and resident.prompt_ids_supported:
+                    generate_kwargs["prompt_ids"] = prompt.input_ids(self.device)
+                logits_processor = self._hotword_logits_processor(resident)
+                if logits_processor is not None:
+                    generate_kwargs["logits_processor"] = logits_processor
+                if temperature > 0:
+                    generate_kwargs["temperature"] = temperature
+                with self._inference_lock:
+                    result = resident.pipe(pipe_input, generate_kwargs=generate_kwargs)
+            
+            if use_pipeline:
+                self._last_timings = {"path": "pipeline", "total": time.perf_counter() - pipeline_start}
+            if vad_result is not None:
+                self._last_timings["vad_removed_seconds"] = vad_result.removed_seconds
+            if result.get("no_speech"):
+                reason = f"no_speech_prob={result['no_speech_prob']:.2f}"
+                return self._no_speech_response("model", reason, language, response_format, start_time)
+            if vad_result is not None:
+                if response_format != "text":
+                    self._restore_vad_timestamps(result, vad_result)
+            self._store_result(cache_key, result)
             
             # 処理時間を記録
             processing_time = time.time() - start_time
             self._last_transcription_time = processing_time
-            print(f"[INFO] Transcription completed successfully in {processing_time:.2f} seconds")
+            print(f"[INFO] Transcription completed successfully in {processing_time:.2f} seconds ({self._last_timings.get('path')})")
+            
+            # 語彙に近い誤認識を語彙の表記に揃えてから、次の録音のプロンプトに含める語彙の優先度を更新
+            self._correct_vocabulary(result)
+            self._observe_transcript(result["text"])
             
             # 応答フォーマットに応じて結果を返す
-            if response_format == "text":
-                return result["text"]
-            elif response_format == "json":
-                return {
-                    "text": result["text"],
-                    "language": result.get("language", language),
-                    "chunks": result.get("chunks", [])
-                }
-            elif response_format == "verbose_json":
-                return result
-            else:
-                return result["text"]
+            return self._format_result(result, language, response_format)
                 
         except Exception as e:
             processing_time = time.time() - start_time
@@ -507,6 +2566,40 @@ class WhisperTranscriber:
                 print(f"[ERROR] The fix has been applied with return_timestamps=True parameter.")
             raise
     
+    def _request_conditions(self, language, prompt):
+        """文字起こしの結果を左右する条件（言語, プロンプトのハッシュ）"""
+        return (language if language and language != "auto" else None, prompt.digest if prompt else None)
+    
+    def retranscribe(self, audio_file, language=None, response_format="text"):
+        """
+        文字起こし済みの音声をもう一度文字起こしする
+        
+        エンコーダー出力はキャッシュから再利用し、デコーダーのみを実行します。
+        直前の文字起こしと同じ音声・言語・プロンプトの場合は、同じ結果にならないよう
+        RETRANSCRIBE_TEMPERATUREでサンプリングして別の候補を返します。
+        
+        Parameters
+        ----------
+        audio_file : str or AudioBuffer
+            文字起こし済みの音声ファイルのパス、または録音した音声バッファ
+        language : str, optional
+            文字起こしの言語コード
+        response_format : str, optional
+            応答フォーマット："text"、"json"、"verbose_json"
+        
+        Returns
+        -------
+        str or dict
+            応答フォーマットによって文字列または辞書形式の文字起こし結果
+        """
+        temperature = 0.0
+        if self._last_request is not None:
+            last_file, last_conditions = self._last_request
+            if last_file == audio_file and last_conditions == self._request_conditions(language, self._build_prompt(self._resident)):
+                temperature = self.RETRANSCRIBE_TEMPERATURE
+        print(f"[INFO] Re-transcribing last recording (temperature={temperature})")
+        return self.transcribe(audio_file, language, response_format, temperature=temperature)
+    
     def get_last_transcription_time(self):
         """
         最後の文字起こし処理時間を取得する
@@ -517,3 +2610,21 @@ class WhisperTranscriber:
             最後の文字起こし処理にかかった時間（秒）
         """
         return self._last_transcription_time
+
+
+def _compression_ratio(text):
+    """
+    テキストの圧縮率を計算する（繰り返しの多い出力ほど大きくなる）
+    
+    Parameters
+    ----------
+    text : str
+        対象のテキスト
+    
+    Returns
+    -------
+    float
+        元のバイト数 / zlib圧縮後のバイト数
+    """
+    text_bytes = text.encode("utf-8")
+    return len(text_bytes) / len(zlib.compress(text_bytes))
@@ -0,0 +1,755 @@
+import copy
+import inspect
+import time
+
+import torch
+import torch.nn.functional as F
+from transformers import LogitsProcessorList
+from transformers.generation import GenerationMixin
+from transformers.modeling_outputs import BaseModelOutput
+
+from src.core.hotwords import HOTWORD_BOOST, HotwordLogitsProcessor
+from src.core.prompt import CompiledPrompt
+
+
+class WhisperGenerateEngine:
+    """
+    パイプラインを介さずにWhisperモデルで文字起こしを行う軽量エンジン
+
+    特徴量の抽出・model.generate・デコードを直接行います。
+    transformersのASRパイプラインが毎回行う汎用的な前処理・チャンク処理・
+    後処理を省き、プロンプトのトークンIDも同じプロンプトであれば再利用します。
+    30秒以下の音声を対象とし、長い音声はパイプラインで処理します。
+    """
+
+    def __init__(self, model, processor, device, torch_dtype):
+        """
+        エンジンの初期化
+
+        Parameters
+        ----------
+        model : transformers.WhisperForConditionalGeneration
+            読み込み済みのWhisperモデル
+        processor : transformers.WhisperProcessor
+            特徴量抽出器とトークナイザー
+        device : str
+            モデルを配置したデバイス
+        torch_dtype : torch.dtype
+            モデルのデータ型
+        """
+        self.model = model
+        self.processor = processor
+        self.feature_extractor = processor.feature_extractor
+        self.tokenizer = processor.tokenizer
+        self.device = device
+        self.torch_dtype = torch_dtype
+
+        # <|startoftranscript|>（これより前はプロンプト）
+        self.start_token_id = self.tokenizer.convert_tokens_to_ids("<|startoftranscript|>")
+
+        # 無音判定に使う<|nospeech|>（古いモデルでは<|nocaptions|>）
+        self.no_speech_token_id = None
+        for token in ("<|nospeech|>", "<|nocaptions|>"):
+            token_id = self.tokenizer.convert_tokens_to_ids(token)
+            if token_id is not None and token_id != self.tokenizer.unk_token_id:
+                self.no_speech_token_id = token_id
+                break
+
+        # 文字列で渡されたプロンプトのトークン化結果（同じプロンプトであれば再利用する）
+        self._prompt_cache = (None, None)
+
+        # エンコーダー層の呼び出し引数（Transformersのバージョン差を初回に吸収する）
+        self._encoder_layer_kwargs = None
+
+        # エンコーダー入力の短縮にはPyTorchのエンコーダー（畳み込み層）が必要
+        # （ONNX Runtime等でエクスポートしたモデルは3000フレーム固定）
+        encoder = model.get_encoder() if hasattr(model, "get_encoder") else None
+        self.supports_trimmed_input = isinstance(encoder, torch.nn.Module) and hasattr(encoder, "conv1")
+
+        # 全体のデコード前の無音判定（エンコーダー出力を分けて扱えるモデルのみ）
+        self.supports_no_speech_check = self.supports_trimmed_input and self.no_speech_token_id is not None
+
+        # 無音判定で計算したデコーダー入力のKVキャッシュを同じ音声のgenerateで再利用する
+        # （言語を指定した場合のみ。Transformersのバージョンが対応していない場合は初回の失敗で無効化する）
+        self.reuse_prefix_cache = True
+        # 汎用のgenerate用の生成設定（チェックポイントのforced_decoder_idsは位置で強制するため、
+        # プロンプトを先頭に付けたデコーダー入力と位置がずれる。初回の使用時に作成する）
+        self._prefix_generation_config = None
+
+        # 投機的デコーディング用のドラフトモデル（Noneの場合は通常の貪欲デコーディング）
+        self.assistant_model = None
+        self.assistant_shares_encoder = False
+        # エンコーダー出力を渡して生成する場合に、ドラフトモデル自身のエンコーダー出力を渡せるか
+        # （Transformersのバージョンが対応していない場合は初回の失敗で無効化する）
+        self.supports_assistant_encoder_outputs = True
+
+        # カスタム語彙のトライ木（Noneの場合は語彙の続きを優遇しない）
+        self.supports_hotwords = True
+        self.hotwords = None
+        self.hotword_boost = HOTWORD_BOOST
+
+        # 音声ごとのエンコーダー出力のキャッシュ（LRUCache、Noneの場合はキャッシュしない）
+        self.encoder_cache = None
+
+        # 直前の処理時間の内訳（秒）
+        self.last_timings = {}
+
+    def set_assistant_model(self, assistant_model, shares_encoder=False):
+        """
+        投機的デコーディング（assisted generation）に使うドラフトモデルを設定する
+
+        ドラフトモデルが提案したトークンを本体のモデルがまとめて検証するため、
+        貪欲デコーディングと同じ出力のままデコーダーの逐次実行回数を減らせます。
+
+        Parameters
+        ----------
+        assistant_model : transformers.PreTrainedModel or None
+            ドラフトモデル（Noneで無効化）
+        shares_encoder : bool, optional
+            ドラフトモデルがデコーダーのみで、本体のエンコーダー出力を共有するかどうか
+            （共有しない場合、ドラフトモデルは30秒入力で自身のエンコーダーを実行する）
+        """
+        self.assistant_model = assistant_model
+        self.assistant_shares_encoder = shares_encoder
+
+    def set_hotwords(self, trie, boost=HOTWORD_BOOST):
+        """
+        デコード中にカスタム語彙の続きのトークンを優遇するトライ木を設定する
+
+        Parameters
+        ----------
+        trie : HotwordTrie or None
+            カスタム語彙のトライ木（Noneまたは空で無効化）
+        boost : float, optional
+            部分一致した語彙の続きのトークンに加えるロジット
+        """
+        self.hotwords = trie if trie else None
+        self.hotword_boost = boost
+
+    def set_encoder_cache(self, cache):
+        """
+        エンコーダー出力をキャッシュするLRUCacheを設定する
+
+        同じ音声を言語・プロンプト・温度を変えて文字起こしし直す場合に、
+        エンコーダーを実行せずにデコーダーのみを実行します。
+
+        Parameters
+        ----------
+        cache : LRUCache or None
+            (キー, メルフレーム数) をキーにエンコーダー出力を保持するキャッシュ（Noneで無効化）
+        """
+        self.encoder_cache = cache
+
+    def _encode_cached(self, input_features, cached, cache_keys, n_frames):
+        """
+        キャッシュにないエンコーダー出力のみを計算し、入力と同じ順序で連結する
+
+        Parameters
+        ----------
+        input_features : torch.Tensor or None
+            キャッシュになかった音声のメル特徴量（すべてキャッシュにある場合はNone）
+        cached : list
+            音声ごとのキャッシュしたエンコーダー出力（ない音声はNone、計算した出力で埋める）
+        cache_keys : list
+            音声ごとのキャッシュのキー
+        n_frames : int
+            メルフレーム数
+
+        Returns
+        -------
+        BaseModelOutput
+            バッチ全体のエンコーダー出力
+        """
+        if input_features is not None:
+            encoder_outputs = self.encode(input_features)
+            hidden_states = encoder_outputs.last_hidden_state
+            missing = [index for index, hidden in enumerate(cached) if hidden is None]
+            for row, index in enumerate(missing):
+                # バッチ全体のテンソルを保持しないよう、音声ごとにコピーしてから保存する
+                hidden = hidden_states[row:row + 1].clone()
+                self.encoder_cache.put(
+                    (cache_keys[index], n_frames), hidden, size=hidden.element_size() * hidden.nelement()
+                )
+                cached[index] = hidden
+            if len(missing) == len(cached):
+                return encoder_outputs
+        return BaseModelOutput(last_hidden_state=torch.cat(cached))
+
+    @property
+    def max_frames(self):
+        """エンコーダーの最大入力メルフレーム数（30秒）"""
+        return self.feature_extractor.nb_max_frames
+
+    @property
+    def frames_per_second(self):
+        """1秒あたりのメルフレーム数"""
+        return self.feature_extractor.sampling_rate / self.feature_extractor.hop_length
+
+    def frame_count(self, seconds):
+        """
+        指定秒数をカバーするメルフレーム数を返す
+
+        Parameters
+        ----------
+        seconds : float
+            カバーする長さ（秒）
+
+        Returns
+        -------
+        int
+            メルフレーム数（畳み込みのストライドに合わせて偶数、最大3000）
+        """
+        n_frames = int(-(-seconds * self.frames_per_second // 1))
+        n_frames += n_frames % 2
+        return min(n_frames, self.max_frames)
+
+    def extract_features(self, array, sampling_rate, n_frames=None):
+        """
+        音声からメル特徴量を抽出する
+
+        Parameters
+        ----------
+        array : numpy.ndarray or list of numpy.ndarray
+            float32の音声配列（複数の場合はリスト）
+        sampling_rate : int
+            サンプリングレート
+        n_frames : int, optional
+            出力するメルフレーム数（デフォルト: 3000 = 30秒）
+
+        Returns
+        -------
+        torch.Tensor
+            (batch, n_mels, n_frames) 形状のメル特徴量（モデルのデバイス・dtype）
+        """
+        n_frames = n_frames or self.max_frames
+        return self.feature_extractor(
+            array,
+            sampling_rate=sampling_rate,
+            padding="max_length",
+            max_length=n_frames * self.feature_extractor.hop_length,
+            truncation=True,
+            return_tensors="pt"
+        ).input_features.to(self.device, dtype=self.torch_dtype)
+
+    def encode(self, input_features):
+        """
+        エンコーダーを実行する（3000フレーム未満の入力にも対応）
+
+        Transformersのエンコーダーは3000フレーム以外の入力を受け付けないため、
+        短い入力では同じ計算（畳み込み・位置埋め込み・Transformer層）を入力長に合わせて行います。
+
+        Parameters
+        ----------
+        input_features : torch.Tensor
+            (batch, n_mels, n_frames) 形状のメル特徴量
+
+        Returns
+        -------
+        BaseModelOutput
+            model.generateにencoder_outputsとして渡せるエンコーダー出力
+        """
+        encoder = self.model.get_encoder()
+        if input_features.shape[-1] == self.max_frames:
+            return encoder(input_features)
+
+        if self._encoder_layer_kwargs is None:
+            params = inspect.signature(encoder.layers[0].forward).parameters
+            self._encoder_layer_kwargs = {
+                name: None for name in ("attention_mask", "layer_head_mask") if name in params
+            }
+
+        hidden_states = F.gelu(encoder.conv1(input_features))
+        hidden_states = F.gelu(encoder.conv2(hidden_states))
+        hidden_states = hidden_states.permute(0, 2, 1)
+        hidden_states = hidden_states + encoder.embed_positions.weight[:hidden_states.shape[1]]
+
+        for layer in encoder.layers:
+            layer_outputs = layer(hidden_states, **self._encoder_layer_kwargs)
+            hidden_states = layer_outputs[0] if isinstance(layer_outputs, tuple) else layer_outputs
+
+        hidden_states = encoder.layer_norm(hidden_states)
+        return BaseModelOutput(last_hidden_state=hidden_states)
+
+    def decoder_input_ids(self, prompt_ids, language, batch_size):
+        """
+        言語を指定した場合にgenerateが組み立てるデコーダー入力を返す
+
+        プロンプト + <|startoftranscript|> + 言語 + <|transcribe|> + <|notimestamps|> の順で、
+        無音判定のKVキャッシュをgenerateで再利用するときにこのまま渡します。
+
+        Parameters
+        ----------
+        prompt_ids : torch.Tensor or None
+            <|startofprev|>付きのプロンプトトークンID
+        language : str or None
+            言語コード
+        batch_size : int
+            バッチサイズ
+
+        Returns
+        -------
+        torch.Tensor or None
+            (batch, length) 形状のトークンID、言語を自動検出する場合や言語トークンがない場合はNone
+        """
+        if not language or language == "auto":
+            return None
+        token_ids = []
+        for token in (f"<|{language}|>", "<|transcribe|>", "<|notimestamps|>"):
+            token_id = self.tokenizer.convert_tokens_to_ids(token)
+            if token_id is None or token_id == self.tokenizer.unk_token_id:
+                return None
+            token_ids.append(token_id)
+        prefix = torch.tensor([self.start_token_id] + token_ids, device=self.device)
+        if prompt_ids is not None:
+            prefix = torch.cat([prompt_ids.to(self.device), prefix])
+        return prefix.unsqueeze(0).expand(batch_size, -1)
+
+    def no_speech_probs(self, encoder_outputs, prompt_ids=None, decoder_input_ids=None):
+        """
+        デコーダーを実行し、<|startoftranscript|>の次が<|nospeech|>である確率を返す
+
+        Parameters
+        ----------
+        encoder_outputs : BaseModelOutput
+            エンコーダー出力
+        prompt_ids : torch.Tensor, optional
+            <|startofprev|>付きのプロンプトトークンID（生成時と同じ条件で判定する）
+        decoder_input_ids : torch.Tensor, optional
+            generateに渡すデコーダー入力（decoder_input_ids()の戻り値）。指定した場合は最後のトークンを除いた
+            範囲を実行し、そのKVキャッシュを返す（generateは最後のトークンから続きを計算する）
+
+        Returns
+        -------
+        tuple
+            (音声ごとの無音確率のリスト, KVキャッシュ, KVキャッシュを計算したトークンID)
+            decoder_input_idsを指定しない場合、KVキャッシュとトークンIDはNoneです。
+            KVキャッシュは同じエンコーダー出力に対するgenerateでのみ再利用できます。
+        """
+        batch_size = encoder_outputs.last_hidden_state.shape[0]
+        if decoder_input_ids is not None:
+            probe_ids = decoder_input_ids[:, :-1]
+        else:
+            start = torch.tensor([self.start_token_id], device=self.device)
+            prefix = torch.cat([prompt_ids.to(self.device), start]) if prompt_ids is not None else start
+            probe_ids = prefix.unsqueeze(0).expand(batch_size, -1)
+        start_index = probe_ids[0].tolist().index(self.start_token_id)
+        use_cache = decoder_input_ids is not None
+        outputs = self.model(encoder_outputs=encoder_outputs, decoder_input_ids=probe_ids, use_cache=use_cache)
+        logits = outputs.logits[:, start_index].float()
+        probs = torch.softmax(logits, dim=-1)[:, self.no_speech_token_id].tolist()
+        if not use_cache:
+            return probs, None, None
+        return probs, outputs.past_key_values, probe_ids
+
+    def _encode_for_assistant(self, array, sampling_rate, input_features, n_frames):
+        """
+        エンコーダーを共有しないドラフトモデル用に、30秒入力のエンコーダー出力を計算する
+
+        本体のエンコーダー出力（短縮入力・キャッシュ）とは別に、ドラフトモデルは自身のエンコーダーを
+        通常の30秒入力で1回だけ実行します。本体が30秒入力の場合は抽出済みの特徴量を再利用します。
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            float32の音声配列
+        sampling_rate : int
+            サンプリングレート
+        input_features : torch.Tensor or None
+            本体用に抽出したメル特徴量（キャッシュを使った場合はNone）
+        n_frames : int
+            本体用のメルフレーム数
+
+        Returns
+        -------
+        BaseModelOutput
+            ドラフトモデルのエンコーダー出力
+        """
+        if input_features is None or n_frames != self.max_frames:
+            input_features = self.extract_features([array], sampling_rate)
+        return self.assistant_model.get_encoder()(input_features)
+
+    def _generate_from_encoder_outputs(self, encoder_outputs, generate_kwargs, prefix_cache=None,
+                                       probe_ids=None, decoder_input_ids=None):
+        """
+        エンコーダー出力からgenerateを実行する（無音判定のKVキャッシュがあれば再利用）
+
+        デコーダーのプロンプト部分のKVは自己注意だけでなくエンコーダー出力へのクロス注意にも依存するため、
+        同じ音声の無音判定で計算したものに限って再利用します。
+        Whisperのgenerateはデコーダー入力を内部で組み立てるため、KVキャッシュを再利用する場合は
+        キャッシュと一致するデコーダー入力を明示的に渡し、汎用のgenerateで生成します。
+        """
+        if (prefix_cache is not None and decoder_input_ids is not None and self.reuse_prefix_cache
+                and "assistant_model" not in generate_kwargs and not generate_kwargs.get("return_timestamps")):
+            # キャッシュが最後のトークンを除くデコーダー入力と一致しない場合は例外なしに誤った結果になるため、
+            # 一致しない場合はキャッシュを使わずにWhisperのgenerateで生成する
+            expected_ids = decoder_input_ids[:, :-1]
+            if (probe_ids is None or probe_ids.shape != expected_ids.shape
+                    or not torch.equal(probe_ids.to(expected_ids.device), expected_ids)):
+                print(f"[WARNING] Prompt KV cache does not match decoder input, generating without it")
+                return self.model.generate(encoder_outputs=encoder_outputs, **generate_kwargs)
+            kwargs = {
+                key: value for key, value in generate_kwargs.items()
+                if key not in ("prompt_ids", "language", "task", "return_timestamps")
+            }
+            try:
+                return GenerationMixin.generate(
+                    self.model, encoder_outputs=encoder_outputs, decoder_input_ids=decoder_input_ids,
+                    past_key_values=prefix_cache, generation_config=self._get_prefix_generation_config(), **kwargs
+                )
+            except Exception as e:
+                self.reuse_prefix_cache = False
+                print(f"[WARNING] Prompt KV cache reuse is not supported, disabling: {e}")
+        return self.model.generate(encoder_outputs=encoder_outputs, **generate_kwargs)
+
+    def _get_prefix_generation_config(self):
+        """
+        KVキャッシュを再利用する汎用のgenerate用の生成設定を返す
+
+        チェックポイントの生成設定のコピーからforced_decoder_idsを外します（言語・タスクは
+        decoder_input_idsに含めて渡すため）。begin_suppress_tokensはデコーダー入力の直後の位置、
+        つまりWhisperのgenerateと同じ最初の生成トークンに適用されるため、そのまま残します。
+        """
+        if self._prefix_generation_config is None:
+            generation_config = copy.deepcopy(self.model.generation_config)
+            generation_config.forced_decoder_ids = None
+            self._prefix_generation_config = generation_config
+        return self._prefix_generation_config
+
+    def no_speech_result(self, no_speech_prob):
+        """
+        無音と判定した音声の結果を返す
+
+        Parameters
+        ----------
+        no_speech_prob : float
+            無音確率
+
+        Returns
+        -------
+        dict
+            空のtextとno_speech=Trueを含む辞書（decode()と同じキーを持つ）
+        """
+        return {
+            "text": "",
+            "chunks": [],
+            "language": None,
+            "token_ids": [],
+            "no_speech": True,
+            "no_speech_prob": no_speech_prob,
+        }
+
+    def compile_prompt(self, prompt):
+        """
+        プロンプトをトークン化する（同じ文字列であれば前回の結果を再利用）
+
+        Parameters
+        ----------
+        prompt : str or CompiledPrompt
+            プロンプト文字列、またはトークン化済みのプロンプト
+
+        Returns
+        -------
+        CompiledPrompt or None
+            トークン化済みのプロンプト、プロンプトがない場合はNone
+        """
+        if not prompt:
+            return None
+        if isinstance(prompt, CompiledPrompt):
+            return prompt
+        cached_prompt, compiled = self._prompt_cache
+        if cached_prompt != prompt:
+            compiled = CompiledPrompt(prompt, self.tokenizer)
+            self._prompt_cache = (prompt, compiled)
+        return compiled
+
+    def get_prompt_ids(self, prompt):
+        """
+        プロンプトのトークンIDを返す
+
+        Parameters
+        ----------
+        prompt : str or CompiledPrompt
+            プロンプト文字列、またはトークン化済みのプロンプト
+
+        Returns
+        -------
+        torch.Tensor or None
+            <|startofprev|>付きのプロンプトトークンID（最大224トークン）、プロンプトがない場合はNone
+        """
+        compiled = self.compile_prompt(prompt)
+        return compiled.input_ids(self.device) if compiled else None
+
+    def transcribe(self, array, sampling_rate, language=None, prompt=None, max_new_tokens=128,
+                   return_timestamps=False, n_frames=None, no_speech_threshold=None, temperature=0.0,
+                   cache_key=None):
+        """
+        30秒以下の音声を文字起こしする
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            float32の音声配列
+        sampling_rate : int
+            サンプリングレート
+        language : str, optional
+            言語コード（None または "auto" で自動検出）
+        prompt : str or CompiledPrompt, optional
+            カスタム語彙とシステム指示から構築したプロンプト
+        max_new_tokens : int, optional
+            生成する最大トークン数
+        return_timestamps : bool, optional
+            タイムスタンプ付きのチャンクを返すかどうか
+        n_frames : int, optional
+            エンコーダーに入力するメルフレーム数（短縮する場合）
+        no_speech_threshold : float, optional
+            無音確率がこれを超える場合はデコードせずに空の結果を返す
+        temperature : float, optional
+            サンプリングの温度（0の場合は貪欲デコーディング）
+        cache_key : hashable, optional
+            エンコーダー出力のキャッシュのキー（音声の内容を表す値、Noneの場合はキャッシュしない）
+
+        Returns
+        -------
+        dict
+            text、chunks、language、token_idsを含む辞書
+        """
+        return self.transcribe_batch(
+            [array], sampling_rate, language, prompt, max_new_tokens, return_timestamps, n_frames,
+            no_speech_threshold, temperature, [cache_key] if cache_key is not None else None
+        )[0]
+
+    def transcribe_batch(self, arrays, sampling_rate, language=None, prompt=None, max_new_tokens=128,
+                         return_timestamps=False, n_frames=None, no_speech_threshold=None, temperature=0.0,
+                         cache_keys=None):
+        """
+        30秒以下の複数の音声をまとめて文字起こしする（エンコーダー・デコーダーをバッチで実行）
+
+        短い音声は最長の音声に合わせてパディングされるため、長さの近い音声をまとめて渡すと効率的です。
+
+        Parameters
+        ----------
+        arrays : list of numpy.ndarray
+            float32の音声配列のリスト
+        sampling_rate : int
+            サンプリングレート
+        language : str, optional
+            言語コード（None または "auto" で音声ごとに自動検出）
+        prompt : str or CompiledPrompt, optional
+            カスタム語彙とシステム指示から構築したプロンプト（全音声で共通）
+        max_new_tokens : int, optional
+            生成する最大トークン数
+        return_timestamps : bool, optional
+            タイムスタンプ付きのチャンクを返すかどうか
+        n_frames : int, optional
+            エンコーダーに入力するメルフレーム数（短縮する場合は最長の音声に合わせる）
+        no_speech_threshold : float, optional
+            エンコーダーと最初のデコーダーステップで求めた無音確率がこれを超える音声は、
+            デコードせずに空の結果（no_speech=True）を返す（supports_no_speech_checkがFalseの場合は無視）
+        temperature : float, optional
+            サンプリングの温度（0の場合は貪欲デコーディング）
+        cache_keys : list, optional
+            音声ごとのエンコーダー出力のキャッシュのキー（encoder_cacheが設定されている場合のみ使用）
+
+        Returns
+        -------
+        list of dict
+            入力と同じ順序の、text、chunks、language、token_idsを含む辞書のリスト
+            （無音判定を行った場合はno_speech、no_speech_probも含む）
+        """
+        start_time = time.perf_counter()
+        n_frames = n_frames or self.max_frames
+        # キャッシュにあるエンコーダー出力は再利用し、残りの音声のみ特徴量を抽出する
+        use_encoder_cache = self.encoder_cache is not None and cache_keys is not None and self.supports_trimmed_input
+        cached = [None] * len(arrays)
+        if use_encoder_cache:
+            cached = [self.encoder_cache.get((key, n_frames)) for key in cache_keys]
+        missing = [arrays[index] for index, hidden in enumerate(cached) if hidden is None]
+        input_features = self.extract_features(missing, sampling_rate, n_frames) if missing else None
+        features_time = time.perf_counter()
+
+        generate_kwargs = {
+            "max_new_tokens": max_new_tokens,
+            "num_beams": 1,
+            "do_sample": temperature > 0,
+            "return_timestamps": return_timestamps,
+            "task": "transcribe",
+        }
+        if temperature > 0:
+            generate_kwargs["temperature"] = temperature
+        if language and language != "auto":
+            generate_kwargs["language"] = language
+        prompt_ids = self.get_prompt_ids(prompt)
+        if prompt_ids is not None:
+            generate_kwargs["prompt_ids"] = prompt_ids
+        trimmed = n_frames != self.max_frames
+        check_no_speech = no_speech_threshold is not None and self.supports_no_speech_check
+        use_encoder_outputs = trimmed or check_no_speech or use_encoder_cache
+        # assisted generationはバッチサイズ1のみ対応
+        # （エンコーダーを共有しないドラフトモデルには、エンコーダー出力を渡す場合に自身の出力を別に渡す）
+        assistant_needs_encoder = use_encoder_outputs and not self.assistant_shares_encoder
+        if (self.assistant_model is not None and len(arrays) == 1
+                and (not assistant_needs_encoder or self.supports_assistant_encoder_outputs)):
+            generate_kwargs["assistant_model"] = self.assistant_model
+        if self.hotwords is not None:
+            generate_kwargs["logits_processor"] = LogitsProcessorList(
+                [HotwordLogitsProcessor(self.hotwords, self.hotword_boost)]
+            )
+
+        # 言語を指定した場合は無音判定のKVキャッシュをgenerateで再利用する
+        # （ドラフトモデル・タイムスタンプ付きの生成はWhisperのgenerateが必要なため再利用しない）
+        decoder_input_ids = None
+        if (check_no_speech and self.reuse_prefix_cache and "assistant_model" not in generate_kwargs
+                and not return_timestamps):
+            decoder_input_ids = self.decoder_input_ids(prompt_ids, language, len(arrays))
+
+        no_speech_probs = None
+        prefix_cache = None
+        probe_ids = None
+        speech_indices = list(range(len(arrays)))
+        sequences = []
+        with torch.inference_mode():
+            if not use_encoder_outputs:
+                sequences = self.model.generate(input_features, **generate_kwargs)
+            else:
+                if use_encoder_cache:
+                    encoder_outputs = self._encode_cached(input_features, cached, cache_keys, n_frames)
+                else:
+                    encoder_outputs = self.encode(input_features)
+                if check_no_speech:
+                    # 無音と判定した音声はデコードしない
+                    no_speech_probs, prefix_cache, probe_ids = self.no_speech_probs(
+                        encoder_outputs, prompt_ids, decoder_input_ids
+                    )
+                    speech_indices = [i for i, prob in enumerate(no_speech_probs) if prob <= no_speech_threshold]
+                    if 0 < len(speech_indices) < len(arrays):
+                        encoder_outputs = BaseModelOutput(
+                            last_hidden_state=encoder_outputs.last_hidden_state[speech_indices]
+                        )
+                        prefix_cache = None
+                if speech_indices:
+                    if "assistant_model" in generate_kwargs and assistant_needs_encoder:
+                        generate_kwargs["assistant_encoder_outputs"] = self._encode_for_assistant(
+                            arrays[0], sampling_rate, input_features, n_frames
+                        )
+                        try:
+                            sequences = self._generate_from_encoder_outputs(encoder_outputs, generate_kwargs)
+                        except Exception as e:
+                            self.supports_assistant_encoder_outputs = False
+                            print(f"[WARNING] Draft model encoder outputs are not supported, "
+                                  f"speculative decoding is used only with 30 s input: {e}")
+                            del generate_kwargs["assistant_model"], generate_kwargs["assistant_encoder_outputs"]
+                            sequences = self._generate_from_encoder_outputs(encoder_outputs, generate_kwargs)
+                    else:
+                        sequences = self._generate_from_encoder_outputs(
+                            encoder_outputs, generate_kwargs, prefix_cache, probe_ids, decoder_input_ids
+                        )
+        generate_time = time.perf_counter()
+
+        decoded = {
+            index: self.decode(sequence.tolist(), return_timestamps)
+            for index, sequence in zip(speech_indices, sequences)
+        }
+        results = []
+        for index in range(len(arrays)):
+            if no_speech_probs is None:
+                results.append(decoded[index])
+            elif index in decoded:
+                results.append(dict(decoded[index], no_speech=False, no_speech_prob=no_speech_probs[index]))
+            else:
+                results.append(self.no_speech_result(no_speech_probs[index]))
+        end_time = time.perf_counter()
+
+        self.last_timings = {
+            "features": features_time - start_time,
+            "generate": generate_time - features_time,
+            "decode": end_time - generate_time,
+            "total": end_time - start_time,
+            "batch_size": len(arrays),
+            "encoder_cached": len(arrays) - len(missing),
+        }
+        return results
+
+    def decode(self, token_ids, return_timestamps=False):
+        """
+        生成されたトークンIDをテキストに変換する
+
+        Parameters
+        ----------
+        token_ids : list of int
+            model.generateの出力（プロンプトを含んでいてもよい）
+        return_timestamps : bool, optional
+            タイムスタンプ付きのチャンクを作成するかどうか
+
+        Returns
+        -------
+        dict
+            text、chunks、language、token_idsを含む辞書
+        """
+        token_ids = self.strip_prompt(token_ids)
+
+        chunks = []
+        if return_timestamps:
+            decoded = self.tokenizer.decode(token_ids, skip_special_tokens=True, output_offsets=True)
+            text = decoded["text"]
+            chunks = [
+                {"text": offset["text"], "timestamp": tuple(offset["timestamp"])}
+                for offset in decoded.get("offsets", [])
+            ]
+        else:
+            text = self.tokenizer.decode(token_ids, skip_special_tokens=True)
+
+        return {
+            "text": text.strip(),
+            "chunks": chunks,
+            "language": self.detected_language(token_ids),
+            "token_ids": token_ids,
+        }
+
+    def strip_prompt(self, token_ids):
+        """
+        生成結果からプロンプト部分（<|startoftranscript|>より前）を取り除く
+
+        Transformersのバージョンによって生成結果にプロンプトが含まれるため、
+        どちらの場合でも本文のみを返します。
+
+        Parameters
+        ----------
+        token_ids : list of int
+            生成されたトークンID
+
+        Returns
+        -------
+        list of int
+            <|startoftranscript|>以降のトークンID
+        """
+        if self.start_token_id in token_ids:
+            return token_ids[token_ids.index(self.start_token_id):]
+        return token_ids
+
+    def detected_language(self, token_ids):
+        """
+        <|startoftranscript|>の次の言語トークンから言語コードを取得する
+
+        Parameters
+        ----------
+        token_ids : list of int
+            strip_prompt済みのトークンID
+
+        Returns
+        -------
+        str or None
+            言語コード（例: "ja"）、判定できない場合はNone
+        """
+        if len(token_ids) < 2 or token_ids[0] != self.start_token_id:
+            return None
+        token = self.tokenizer.convert_ids_to_tokens(token_ids[1])
+        if token and token.startswith("<|") and token.endswith("|>") and 2 <= len(token) - 4 <= 3:
+            return token[2:-2]
+        return None
+
+    def count_text_tokens(self, token_ids):
+        """
+        特殊トークン・タイムスタンプを除いた本文のトークン数を返す
+        """
+        eos_token_id = self.tokenizer.eos_token_id
+        return sum(1 for token_id in token_ids if token_id < eos_token_id)
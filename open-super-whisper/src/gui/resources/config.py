@@ -20,6 +20,29 @@ class AppConfig:
     DEFAULT_ENABLE_SOUND = True
     DEFAULT_SHOW_INDICATOR = True
     DEFAULT_MODEL = "openai/whisper-medium"
+    DEFAULT_RESIDENT_MODELS = 2  # 切り替え用にメモリに常駐させるモデルの数（使用中のモデルを含む）
+    DEFAULT_RESIDENT_MODELS_MB = 6144  # 常駐させるモデルの合計サイズの上限（MB）
+    DEFAULT_BACKEND = "transformers"  # 推論バックエンド（transformers / onnxruntime / ctranslate2）
+    DEFAULT_QUANTIZATION = "none"  # CPU推論時の量子化モード（none / dynamic_int8 / weight_only_int8）
+    DEFAULT_STREAMING_TRANSCRIPTION = False
+    DEFAULT_SAVE_RECORDINGS = False
+    DEFAULT_WARM_CAPTURE = False
+    DEFAULT_SPECULATIVE_DECODING = False  # ドラフトモデルによる投機的デコーディング
+    DEFAULT_VAD_TRIMMING = True  # 録音の前後の無音・長い間を除去してから文字起こし
+    DEFAULT_NO_SPEECH_GATE = True  # 無音・誤操作の録音は文字起こしをスキップ
+    DEFAULT_HOTWORD_BIASING = False  # デコード中にカスタム語彙の続きのトークンを優遇
+    DEFAULT_HOTWORD_BOOST = 2.0  # 部分一致した語彙の続きのトークンに加えるロジット
+    DEFAULT_VOCABULARY_CORRECTION = False  # 文字起こし結果の語彙に近い誤認識を語彙の表記に置き換え
+    DEFAULT_RESULT_CACHE = True  # 同じ音声の文字起こし結果を保存して再利用
+    DEFAULT_RESULT_CACHE_MB = 64  # 保存する文字起こし結果の上限（MB）
+    DEFAULT_ENCODER_CACHE_MB = 64  # 再文字起こし用に保持するエンコーダー出力の上限（MB）
+    
+    # ウォームキャプチャ設定
+    DEFAULT_PREROLL_MS = 500  # 録音開始前に遡って含める音声の長さ
+    DEFAULT_WARM_CAPTURE_IDLE_MINUTES = 5.0  # 未使用時にストリームを閉じるまでの時間（0で無効）
+    
+    # 逐次文字起こし設定
+    STREAMING_WINDOW_SECONDS = 20.0
     
     # 言語設定
     DEFAULT_LANGUAGE = ""  # 空文字列は自動検出を意味する
@@ -16,6 +16,8 @@ class AppLabels:
     RECORD_STOP_BUTTON = "録音停止"
     LANGUAGE_LABEL = "言語:"
     MODEL_LABEL = "モデル:"
+    BACKEND_TOOLTIP = "推論バックエンド（初回のみモデルの変換に時間がかかり、完了するまでは通常の経路で文字起こし）"
+    QUANTIZATION_TOOLTIP = "CPU推論時の量子化モード（初回のみ量子化に時間がかかり、以降は保存済みのモデルを使用）"
     AUTO_DETECT = "自動検出"
     TRANSCRIPTION_TITLE = "文字起こし結果"
     TRANSCRIPTION_PLACEHOLDER = "ここに文字起こしが表示されます..."
@@ -25,10 +27,20 @@ class AppLabels:
     CUSTOM_VOCABULARY = "カスタム語彙"
     SYSTEM_INSTRUCTIONS = "システム指示"
     COPY_TO_CLIPBOARD = "クリップボードにコピー"
+    RETRANSCRIBE_LAST = "直前の録音を再文字起こし"
     HOTKEY_SETTINGS = "ホットキー設定"
     AUTO_COPY = "自動コピー"
     SOUND_NOTIFICATION = "通知音"
     STATUS_INDICATOR = "状態インジケータ"
+    STREAMING_TRANSCRIPTION = "逐次文字起こし"
+    SAVE_RECORDINGS = "録音をWAVファイルで保存"
+    WARM_CAPTURE = "ウォームキャプチャ（録音開始直前の音声を含める）"
+    SPECULATIVE_DECODING = "投機的デコーディング（ドラフトモデルで高速化）"
+    VAD_TRIMMING = "無音除去（録音の前後の無音と長い間を省く）"
+    NO_SPEECH_GATE = "無音の録音をスキップ（誤操作・ミュート時）"
+    HOTWORD_BIASING = "ホットワード（デコード中にカスタム語彙を優遇）"
+    VOCABULARY_CORRECTION = "語彙補正（カスタム語彙に近い誤認識を置き換え）"
+    RESULT_CACHE = "結果キャッシュ（同じ音声の文字起こし結果を再利用）"
     EXIT_APP = "アプリケーション終了"
     
     # ステータスメッセージ
@@ -45,9 +57,38 @@ class AppLabels:
     STATUS_SOUND_DISABLED = "通知音を無効にしました"
     STATUS_INDICATOR_SHOWN = "状態インジケータを表示にしました"
     STATUS_INDICATOR_HIDDEN = "状態インジケータを非表示にしました"
+    STATUS_STREAMING_ENABLED = "逐次文字起こしを有効にしました（次の録音から適用）"
+    STATUS_STREAMING_DISABLED = "逐次文字起こしを無効にしました（次の録音から適用）"
+    STATUS_SAVE_RECORDINGS_ENABLED = "録音をWAVファイルで保存します"
+    STATUS_SAVE_RECORDINGS_DISABLED = "録音のWAV保存を無効にしました"
+    STATUS_WARM_CAPTURE_ENABLED = "ウォームキャプチャを有効にしました"
+    STATUS_WARM_CAPTURE_DISABLED = "ウォームキャプチャを無効にしました"
+    STATUS_SPECULATIVE_DECODING_ENABLED = "投機的デコーディングを有効にしました（ドラフトモデルをバックグラウンドで読み込みます）"
+    STATUS_SPECULATIVE_DECODING_DISABLED = "投機的デコーディングを無効にしました"
+    STATUS_VAD_TRIMMING_ENABLED = "無音除去を有効にしました"
+    STATUS_VAD_TRIMMING_DISABLED = "無音除去を無効にしました"
+    STATUS_NO_SPEECH_GATE_ENABLED = "無音の録音をスキップします"
+    STATUS_NO_SPEECH_GATE_DISABLED = "無音の録音のスキップを無効にしました"
+    STATUS_HOTWORD_BIASING_ENABLED = "ホットワードを有効にしました"
+    STATUS_HOTWORD_BIASING_DISABLED = "ホットワードを無効にしました"
+    STATUS_VOCABULARY_CORRECTION_ENABLED = "語彙補正を有効にしました"
+    STATUS_VOCABULARY_CORRECTION_DISABLED = "語彙補正を無効にしました"
+    STATUS_RESULT_CACHE_ENABLED = "結果キャッシュを有効にしました"
+    STATUS_RESULT_CACHE_DISABLED = "結果キャッシュを無効にしました"
+    STATUS_NO_SPEECH = "音声が検出されなかったため、文字起こしをスキップしました"
+    STATUS_NO_LAST_RECORDING = "再文字起こしできる録音がありません"
+    STATUS_RETRANSCRIBE_BUSY = "録音中は再文字起こしできません"
     STATUS_VOCABULARY_ADDED = "{0}個の語彙を追加しました"
     STATUS_INSTRUCTIONS_SET = "{0}個のシステム指示を設定しました"
     STATUS_MODEL_CHANGED = "文字起こしモデルを「{0}」に変更しました"
+    STATUS_MODEL_LOADING = "モデル「{0}」をバックグラウンドで読み込んでいます（完了までは現在のモデルで文字起こしします）"
+    STATUS_MODEL_LOAD_FAILED = "モデル「{0}」の読み込みに失敗しました: {1}"
+    STATUS_QUANTIZATION_CHANGED = "量子化モードを「{0}」に変更しました"
+    STATUS_QUANTIZATION_UNAVAILABLE = "量子化モード「{0}」はこの環境では使用できません"
+    STATUS_QUANTIZATION_LOADING = "量子化モード「{0}」のモデルをバックグラウンドで準備しています（完了までは現在のモデルで文字起こしします）"
+    STATUS_QUANTIZATION_LOAD_FAILED = "量子化モード「{0}」のモデルの準備に失敗しました: {1}"
+    STATUS_BACKEND_CHANGED = "推論バックエンドを「{0}」に変更しました（準備はバックグラウンドで行います）"
+    STATUS_BACKEND_UNAVAILABLE = "推論バックエンド「{0}」はこの環境では使用できません"
     
 
     
@@ -97,6 +138,7 @@ class AppLabels:
     ERROR_SYSTEM_TRAY = "システムトレイがサポートされていません。"
     ERROR_HOTKEY = "ホットキー設定エラー: {0}"
     ERROR_TRANSCRIPTION = "文字起こしエラー: {0}"
+    ERROR_NO_AUDIO = "録音データがありません"
 
     
     # 情報メッセージ
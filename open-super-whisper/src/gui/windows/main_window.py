@@ -51,6 +51,7 @@ def is_dark_mode():
 from src.core.audio_recorder import AudioRecorder
 from src.core.whisper_api import WhisperTranscriber
 from src.core.hotkeys import HotkeyManager
+from src.core.streaming import StreamingTranscriptionSession
 from src.gui.resources.config import AppConfig
 from src.gui.resources.labels import AppLabels
 from src.gui.resources.styles import AppStyles
@@ -71,7 +72,7 @@ class MainWindow(QMainWindow):
     """
     
     # カスタムシグナルの定義
-    transcription_complete = pyqtSignal(str)
+    transcription_complete = pyqtSignal(str, bool)
     recording_status_changed = pyqtSignal(bool)
     
     def __init__(self):
@@ -94,6 +95,13 @@ class MainWindow(QMainWindow):
         # 録音状態
         self.is_recording = False
         
+        # 直前に文字起こしした録音（再文字起こし用）
+        self.last_audio_file = None
+        
+        # 逐次文字起こし設定（録音中にウィンドウ単位で文字起こしする）
+        self.streaming_transcription = self.settings.value("streaming_transcription", AppConfig.DEFAULT_STREAMING_TRANSCRIPTION, type=bool)
+        self.streaming_session = None
+        
         # サウンド設定
         self.enable_sound = self.settings.value("enable_sound", AppConfig.DEFAULT_ENABLE_SOUND, type=bool)
         
@@ -103,8 +111,21 @@ class MainWindow(QMainWindow):
         # サウンドプレーヤーの初期化
         self.setup_sound_players()
         
+        # 録音のWAV保存設定（デフォルトはメモリ上のみ）
+        self.save_recordings = self.settings.value("save_recordings", AppConfig.DEFAULT_SAVE_RECORDINGS, type=bool)
+        
+        # ウォームキャプチャ設定（入力ストリームを開いたままにして録音開始直前の音声を付加する）
+        self.warm_capture = self.settings.value("warm_capture", AppConfig.DEFAULT_WARM_CAPTURE, type=bool)
+        preroll_ms = self.settings.value("preroll_ms", AppConfig.DEFAULT_PREROLL_MS, type=int)
+        warm_idle_minutes = self.settings.value("warm_capture_idle_minutes", AppConfig.DEFAULT_WARM_CAPTURE_IDLE_MINUTES, type=float)
+        
         # コンポーネントの初期化
-        self.audio_recorder = AudioRecorder()
+        self.audio_recorder = AudioRecorder(
+            save_recordings=self.save_recordings,
+            warm_capture=self.warm_capture,
+            preroll_seconds=preroll_ms / 1000.0,
+            idle_timeout_minutes=warm_idle_minutes
+        )
         
         # 状態表示ウィンドウ
         self.status_indicator_window = StatusIndicatorWindow()
@@ -149,7 +170,37 @@ class MainWindow(QMainWindow):
         self.floating_indicator.settings_requested.connect(self.show)
         
         try:
-            self.whisper_transcriber = WhisperTranscriber()
+            self.whisper_transcriber = WhisperTranscriber(
+                quantization_mode=self.settings.value("quantization", AppConfig.DEFAULT_QUANTIZATION),
+                backend=self.settings.value("backend", AppConfig.DEFAULT_BACKEND)
+            )
+            self.whisper_transcriber.set_vad_trimming(
+                self.settings.value("vad_trimming", AppConfig.DEFAULT_VAD_TRIMMING, type=bool)
+            )
+            self.whisper_transcriber.set_no_speech_gate(
+                self.settings.value("no_speech_gate", AppConfig.DEFAULT_NO_SPEECH_GATE, type=bool)
+            )
+            self.whisper_transcriber.set_hotword_biasing(
+                self.settings.value("hotword_biasing", AppConfig.DEFAULT_HOTWORD_BIASING, type=bool),
+                boost=self.settings.value("hotword_boost", AppConfig.DEFAULT_HOTWORD_BOOST, type=float)
+            )
+            self.whisper_transcriber.set_vocabulary_correction(
+                self.settings.value("vocabulary_correction", AppConfig.DEFAULT_VOCABULARY_CORRECTION, type=bool)
+            )
+            self.whisper_transcriber.set_result_cache(
+                self.settings.value("result_cache", AppConfig.DEFAULT_RESULT_CACHE, type=bool),
+                max_mb=self.settings.value("result_cache_mb", AppConfig.DEFAULT_RESULT_CACHE_MB, type=float)
+            )
+            self.whisper_transcriber.set_encoder_cache(
+                True, max_mb=self.settings.value("encoder_cache_mb", AppConfig.DEFAULT_ENCODER_CACHE_MB, type=float)
+            )
+            self.whisper_transcriber.set_resident_models(
+                self.settings.value("resident_models", AppConfig.DEFAULT_RESIDENT_MODELS, type=int),
+                max_mb=self.settings.value("resident_models_mb", AppConfig.DEFAULT_RESIDENT_MODELS_MB, type=float)
+            )
+            # 投機的デコーディングが有効な場合はドラフトモデルをバックグラウンドで読み込む
+            if self.settings.value("speculative_decoding", AppConfig.DEFAULT_SPECULATIVE_DECODING, type=bool):
+                self._set_speculative_decoding_async(True)
             # 保存されたカスタム語彙を読み込み
             self._load_saved_vocabulary()
             # 保存されたシステム指示を読み込み
@@ -296,6 +347,49 @@ class MainWindow(QMainWindow):
         index = self.model_combo.findData(last_model)
         if index >= 0:
             self.model_combo.setCurrentIndex(index)
+        
+        # 量子化モード選択（モデル選択の横に配置）
+        self.quantization_combo = QComboBox()
+        self.quantization_combo.setObjectName("quantizationCombo")
+        self.quantization_combo.setToolTip(AppLabels.QUANTIZATION_TOOLTIP)
+        for mode in WhisperTranscriber.get_available_quantizations():
+            self.quantization_combo.addItem(mode["name"], mode["id"])
+            self.quantization_combo.setItemData(
+                self.quantization_combo.count() - 1,
+                mode["description"],
+                Qt.ItemDataRole.ToolTipRole
+            )
+        
+        # 前回選択した量子化モードを設定
+        last_quantization = self.settings.value("quantization", AppConfig.DEFAULT_QUANTIZATION)
+        index = self.quantization_combo.findData(last_quantization)
+        if index >= 0:
+            self.quantization_combo.setCurrentIndex(index)
+        
+        # 推論バックエンド選択
+        self.backend_combo = QComboBox()
+        self.backend_combo.setObjectName("backendCombo")
+        self.backend_combo.setToolTip(AppLabels.BACKEND_TOOLTIP)
+        for backend in WhisperTranscriber.get_available_backends():
+            self.backend_combo.addItem(backend["name"], backend["id"])
+            self.backend_combo.setItemData(
+                self.backend_combo.count() - 1,
+                backend["description"],
+                Qt.ItemDataRole.ToolTipRole
+            )
+        
+        # 前回選択したバックエンドを設定
+        last_backend = self.settings.value("backend", AppConfig.DEFAULT_BACKEND)
+        index = self.backend_combo.findData(last_backend)
+        if index >= 0:
+            self.backend_combo.setCurrentIndex(index)
+        
+        model_row = QWidget()
+        model_row_layout = QHBoxLayout(model_row)
+        model_row_layout.setContentsMargins(0, 0, 0, 0)
+        model_row_layout.addWidget(self.model_combo, 1)
+        model_row_layout.addWidget(self.quantization_combo)
+        model_row_layout.addWidget(self.backend_combo)
             
         # フォームにフィールドを追加
         language_label = QLabel(AppLabels.LANGUAGE_LABEL)
@@ -305,7 +399,7 @@ class MainWindow(QMainWindow):
         model_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
         
         form_layout.addRow(language_label, self.language_combo)
-        form_layout.addRow(model_label, self.model_combo)
+        form_layout.addRow(model_label, model_row)
         
         # 録音デバイス選択
         self.device_combo = QComboBox()
@@ -429,6 +523,11 @@ class MainWindow(QMainWindow):
         copy_action.triggered.connect(self.copy_to_clipboard)
         toolbar.addAction(copy_action)
         
+        # 直前の録音の再文字起こしアクション
+        retranscribe_action = QAction(AppLabels.RETRANSCRIBE_LAST, self)
+        retranscribe_action.triggered.connect(self.retranscribe_last_recording)
+        toolbar.addAction(retranscribe_action)
+        
         # セパレーター追加
         toolbar.addSeparator()
         
@@ -458,6 +557,13 @@ class MainWindow(QMainWindow):
         self.indicator_action.triggered.connect(self.toggle_indicator_option)
         toolbar.addAction(self.indicator_action)
         
+        # 逐次文字起こしオプション
+        self.streaming_action = QAction(AppLabels.STREAMING_TRANSCRIPTION, self)
+        self.streaming_action.setCheckable(True)
+        self.streaming_action.setChecked(self.streaming_transcription)
+        self.streaming_action.triggered.connect(self.toggle_streaming_option)
+        toolbar.addAction(self.streaming_action)
+        
         # セパレーター追加
         toolbar.addSeparator()
         
@@ -513,6 +619,9 @@ class MainWindow(QMainWindow):
         
         現在の録音状態に応じて、録音を開始または停止します。
         """
+        # 停止レイテンシ計測用に操作時刻を記録
+        self._toggle_requested_at = time.perf_counter()
+        
         # GUIスレッドでの実行を保証するためQTimer.singleShotを使用
         QTimer.singleShot(0, self._toggle_recording_impl)
     
@@ -548,6 +657,15 @@ class MainWindow(QMainWindow):
                     QMessageBox.StandardButton.Ok)
                 return
             
+            # 逐次文字起こしセッションの準備（録音開始前にリスナーを登録）
+            if self.streaming_transcription and self.whisper_transcriber:
+                self.streaming_session = StreamingTranscriptionSession(
+                    self.whisper_transcriber,
+                    language=self.language_combo.currentData(),
+                    window_seconds=AppConfig.STREAMING_WINDOW_SECONDS
+                )
+                self.audio_recorder.set_audio_listener(self.streaming_session.feed)
+            
             # 録音開始
             self.audio_recorder.start_recording()
             self.is_recording = True
@@ -598,10 +716,16 @@ class MainWindow(QMainWindow):
         録音時間の表示が停止されます。
         """
         try:
-            # 録音停止
-            audio_file = self.audio_recorder.stop_recording()
+            # 録音停止を要求（最後のフレームの取得完了はバックグラウンドで待つ）
+            capture = self.audio_recorder.request_stop(getattr(self, "_toggle_requested_at", None))
+            self._toggle_requested_at = None
             self.is_recording = False
             
+            # 逐次文字起こしセッションを録音から切り離す
+            streaming_session = self.streaming_session
+            self.streaming_session = None
+            self.audio_recorder.set_audio_listener(None)
+            
             # UI更新
             self.record_button.setText(AppLabels.RECORD_START_BUTTON)
             self.record_button.setStyleSheet(AppStyles.RECORD_BUTTON_STYLE)
@@ -634,8 +758,11 @@ class MainWindow(QMainWindow):
             self.recording_status_changed.emit(False)
             
             # 文字起こし開始
-            if audio_file:
-                self.start_transcription(audio_file)
+            if streaming_session:
+                # 逐次文字起こし: 残りの部分のみ文字起こし
+                self.start_transcription(streaming_session=streaming_session, capture=capture)
+            elif capture is not None:
+                self.start_transcription(capture=capture)
             
             print("[Recording] 録音停止")
             
@@ -695,14 +822,20 @@ class MainWindow(QMainWindow):
             else:
                 self.recording_indicator.setStyleSheet(AppStyles.RECORDING_INDICATOR_ACTIVE_STYLE)
     
-    def start_transcription(self, audio_file=None):
+    def start_transcription(self, audio_file=None, streaming_session=None, capture=None, retranscribe=False):
         """
         文字起こしを開始する
         
         Parameters
         ----------
-        audio_file : str, optional
-            文字起こしを行う音声ファイルのパス
+        audio_file : str or AudioBuffer, optional
+            文字起こしを行う音声ファイルのパス、または録音した音声バッファ
+        streaming_session : StreamingTranscriptionSession, optional
+            録音中に逐次文字起こしを行っていたセッション
+        capture : CaptureSession, optional
+            停止を要求した録音（最後のフレームの取得はバックグラウンドで待つ）
+        retranscribe : bool, optional
+            文字起こし済みの録音をもう一度文字起こしするかどうか
         
         録音した音声ファイルの文字起こしを開始し、UIの状態を更新します。
         """
@@ -719,58 +852,155 @@ class MainWindow(QMainWindow):
         selected_language = self.language_combo.currentData()
         
         # バックグラウンドスレッドで文字起こし処理を実行
-        if audio_file:
+        if streaming_session:
+            self._transcription_start_time = time.time()
+            
+            transcription_thread = threading.Thread(
+                target=self.perform_streaming_transcription,
+                args=(streaming_session, capture)
+            )
+            transcription_thread.daemon = True
+            transcription_thread.start()
+        elif audio_file is not None or capture is not None:
             # 処理開始時間を記録
             self._transcription_start_time = time.time()
             
             transcription_thread = threading.Thread(
                 target=self.perform_transcription,
-                args=(audio_file, selected_language)
+                args=(audio_file, selected_language, capture, retranscribe)
             )
             transcription_thread.daemon = True
             transcription_thread.start()
     
-    def perform_transcription(self, audio_file, language=None):
+    def perform_streaming_transcription(self, streaming_session, capture=None):
+        """
+        逐次文字起こしセッションを完了させる（バックグラウンドスレッド）
+        
+        Parameters
+        ----------
+        streaming_session : StreamingTranscriptionSession
+            録音中に確定済みのウィンドウを持つセッション
+        capture : CaptureSession, optional
+            停止を要求した録音
+        
+        録音中に確定しなかった最後の部分だけを文字起こしし、
+        全体の結果をシグナルで通知します。
+        録音全体のレベルで無音と判定した場合は最後の部分を文字起こしせずに空の結果を通知し、
+        途中のウィンドウで失敗していた場合は、録音全体を1回で文字起こしし直します。
+        """
+        try:
+            # 最後のブロックがセッションに渡るまで待つ（録音全体は再文字起こし用に保持する）
+            audio_file = None
+            if capture is not None:
+                audio_file = self.audio_recorder.wait_for_recording(capture)
+                if audio_file is not None:
+                    self.last_audio_file = audio_file
+            
+            # 録音全体のレベルが低すぎる・短すぎる場合は最後の部分を文字起こしせずに終了する
+            if audio_file is not None and self.whisper_transcriber.skip_silent_recording(audio_file):
+                streaming_session.cancel()
+                self.transcription_complete.emit("", True)
+                return
+            
+            no_speech = False
+            try:
+                result = streaming_session.finish()
+                no_speech = not result and streaming_session.is_no_speech()
+            except Exception as e:
+                if audio_file is None:
+                    raise
+                # 逐次文字起こしが途中で止まった: 録音全体を通常の文字起こしで処理する
+                print(f"[WARNING] Streaming transcription failed ({e}); falling back to full-buffer transcription")
+                result = self.whisper_transcriber.transcribe(audio_file, streaming_session.language)
+                no_speech = not result and self.whisper_transcriber.get_no_speech_tier() is not None
+            
+            processing_time = time.time() - self._transcription_start_time
+            print(f"[INFO] Streaming transcription finished in {processing_time:.2f} seconds "
+                  f"({streaming_session.get_windows_committed()} windows committed while recording)")
+            
+            self.transcription_complete.emit(result, no_speech)
+            
+        except Exception as e:
+            processing_time = time.time() - self._transcription_start_time
+            print(f"[ERROR] Streaming transcription failed after {processing_time:.2f} seconds: {e}")
+            self.transcription_complete.emit(AppLabels.ERROR_TRANSCRIPTION.format(str(e)), False)
+    
+    def perform_transcription(self, audio_file, language=None, capture=None, retranscribe=False):
         """
         バックグラウンドスレッドで文字起こし処理を実行する
         
         Parameters
         ----------
-        audio_file : str
-            文字起こしを行う音声ファイルのパス
+        audio_file : str or AudioBuffer
+            文字起こしを行う音声ファイルのパス、または録音した音声バッファ
         language : str, optional
             文字起こしの言語コード
+        capture : CaptureSession, optional
+            停止を要求した録音（指定時は録音完了を待ってその音声を使用）
+        retranscribe : bool, optional
+            文字起こし済みの録音をもう一度文字起こしするかどうか（エンコーダー出力を再利用）
         
         WhisperTranscriberを使用して実際の文字起こし処理を行い、結果を
         シグナルで通知します。エラー発生時も適切にハンドリングします。
         """
         try:
-            # デバッグ: ファイルの存在とサイズをログに出力
-            import os
-            try:
-                size = os.path.getsize(audio_file)
-            except Exception as e:
-                size = f"Error: {e}"
-            with open("/tmp/recorder_debug.log", "a") as logf:
-                logf.write(f"Transcribe input file: {audio_file}, size: {size}\n")
+            # 録音の最後のフレーム取得を待つ（GUIスレッドをブロックしない）
+            if capture is not None:
+                audio_file = self.audio_recorder.wait_for_recording(capture)
+                if audio_file is None:
+                    raise RuntimeError(AppLabels.ERROR_NO_AUDIO)
             
-            # 音声を文字起こし
-            result = self.whisper_transcriber.transcribe(audio_file, language)
+            # デバッグ: 入力の種類と長さをログに出力
+            if isinstance(audio_file, str):
+                try:
+                    size = os.path.getsize(audio_file)
+                except Exception as e:
+                    size = f"Error: {e}"
+                print(f"[DEBUG] Transcribe input file: {audio_file}, size: {size}")
+            else:
+                print(f"[DEBUG] Transcribe input buffer: {audio_file.duration:.2f}s")
+            
+            # 音声を文字起こし（再文字起こし用に入力を保持する）
+            self.last_audio_file = audio_file
+            if retranscribe:
+                result = self.whisper_transcriber.retranscribe(audio_file, language)
+            else:
+                result = self.whisper_transcriber.transcribe(audio_file, language)
+            # このスレッドでの呼び出しが無音と判定したかどうか（他の文字起こしの影響を受けない）
+            no_speech = self.whisper_transcriber.get_no_speech_tier() is not None
             
             # 処理時間を計算
             processing_time = time.time() - self._transcription_start_time
             print(f"[INFO] Total transcription time: {processing_time:.2f} seconds")
             
             # 結果でシグナルを発信
-            self.transcription_complete.emit(result)
+            self.transcription_complete.emit(result, no_speech)
             
         except Exception as e:
             # エラー処理
             processing_time = time.time() - self._transcription_start_time
             print(f"[ERROR] Transcription failed after {processing_time:.2f} seconds: {e}")
-            self.transcription_complete.emit(AppLabels.ERROR_TRANSCRIPTION.format(str(e)))
+            self.transcription_complete.emit(AppLabels.ERROR_TRANSCRIPTION.format(str(e)), False)
     
-    def on_transcription_complete(self, text):
+    def retranscribe_last_recording(self):
+        """
+        直前の録音を現在の言語・カスタム語彙で文字起こしし直す
+        
+        言語の自動検出の誤りや語彙の追加を反映するためのもので、エンコーダー出力は
+        キャッシュから再利用するためデコーダーのみを実行します。
+        条件を変えずに実行した場合は別の候補（サンプリング）を返します。
+        """
+        if self.whisper_transcriber is None:
+            return
+        if self.is_recording:
+            self.status_bar.showMessage(AppLabels.STATUS_RETRANSCRIBE_BUSY, 2000)
+            return
+        if self.last_audio_file is None:
+            self.status_bar.showMessage(AppLabels.STATUS_NO_LAST_RECORDING, 2000)
+            return
+        self.start_transcription(self.last_audio_file, retranscribe=True)
+    
+    def on_transcription_complete(self, text, no_speech=False):
         """
         文字起こし完了時の処理
         
@@ -778,6 +1008,8 @@ class MainWindow(QMainWindow):
         ----------
         text : str
             文字起こし結果のテキスト
+        no_speech : bool, optional
+            この文字起こしで録音を無音と判定したかどうか
         
         文字起こし結果をテキストウィジェットに表示し、設定に応じて
         クリップボードにコピーします。また、完了サウンドを再生します。
@@ -810,6 +1042,9 @@ class MainWindow(QMainWindow):
                     pyautogui.hotkey('command', 'v')
                 except Exception as e:
                     print(f"[AutoPasteError] {e}")
+        elif not text and no_speech:
+            # 無音と判定した録音は空の結果をコピーせずに通知のみ
+            self.status_bar.showMessage(AppLabels.STATUS_NO_SPEECH, 3000)
         else:
             status_message = f"{AppLabels.STATUS_TRANSCRIBED} (使用モデル: {model_name}, 処理時間: {total_time:.1f}s)"
             self.status_bar.showMessage(status_message, 3000)
@@ -834,15 +1069,101 @@ class MainWindow(QMainWindow):
         """追加の接続設定"""
         # モデル選択が変更されたときのイベント
         self.model_combo.currentIndexChanged.connect(self.on_model_changed)
+        # 量子化モードが変更されたときのイベント
+        self.quantization_combo.currentIndexChanged.connect(self.on_quantization_changed)
+        # 推論バックエンドが変更されたときのイベント
+        self.backend_combo.currentIndexChanged.connect(self.on_backend_changed)
     
     def on_model_changed(self, index):
-        """モデルが変更されたときの処理"""
+        """
+        モデルが変更されたときの処理
+        
+        常駐しているモデルには読み込みなしで切り替え、それ以外はバックグラウンドで読み込みます
+        （どちらもGUIスレッドを止めず、切り替えまでは現在のモデルで文字起こしを続けます）。
+        """
         model_id = self.model_combo.currentData()
         if model_id and self.whisper_transcriber:
-            self.whisper_transcriber.set_model(model_id)
+            state = self.whisper_transcriber.set_model(model_id, background=True)
             self.settings.setValue("model", model_id)
             model_name = self.model_combo.currentText()
+            if state == "ready":
+                self.status_bar.showMessage(AppLabels.STATUS_MODEL_CHANGED.format(model_name), 2000)
+            elif state == "switching":
+                # 常駐モデルへの切り替えは実行中の推論が終わり次第完了する
+                QTimer.singleShot(100, lambda: self._check_model_loading(model_id, model_name))
+            else:
+                self.status_bar.showMessage(AppLabels.STATUS_MODEL_LOADING.format(model_name))
+                QTimer.singleShot(500, lambda: self._check_model_loading(model_id, model_name))
+    
+    def _check_model_loading(self, model_id, model_name):
+        """
+        バックグラウンドでのモデルの読み込みが終わるまで状態を確認し、結果を表示する
+        
+        Parameters
+        ----------
+        model_id : str
+            読み込み中のモデルのID
+        model_name : str
+            表示用のモデル名
+        """
+        status = self.whisper_transcriber.get_model_status()
+        if status["state"] == "loading" and status["loading"] == model_id:
+            QTimer.singleShot(500, lambda: self._check_model_loading(model_id, model_name))
+        elif status["state"] == "failed" and self.model_combo.currentData() == model_id:
+            self.status_bar.showMessage(AppLabels.STATUS_MODEL_LOAD_FAILED.format(model_name, status["error"]), 5000)
+        elif status["model_id"] == model_id:
             self.status_bar.showMessage(AppLabels.STATUS_MODEL_CHANGED.format(model_name), 2000)
+    
+    def on_quantization_changed(self, index):
+        """
+        量子化モードが変更されたときの処理
+        
+        モデルの読み込み・量子化はバックグラウンドで行います（GUIスレッドを止めず、
+        完了までは現在のモデルで文字起こしを続けます）。
+        """
+        mode = self.quantization_combo.currentData()
+        if mode and self.whisper_transcriber:
+            self.settings.setValue("quantization", mode)
+            mode_name = self.quantization_combo.currentText()
+            applied_mode = self.whisper_transcriber.set_quantization(mode, background=True)
+            if applied_mode != mode:
+                self.status_bar.showMessage(AppLabels.STATUS_QUANTIZATION_UNAVAILABLE.format(mode_name), 3000)
+            elif self.whisper_transcriber.get_model_status()["state"] == "loading":
+                self.status_bar.showMessage(AppLabels.STATUS_QUANTIZATION_LOADING.format(mode_name))
+                QTimer.singleShot(500, lambda: self._check_quantization_loading(mode, mode_name))
+            else:
+                self.status_bar.showMessage(AppLabels.STATUS_QUANTIZATION_CHANGED.format(mode_name), 2000)
+    
+    def _check_quantization_loading(self, mode, mode_name):
+        """
+        バックグラウンドでの量子化モデルの準備が終わるまで状態を確認し、結果を表示する
+        
+        Parameters
+        ----------
+        mode : str
+            準備中の量子化モード
+        mode_name : str
+            表示用の量子化モード名
+        """
+        status = self.whisper_transcriber.get_model_status()
+        if status["state"] == "loading" and status["loading_quantization"] == mode:
+            QTimer.singleShot(500, lambda: self._check_quantization_loading(mode, mode_name))
+        elif status["state"] == "failed" and self.quantization_combo.currentData() == mode:
+            self.status_bar.showMessage(AppLabels.STATUS_QUANTIZATION_LOAD_FAILED.format(mode_name, status["error"]), 5000)
+        elif status["quantization_mode"] == mode:
+            self.status_bar.showMessage(AppLabels.STATUS_QUANTIZATION_CHANGED.format(mode_name), 2000)
+    
+    def on_backend_changed(self, index):
+        """推論バックエンドが変更されたときの処理"""
+        backend = self.backend_combo.currentData()
+        if backend and self.whisper_transcriber:
+            self.settings.setValue("backend", backend)
+            backend_name = self.backend_combo.currentText()
+            applied_backend = self.whisper_transcriber.set_backend(backend)
+            if applied_backend == backend:
+                self.status_bar.showMessage(AppLabels.STATUS_BACKEND_CHANGED.format(backend_name), 3000)
+            else:
+                self.status_bar.showMessage(AppLabels.STATUS_BACKEND_UNAVAILABLE.format(backend_name), 3000)
 
     def setup_global_hotkey(self):
         """
@@ -929,6 +1250,9 @@ class MainWindow(QMainWindow):
             if self.is_recording:
                 self.stop_recording()
             
+            # 開いたままの入力ストリームを閉じる
+            self.audio_recorder.close()
+            
             # フローティングインジケーターを非表示・クリーンアップ
             if hasattr(self, 'floating_indicator'):
                 self.floating_indicator.hide()
@@ -1065,6 +1389,142 @@ class MainWindow(QMainWindow):
         else:
             self.status_bar.showMessage(AppLabels.STATUS_INDICATOR_HIDDEN, 2000)
 
+    def toggle_streaming_option(self):
+        """
+        逐次文字起こしのオン/オフを切り替える
+        
+        設定を保存し、状態をステータスバーに表示します（次の録音から適用）
+        """
+        self.streaming_transcription = self.sender().isChecked()
+        self.settings.setValue("streaming_transcription", self.streaming_transcription)
+        
+        # ツールバーとトレイメニューのチェック状態を同期
+        for action in (getattr(self, "streaming_action", None), getattr(self, "tray_streaming_action", None)):
+            if action is not None and action.isChecked() != self.streaming_transcription:
+                action.setChecked(self.streaming_transcription)
+        
+        if self.streaming_transcription:
+            self.status_bar.showMessage(AppLabels.STATUS_STREAMING_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_STREAMING_DISABLED, 2000)
+
+    def toggle_save_recordings_option(self):
+        """
+        録音のWAV保存のオン/オフを切り替える
+        
+        有効な場合、録音停止後にバックグラウンドでWAVファイルを保存します
+        """
+        self.save_recordings = self.sender().isChecked()
+        self.settings.setValue("save_recordings", self.save_recordings)
+        self.audio_recorder.save_recordings = self.save_recordings
+        if self.save_recordings:
+            self.status_bar.showMessage(AppLabels.STATUS_SAVE_RECORDINGS_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_SAVE_RECORDINGS_DISABLED, 2000)
+
+    def toggle_warm_capture_option(self):
+        """
+        ウォームキャプチャのオン/オフを切り替える
+        
+        有効な場合は入力ストリームを開いたままにし、録音開始直前の音声を録音に含めます。
+        一定時間録音されない場合は省電力のためストリームを閉じます。
+        """
+        self.warm_capture = self.sender().isChecked()
+        self.settings.setValue("warm_capture", self.warm_capture)
+        self.audio_recorder.set_warm_capture(self.warm_capture)
+        if self.warm_capture:
+            self.status_bar.showMessage(AppLabels.STATUS_WARM_CAPTURE_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_WARM_CAPTURE_DISABLED, 2000)
+
+    def toggle_speculative_decoding_option(self):
+        """
+        投機的デコーディングのオン/オフを切り替える
+        
+        ドラフトモデルの読み込みには時間がかかるため、バックグラウンドで行います。
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("speculative_decoding", enabled)
+        if self.whisper_transcriber:
+            self._set_speculative_decoding_async(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_SPECULATIVE_DECODING_ENABLED, 3000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_SPECULATIVE_DECODING_DISABLED, 2000)
+    
+    def toggle_vad_trimming_option(self):
+        """
+        録音の無音除去のオン/オフを切り替える
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("vad_trimming", enabled)
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_vad_trimming(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_VAD_TRIMMING_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_VAD_TRIMMING_DISABLED, 2000)
+    
+    def toggle_no_speech_gate_option(self):
+        """
+        無音の録音のスキップのオン/オフを切り替える
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("no_speech_gate", enabled)
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_no_speech_gate(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_NO_SPEECH_GATE_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_NO_SPEECH_GATE_DISABLED, 2000)
+    
+    def toggle_hotword_biasing_option(self):
+        """
+        ホットワード（デコード中のカスタム語彙の優遇）のオン/オフを切り替える
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("hotword_biasing", enabled)
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_hotword_biasing(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_HOTWORD_BIASING_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_HOTWORD_BIASING_DISABLED, 2000)
+    
+    def toggle_vocabulary_correction_option(self):
+        """
+        語彙補正のオン/オフを切り替える
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("vocabulary_correction", enabled)
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_vocabulary_correction(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_VOCABULARY_CORRECTION_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_VOCABULARY_CORRECTION_DISABLED, 2000)
+    
+    def toggle_result_cache_option(self):
+        """
+        文字起こし結果のキャッシュのオン/オフを切り替える
+        """
+        enabled = self.sender().isChecked()
+        self.settings.setValue("result_cache", enabled)
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_result_cache(enabled)
+        if enabled:
+            self.status_bar.showMessage(AppLabels.STATUS_RESULT_CACHE_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_RESULT_CACHE_DISABLED, 2000)
+    
+    def _set_speculative_decoding_async(self, enabled):
+        """
+        投機的デコーディングの設定をバックグラウンドスレッドで反映する
+        """
+        thread = threading.Thread(target=self.whisper_transcriber.set_speculative_decoding, args=(enabled,))
+        thread.daemon = True
+        thread.start()
+
     def setup_system_tray(self):
         """
         システムトレイアイコンとメニューの設定
@@ -1099,6 +1559,11 @@ class MainWindow(QMainWindow):
         self.record_action.triggered.connect(self.toggle_recording)
         menu.addAction(self.record_action)
         
+        # 直前の録音の再文字起こしアクションを追加
+        retranscribe_action = QAction(AppLabels.RETRANSCRIBE_LAST, self)
+        retranscribe_action.triggered.connect(self.retranscribe_last_recording)
+        menu.addAction(retranscribe_action)
+        
         # 録音状態表示アクションを追加
         self.status_action = QAction("録音状態: 停止中", self)
         self.status_action.setEnabled(False)  # クリック不可
@@ -1131,6 +1596,81 @@ class MainWindow(QMainWindow):
         auto_copy_action.triggered.connect(self.toggle_auto_copy)
         settings_menu.addAction(auto_copy_action)
         
+        # 録音のWAV保存設定
+        save_recordings_action = QAction(AppLabels.SAVE_RECORDINGS, self)
+        save_recordings_action.setCheckable(True)
+        save_recordings_action.setChecked(self.save_recordings)
+        save_recordings_action.triggered.connect(self.toggle_save_recordings_option)
+        settings_menu.addAction(save_recordings_action)
+        
+        # ウォームキャプチャ設定
+        warm_capture_action = QAction(AppLabels.WARM_CAPTURE, self)
+        warm_capture_action.setCheckable(True)
+        warm_capture_action.setChecked(self.warm_capture)
+        warm_capture_action.triggered.connect(self.toggle_warm_capture_option)
+        settings_menu.addAction(warm_capture_action)
+        
+        # 投機的デコーディング設定
+        speculative_decoding_action = QAction(AppLabels.SPECULATIVE_DECODING, self)
+        speculative_decoding_action.setCheckable(True)
+        speculative_decoding_action.setChecked(
+            self.settings.value("speculative_decoding", AppConfig.DEFAULT_SPECULATIVE_DECODING, type=bool)
+        )
+        speculative_decoding_action.triggered.connect(self.toggle_speculative_decoding_option)
+        settings_menu.addAction(speculative_decoding_action)
+        
+        # 無音除去設定
+        vad_trimming_action = QAction(AppLabels.VAD_TRIMMING, self)
+        vad_trimming_action.setCheckable(True)
+        vad_trimming_action.setChecked(
+            self.settings.value("vad_trimming", AppConfig.DEFAULT_VAD_TRIMMING, type=bool)
+        )
+        vad_trimming_action.triggered.connect(self.toggle_vad_trimming_option)
+        settings_menu.addAction(vad_trimming_action)
+        
+        # 無音の録音のスキップ設定
+        no_speech_gate_action = QAction(AppLabels.NO_SPEECH_GATE, self)
+        no_speech_gate_action.setCheckable(True)
+        no_speech_gate_action.setChecked(
+            self.settings.value("no_speech_gate", AppConfig.DEFAULT_NO_SPEECH_GATE, type=bool)
+        )
+        no_speech_gate_action.triggered.connect(self.toggle_no_speech_gate_option)
+        settings_menu.addAction(no_speech_gate_action)
+        
+        # ホットワード設定
+        hotword_biasing_action = QAction(AppLabels.HOTWORD_BIASING, self)
+        hotword_biasing_action.setCheckable(True)
+        hotword_biasing_action.setChecked(
+            self.settings.value("hotword_biasing", AppConfig.DEFAULT_HOTWORD_BIASING, type=bool)
+        )
+        hotword_biasing_action.triggered.connect(self.toggle_hotword_biasing_option)
+        settings_menu.addAction(hotword_biasing_action)
+        
+        # 語彙補正設定
+        vocabulary_correction_action = QAction(AppLabels.VOCABULARY_CORRECTION, self)
+        vocabulary_correction_action.setCheckable(True)
+        vocabulary_correction_action.setChecked(
+            self.settings.value("vocabulary_correction", AppConfig.DEFAULT_VOCABULARY_CORRECTION, type=bool)
+        )
+        vocabulary_correction_action.triggered.connect(self.toggle_vocabulary_correction_option)
+        settings_menu.addAction(vocabulary_correction_action)
+        
+        # 結果キャッシュ設定
+        result_cache_action = QAction(AppLabels.RESULT_CACHE, self)
+        result_cache_action.setCheckable(True)
+        result_cache_action.setChecked(
+            self.settings.value("result_cache", AppConfig.DEFAULT_RESULT_CACHE, type=bool)
+        )
+        result_cache_action.triggered.connect(self.toggle_result_cache_option)
+        settings_menu.addAction(result_cache_action)
+        
+        # 逐次文字起こし設定
+        self.tray_streaming_action = QAction(AppLabels.STREAMING_TRANSCRIPTION, self)
+        self.tray_streaming_action.setCheckable(True)
+        self.tray_streaming_action.setChecked(self.streaming_transcription)
+        self.tray_streaming_action.triggered.connect(self.toggle_streaming_option)
+        settings_menu.addAction(self.tray_streaming_action)
+        
         # ネイティブAPI版フローティングウィンドウ設定
         native_api_action = QAction("ネイティブAPI版フローティングウィンドウ", self)
         native_api_action.setCheckable(True)
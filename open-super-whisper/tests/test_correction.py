@@ -0,0 +1,107 @@
+"""
+カスタム語彙の補正（correction.py）のテスト
+"""
+
+from src.core.correction import VocabularyCorrector, _deletes, _FuzzyIndex, edit_distance, fold_term
+
+
+def test_fold_term_unifies_width_case_spaces_and_kana():
+    assert fold_term("Ｐｙ Torch") == "pytorch"
+    assert fold_term("アンソロピック") == "あんそろぴっく"
+
+
+def test_deletes_includes_key_and_single_deletions():
+    assert _deletes("abc", 1) == {"abc", "ab", "ac", "bc"}
+    assert _deletes("abc", 0) == {"abc"}
+
+
+def test_edit_distance_counts_transposition_once_and_caps_at_limit():
+    assert edit_distance("pytorch", "pytroch", 1) == 1
+    assert edit_distance("pytorch", "pytorh", 1) == 1
+    assert edit_distance("pytorch", "pxtxrch", 1) == 2
+
+
+def test_fuzzy_index_lookup():
+    index = _FuzzyIndex()
+    index.add("pytorch", "PyTorch")
+
+    assert index.lookup("pytorch") == ("pytorch", 0)
+    assert index.lookup("pytorh") == ("pytorch", 1)
+    assert index.lookup("pytroch") == ("pytorch", 1)
+    # 許容範囲外の長さ・編集距離
+    assert index.lookup("pyt") is None
+    assert index.lookup("pxtxrch") is None
+
+
+def test_fuzzy_index_skips_short_terms():
+    index = _FuzzyIndex()
+    index.add("ab", "AB")
+    assert not index
+
+    index.add("abc", "ABC")
+    # 4文字未満の語彙は完全一致のみ
+    assert index.lookup("abd") is None
+    assert index.lookup("abc") == ("abc", 0)
+
+
+def test_fuzzy_index_candidate_spans_around_pieces():
+    index = _FuzzyIndex()
+    index.add("pytorch", "PyTorch")
+
+    # 7文字の語彙は編集距離1のため "pyto" と "rch" の2つの断片に分けて登録する
+    assert sorted(index._pieces) == ["pyto", "rch"]
+    # 断片 "pyto" が位置1に現れるため、開始位置0〜2、長さ6〜8の区間を照合する
+    assert index.candidate_spans("ipytorch") == {
+        (start, start + length) for start in (0, 1, 2) for length in (6, 7, 8)
+    }
+    assert index.candidate_spans("hello") == set()
+
+
+def test_correct_joins_split_product_name():
+    corrector = VocabularyCorrector(["PyTorch"])
+    assert corrector.correct("I use Py Torch daily") == ("I use PyTorch daily", [("Py Torch", "PyTorch")])
+
+
+def test_correct_single_character_typo():
+    corrector = VocabularyCorrector(["PyTorch", "Kubernetes"])
+    assert corrector.correct("PyTorh is great") == ("PyTorch is great", [("PyTorh", "PyTorch")])
+    assert corrector.correct("Kubernetis cluster") == ("Kubernetes cluster", [("Kubernetis", "Kubernetes")])
+
+
+def test_correct_kana_folding():
+    corrector = VocabularyCorrector(["アンソロピック"])
+    assert corrector.correct("あんそろぴっくの製品") == ("アンソロピックの製品", [("あんそろぴっく", "アンソロピック")])
+    assert corrector.correct("アンソロピクは") == ("アンソロピックは", [("アンソロピク", "アンソロピック")])
+
+
+def test_correct_leaves_following_particle_alone():
+    corrector = VocabularyCorrector(["形態素解析"])
+
+    # "形態素解は" は語彙と編集距離1だが、末尾の助詞（かな）を語彙の漢字の誤りとはみなさない
+    index = _FuzzyIndex()
+    index.add(fold_term("形態素解析"), "形態素解析")
+    assert index.lookup("形態素解は") == ("形態素解析", 1)
+    assert corrector.correct("形態素解は便利") == ("形態素解析は便利", [("形態素解", "形態素解析")])
+
+
+def test_correct_prefers_closest_match_on_overlap():
+    corrector = VocabularyCorrector(["Tensor", "TensorFlow", "Flow"])
+
+    # 完全一致の長い区間が優先される
+    assert corrector.correct("tensor flow") == ("TensorFlow", [("tensor flow", "TensorFlow")])
+    # "tensor flo" 全体はTensorFlowと編集距離1だが、完全一致の "tensor" が優先される
+    assert corrector.correct("tensor flo") == ("Tensor Flow", [("tensor", "Tensor"), ("flo", "Flow")])
+
+
+def test_correct_keeps_exact_spelling_and_far_typos():
+    corrector = VocabularyCorrector(["Kubernetes"])
+    assert corrector.correct("kubernetes and Kubernetes") == (
+        "Kubernetes and Kubernetes", [("kubernetes", "Kubernetes")]
+    )
+    assert corrector.correct("Kbrnts") == ("Kbrnts", [])
+
+
+def test_empty_corrector():
+    corrector = VocabularyCorrector(["", "ab"])
+    assert not corrector
+    assert corrector.correct("abc") == ("abc", [])
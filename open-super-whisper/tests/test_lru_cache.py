@@ -0,0 +1,67 @@
+"""
+サイズ上限付きLRUキャッシュ（lru_cache.py）のテスト
+"""
+
+from src.core.lru_cache import LRUCache
+
+
+def test_put_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=30)
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    cache.put("c", 3, size=10)
+    assert cache.get("a") == 1
+
+    cache.put("d", 4, size=10)
+
+    assert cache.keys() == ["c", "a", "d"]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_put_rejects_value_larger_than_limit():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", 1, size=5)
+    assert cache.put("b", 2, size=11) is False
+    assert cache.keys() == ["a"]
+
+
+def test_reserve_frees_space_before_put():
+    cache = LRUCache(max_bytes=30)
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    cache.put("c", 3, size=10)
+
+    cache.reserve(15)
+
+    # 合計20 + 15 > 30、10 + 15 <= 30 のため2件を削除する
+    assert cache.keys() == ["c"]
+    assert cache.get_stats()["bytes"] == 10
+    assert cache.get_stats()["evictions"] == 2
+
+
+def test_reserve_respects_max_entries():
+    cache = LRUCache(max_bytes=100, max_entries=2)
+    cache.put("a", 1, size=1)
+    cache.put("b", 2, size=1)
+
+    cache.reserve(1)
+
+    assert cache.keys() == ["b"]
+
+
+def test_reserve_without_pressure_keeps_entries():
+    cache = LRUCache(max_bytes=100)
+    cache.put("a", 1, size=10)
+    cache.reserve(50)
+    assert cache.keys() == ["a"]
+    assert cache.get_stats()["evictions"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = LRUCache(max_bytes=100, sizeof=len)
+    cache.put("a", "xyz")
+    assert cache.get("a") == "xyz"
+    assert cache.get("missing") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["bytes"]) == (1, 1, 0.5, 3)
@@ -0,0 +1,90 @@
+"""
+文字起こし結果の永続キャッシュ（result_cache.py）のテスト
+"""
+
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from src.core import result_cache
+from src.core.result_cache import ResultCache, audio_fingerprint, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """最終使用時刻が呼び出し順に1秒ずつ進むようにする（同時刻による順序の揺れを避ける）"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(result_cache.time, "time", lambda: float(next(ticks)))
+
+
+def _size(value):
+    return len(json.dumps(value, ensure_ascii=False).encode())
+
+
+def test_get_returns_stored_result(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    cache.put("key", {"text": "こんにちは", "chunks": []})
+
+    assert cache.get("key") == {"text": "こんにちは", "chunks": []}
+    assert cache.get("missing") is None
+    assert (cache.get_stats()["hits"], cache.get_stats()["misses"]) == (1, 1)
+
+
+def test_put_evicts_least_recently_used(tmp_path, clock):
+    value = {"text": "x" * 20}
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=_size(value) * 2)
+    cache.put("a", value)
+    cache.put("b", value)
+    # aを使うとbが最も古くなる
+    assert cache.get("a") == value
+
+    cache.put("c", value)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    assert cache.get_stats()["entries"] == 2
+    assert cache.get_stats()["bytes"] == _size(value) * 2
+
+
+def test_put_skips_value_larger_than_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=10)
+    cache.put("a", {"text": "x" * 20})
+    assert cache.get("a") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_set_max_bytes_evicts_oldest(tmp_path, clock):
+    value = {"text": "x" * 20}
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=_size(value) * 3)
+    for key in ("a", "b", "c"):
+        cache.put(key, value)
+
+    cache.set_max_bytes(_size(value))
+
+    assert [cache.get(key) is not None for key in ("a", "b", "c")] == [False, False, True]
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache(path)
+    cache.put("a", {"text": "hello"})
+    cache.close()
+
+    reopened = ResultCache(path)
+    assert reopened.get("a") == {"text": "hello"}
+    assert reopened.get_stats()["bytes"] == _size({"text": "hello"})
+
+
+def test_audio_fingerprint_depends_on_content_and_rate():
+    audio = np.linspace(-1.0, 1.0, 1600, dtype=np.float32)
+    assert audio_fingerprint(audio, 16000) == audio_fingerprint(audio.astype(np.float64), 16000)
+    assert audio_fingerprint(audio, 16000) != audio_fingerprint(audio, 8000)
+    assert audio_fingerprint(audio, 16000) != audio_fingerprint(audio[::-1], 16000)
+
+
+def test_make_cache_key_depends_on_every_part():
+    assert make_cache_key("audio", "openai/whisper-small", "ja") == make_cache_key("audio", "openai/whisper-small", "ja")
+    assert make_cache_key("audio", "openai/whisper-small", "ja") != make_cache_key("audio", "openai/whisper-small", "en")
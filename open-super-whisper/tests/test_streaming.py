@@ -0,0 +1,26 @@
+"""
+逐次文字起こし（streaming.py）のテスト
+"""
+
+from src.core.streaming import _join_transcripts
+
+
+def test_join_transcripts_adds_space_between_words():
+    assert _join_transcripts(["Hello", "world"]) == "Hello world"
+    assert _join_transcripts(["version 1", "2 released"]) == "version 1 2 released"
+
+
+def test_join_transcripts_adds_space_after_punctuation():
+    assert _join_transcripts(["Hello.", "World"]) == "Hello. World"
+    assert _join_transcripts(["Wait,", "what?"]) == "Wait, what?"
+
+
+def test_join_transcripts_keeps_japanese_contiguous():
+    assert _join_transcripts(["こんにちは", "世界"]) == "こんにちは世界"
+    assert _join_transcripts(["今日は", "Python", "を使う"]) == "今日はPythonを使う"
+    assert _join_transcripts(["終わり。", "Next"]) == "終わり。Next"
+
+
+def test_join_transcripts_empty():
+    assert _join_transcripts([]) == ""
+    assert _join_transcripts(["single"]) == "single"
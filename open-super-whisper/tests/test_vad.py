@@ -0,0 +1,60 @@
+"""
+エネルギーベースのVAD（vad.py）のテスト
+"""
+
+import numpy as np
+
+from src.core.vad import EnergyVAD
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_segment_merges_utterances_within_max_seconds():
+    audio = np.concatenate([silence(1.0), tone(2.0), silence(1.0), tone(2.0), silence(1.0)])
+
+    # 発話の前200ms（パディング）から後300ms（ハングオーバー）までを残す
+    assert EnergyVAD(sample_rate=SAMPLE_RATE).segment(audio) == [(12800, 100800)]
+
+
+def test_segment_splits_at_pauses_when_too_long():
+    audio = np.concatenate([silence(1.0), tone(2.0), silence(1.0), tone(2.0), silence(1.0)])
+
+    # 2つの発話をまとめると2.5秒を超えるため、間の無音を除いて分ける
+    assert EnergyVAD(sample_rate=SAMPLE_RATE).segment(audio, max_seconds=2.5) == [(12800, 52800), (60800, 100800)]
+
+
+def test_segment_splits_long_utterance_at_quietest_frame():
+    # 4秒の発話の2.5〜2.6秒に小さい区間を入れる
+    audio = np.concatenate([silence(0.5), tone(2.0), tone(0.1, amplitude=0.05), tone(1.9), silence(0.5)])
+
+    segments = EnergyVAD(sample_rate=SAMPLE_RATE).segment(audio, max_seconds=3.0)
+
+    assert len(segments) == 2
+    (first_start, split), (second_start, second_end) = segments
+    assert (first_start, second_end) == (4800, 76800)
+    assert split == second_start
+    assert 40000 <= split < 41600
+    assert all(end - start <= 3.0 * SAMPLE_RATE for start, end in segments)
+
+
+def test_segment_returns_empty_list_for_silence():
+    assert EnergyVAD(sample_rate=SAMPLE_RATE).segment(silence(3.0)) == []
+
+
+def test_process_trims_leading_and_trailing_silence():
+    audio = np.concatenate([silence(1.0), tone(2.0), silence(1.0)])
+
+    result = EnergyVAD(sample_rate=SAMPLE_RATE).process(audio)
+
+    assert result.segments == [(12800, 0, 40000)]
+    assert result.leading_seconds == 0.8
+    assert result.to_original_time(1.0) == 1.8